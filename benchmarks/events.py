@@ -0,0 +1,43 @@
+"""Measures the dispatch overhead of an event with a few handlers, compared to blinker signals.
+
+Usage: python benchmarks/events.py [--emits 1000000] [--handlers 4]
+
+Comparing with blinker requires it to be installed (pip install blinker).
+"""
+
+import argparse
+import timeit
+
+from velbustcp.lib.events import Event
+
+
+def main(args: argparse.Namespace) -> None:
+    packet = bytearray(14)
+
+    event = Event("bench")
+    for _ in range(args.handlers):
+        event.subscribe(lambda packet: None)
+
+    seconds = timeit.timeit(lambda: event.emit(packet), number=args.emits)
+    print("event: {0:.3f}us per emit".format(seconds / args.emits * 1e6))
+
+    try:
+        from blinker import Signal
+    except ImportError:
+        print("blinker: not installed")
+        return
+
+    signal = Signal()
+    receivers = [lambda sender, **kwargs: None for _ in range(args.handlers)]
+    for receiver in receivers:
+        signal.connect(receiver)
+
+    seconds = timeit.timeit(lambda: signal.send(None, packet=packet), number=args.emits)
+    print("blinker: {0:.3f}us per send".format(seconds / args.emits * 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emits", type=int, default=1000000)
+    parser.add_argument("--handlers", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""Measures the cost of fanning bus packets out to many TCP clients.
+
+Usage: python benchmarks/fanout.py [--clients 100] [--packets 10000] [--burst 50] [--window 0.0]
+"""
+
+import argparse
+import asyncio
+import time
+
+from velbustcp.lib import consts
+from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetbuilder import build_packet
+from velbustcp.lib.settings.network import NetworkSettings
+
+
+async def consume(host: str, port: int, expected: int, done: asyncio.Event) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    received = 0
+
+    while received < expected:
+        data = await reader.read(65536)
+        if not data:
+            break
+        received += len(data)
+
+    writer.close()
+    done.set()
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = args.port
+    settings.coalesce_window = args.window
+
+    network = Network(settings, EventBus())
+    server = asyncio.create_task(network.start())
+    await asyncio.sleep(0.5)
+
+    packet = build_packet(consts.PRIORITY_LOW, 0x12, bytes([0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00]))
+    expected = len(packet) * args.packets
+
+    events = [asyncio.Event() for _ in range(args.clients)]
+    consumers = [asyncio.create_task(consume(settings.host, settings.port, expected, event)) for event in events]
+    await asyncio.sleep(0.5)
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+
+    for sent in range(0, args.packets, args.burst):
+        for _ in range(min(args.burst, args.packets - sent)):
+            network.send(Envelope(packet))
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*(event.wait() for event in events))
+
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    writes = sum(stats["writes"] for stats in network.stats().values())
+    deliveries = args.packets * args.clients
+
+    print("clients: {0}, packets: {1}, burst: {2}, window: {3}s".format(args.clients, args.packets, args.burst, args.window))
+    print("wall: {0:.3f}s, cpu: {1:.3f}s".format(wall, cpu))
+    print("cpu per delivered packet: {0:.2f}us".format(cpu / deliveries * 1e6))
+    print("socket writes per delivered packet: {0:.3f}".format(writes / deliveries))
+
+    await asyncio.gather(*consumers)
+    await network.stop()
+    server.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--packets", type=int, default=10000)
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--window", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=27115)
+    asyncio.run(main(parser.parse_args()))
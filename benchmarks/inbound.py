@@ -0,0 +1,81 @@
+"""Measures the CPU time spent per packet received from many connected TCP clients.
+
+Usage: python benchmarks/inbound.py [--clients 1000] [--packets 100] [--chunk 10]
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+
+from velbustcp.lib import consts
+from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.packetbuilder import build_packet
+from velbustcp.lib.settings.network import NetworkSettings
+
+
+async def main(args: argparse.Namespace) -> None:
+
+    # Every client takes a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.clients * 2 + 100)), hard))
+
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = args.port
+
+    events = EventBus()
+    network = Network(settings, events)
+    server = asyncio.create_task(network.start())
+    await asyncio.sleep(0.5)
+
+    expected = args.clients * args.packets
+    received = 0
+    done = asyncio.Event()
+
+    def on_receive(client, packet):
+        nonlocal received
+        received += 1
+        if received == expected:
+            done.set()
+
+    events.tcp_receive.subscribe(on_receive)
+
+    connections = [await asyncio.open_connection(settings.host, settings.port) for _ in range(args.clients)]
+    await asyncio.sleep(0.5)
+
+    packet = build_packet(consts.PRIORITY_LOW, 0x12, bytes([0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00]))
+    chunk = bytes(packet * args.chunk)
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+
+    for sent in range(0, args.packets, args.chunk):
+        for _, writer in connections:
+            writer.write(chunk[:len(packet) * min(args.chunk, args.packets - sent)])
+        await asyncio.sleep(0)
+
+    await done.wait()
+
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+
+    print("clients: {0}, packets per client: {1}, packets per write: {2}".format(args.clients, args.packets, args.chunk))
+    print("wall: {0:.3f}s, cpu: {1:.3f}s".format(wall, cpu))
+    print("cpu per received packet: {0:.2f}us".format(cpu / expected * 1e6))
+
+    for _, writer in connections:
+        writer.close()
+
+    await network.stop()
+    server.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--packets", type=int, default=100)
+    parser.add_argument("--chunk", type=int, default=10)
+    parser.add_argument("--port", type=int, default=27116)
+    asyncio.run(main(parser.parse_args()))
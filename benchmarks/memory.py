@@ -0,0 +1,85 @@
+"""Measures the memory taken by every idle connected TCP client, with tracemalloc.
+
+Usage: python benchmarks/memory.py [--clients 10000]
+
+The clients connect from a separate process, so only the allocations of the bridge are traced.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import socket
+import tracemalloc
+
+from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.settings.network import NetworkSettings
+
+
+def raise_file_limit(sockets: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, sockets + 100)), hard))
+
+
+def connect(host: str, port: int, clients: int, done) -> None:
+    """Opens the given amount of idle connections, and keeps them open until done."""
+    raise_file_limit(clients)
+    sockets = [socket.create_connection((host, port)) for _ in range(clients)]
+    done.wait()
+
+    for sock in sockets:
+        sock.close()
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    raise_file_limit(args.clients)
+
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = args.port
+
+    events = EventBus()
+    opened = 0
+
+    def on_open(client):
+        nonlocal opened
+        opened += 1
+
+    events.client_open.subscribe(on_open)
+
+    network = Network(settings, events)
+    server = asyncio.create_task(network.start())
+    await asyncio.sleep(0.5)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    done = multiprocessing.Event()
+    process = multiprocessing.Process(target=connect, args=(settings.host, settings.port, args.clients, done))
+    process.start()
+
+    while opened < args.clients:
+        await asyncio.sleep(0.1)
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("clients: {0}".format(args.clients))
+    print("traced memory: {0:.1f} MiB".format((after - before) / 1024 / 1024))
+    print("bytes per idle client: {0:.0f}".format((after - before) / args.clients))
+
+    done.set()
+    process.join()
+
+    await network.stop()
+    server.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=27117)
+    asyncio.run(main(parser.parse_args()))
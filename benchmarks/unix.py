@@ -0,0 +1,85 @@
+"""Compares the latency and CPU time of relaying packets over loopback TCP and over a Unix socket.
+
+Usage: python benchmarks/unix.py [--packets 10000] [--clients 10]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from velbustcp.lib import consts
+from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetbuilder import build_packet
+from velbustcp.lib.settings.network import NetworkSettings
+
+
+async def measure(settings: NetworkSettings, args: argparse.Namespace) -> None:
+
+    network = Network(settings, EventBus())
+    server = asyncio.create_task(network.start())
+    await asyncio.sleep(0.5)
+
+    if settings.unix:
+        connections = [await asyncio.open_unix_connection(settings.unix) for _ in range(args.clients)]
+    else:
+        connections = [await asyncio.open_connection(settings.host, settings.port) for _ in range(args.clients)]
+    await asyncio.sleep(0.5)
+
+    packet = build_packet(consts.PRIORITY_LOW, 0x12, bytes([0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00]))
+    latencies = []
+
+    cpu = time.process_time()
+
+    # One packet at a time, until every client read it
+    for _ in range(args.packets):
+        sent = time.perf_counter()
+        network.send(Envelope(packet))
+
+        for reader, _ in connections:
+            await reader.readexactly(len(packet))
+
+        latencies.append(time.perf_counter() - sent)
+
+    cpu = time.process_time() - cpu
+    latencies.sort()
+
+    print("{0}: median {1:.1f}us, p99 {2:.1f}us, cpu per delivered packet {3:.2f}us".format(
+        "unix" if settings.unix else "tcp",
+        statistics.median(latencies) * 1e6,
+        latencies[int(len(latencies) * 0.99)] * 1e6,
+        cpu / (args.packets * args.clients) * 1e6
+    ))
+
+    for _, writer in connections:
+        writer.close()
+
+    await network.stop()
+    server.cancel()
+
+
+async def main(args: argparse.Namespace) -> None:
+
+    print("clients: {0}, packets: {1}".format(args.clients, args.packets))
+
+    tcp = NetworkSettings()
+    tcp.host = "127.0.0.1"
+    tcp.port = args.port
+    await measure(tcp, args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        unix = NetworkSettings()
+        unix.unix = os.path.join(directory, "velbus.sock")
+        await measure(unix, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--port", type=int, default=27117)
+    asyncio.run(main(parser.parse_args()))
@@ -1,14 +1,22 @@
 import argparse
 import json
+import logging
+import signal
 import sys
 import asyncio
+from typing import Any, Dict, Optional, cast
 
 from velbustcp.lib.connection.bridge import Bridge
 from velbustcp.lib.connection.serial.bus import Bus
+from velbustcp.lib.connection.tcp.handoff import HandoffServer, HandoffState, inherited_sockets, receive_handoff
 from velbustcp.lib.connection.tcp.network import Network
 from velbustcp.lib.connection.tcp.networkmanager import NetworkManager
+from velbustcp.lib.events import EventBus
 from velbustcp.lib.settings.settings import validate_and_set_settings
-from velbustcp.lib.util.util import setup_logging
+from velbustcp.lib.util.util import set_log_level, setup_logging
+
+# Settings sections used once at startup, changing them requires a restart
+RESTART_SECTIONS = ["serial", "latency", "discovery", "poller", "ntp", "handoff"]
 
 
 class Main():
@@ -17,30 +25,101 @@ class Main():
     Connects serial and TCP connection together.
     """
 
-    def __init__(self):
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
         """Initialises the main class.
+
+        Args:
+            settings (Optional[Dict[str, Any]]): The settings as read from the settings file, compared against on a reload.
         """
 
+        self.__logger = logging.getLogger("__main__." + __name__)
+        self.__settings: Dict[str, Any] = settings or {}
+
+        # Events, shared by the bus and networks of the bridge
+        events = self.__events = EventBus()
+
         # Bridge
         from velbustcp.lib.settings.settings import serial_settings
-        bus = Bus(options=serial_settings)
+        bus = Bus(options=serial_settings, events=events)
 
         # Network manager
-        network_manager = NetworkManager()
+        network_manager = self.__network_manager = NetworkManager()
         from velbustcp.lib.settings.settings import network_settings
         for connection in network_settings:
-            network = Network(options=connection)
+            network = Network(options=connection, events=events)
             network_manager.add_network(network)
 
-        self.__bridge = Bridge(bus, network_manager)
+        from velbustcp.lib.settings.settings import latency_settings, discovery_settings, poller_settings, ntp_settings
+        self.__bridge = Bridge(
+            bus,
+            network_manager,
+            events,
+            latency_settings=latency_settings,
+            discovery_settings=discovery_settings,
+            poller_settings=poller_settings,
+            ntp_settings=ntp_settings
+        )
+
+        from velbustcp.lib.settings.settings import handoff_settings
+        self.__handoff_settings = handoff_settings
+        self.__handoff_server: Optional[HandoffServer] = None
 
     async def start(self):
-        """Starts the bridge."""
+        """Takes over the sockets of systemd or a previous process, and starts the bridge."""
+        state = HandoffState()
+        inherited_sockets(state)
+
+        # The previous process closes the serial port once it handed over, before the bus is opened
+        if self.__handoff_settings.path:
+            await asyncio.get_running_loop().run_in_executor(
+                None, receive_handoff, self.__handoff_settings.path, self.__handoff_settings.timeout, state
+            )
+
+        self.__network_manager.adopt(state)
+
+        if self.__handoff_settings.path:
+            main_task = cast("asyncio.Task[None]", asyncio.current_task())
+            self.__handoff_server = HandoffServer(
+                self.__handoff_settings.path, self.__network_manager, main_task.cancel, self.__handoff_settings.timeout
+            )
+            self.__handoff_server.start()
+
         await self.__bridge.start()
 
+    async def reload(self, settings: Dict[str, Any]):
+        """Applies changed settings without restarting, the serial connection and unaffected clients stay connected.
+
+        Args:
+            settings (Dict[str, Any]): The settings as read from the settings file.
+        """
+        try:
+            validate_and_set_settings(settings, reload=True)
+        except (ValueError, KeyError, TypeError) as e:
+            self.__logger.error("Invalid settings, keeping the current ones: %s", e)
+            return
+
+        for section in RESTART_SECTIONS:
+            if settings.get(section) != self.__settings.get(section):
+                self.__logger.warning("Changed %s settings only apply after a restart", section)
+
+        from velbustcp.lib.settings.settings import logging_settings, network_settings
+        set_log_level(logging_settings)
+
+        logging_section = {key: value for key, value in settings.get("logging", {}).items() if key != "type"}
+        if logging_section != {key: value for key, value in self.__settings.get("logging", {}).items() if key != "type"}:
+            self.__logger.warning("Changed logging output only applies after a restart")
+
+        await self.__network_manager.reload(network_settings, self.__events)
+        self.__settings = settings
+        self.__logger.info("Reloaded settings")
+
     async def stop(self):
         """Stops the bridge."""
+        if self.__handoff_server is not None:
+            self.__handoff_server.stop()
+
         await self.__bridge.stop()
+        self.__bridge.close()
 
 
 async def main_async(args=None):
@@ -50,11 +129,9 @@ async def main_async(args=None):
     args = parser.parse_args()
 
     # If settings are supplied, read and validate them
+    settings: Dict[str, Any] = {}
     if args.settings:
-        # Open settings file
-        with open(args.settings, 'r') as f:
-            settings = json.load(f)
-
+        settings = read_settings(args.settings)
         validate_and_set_settings(settings)
 
     # Setup logging
@@ -62,16 +139,24 @@ async def main_async(args=None):
     logger = setup_logging(logging_settings)
 
     # Create main class
-    main = Main()
+    main = Main(settings)
 
     try:
         loop = asyncio.get_event_loop()
+
+        # Reload the settings file on SIGHUP
+        if args.settings and hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(reload_settings(main, args.settings)))
+
         loop.run_until_complete(await main.start())
         loop.run_forever()
 
     except KeyboardInterrupt:
         logger.info("Interrupted, shutting down")
 
+    except asyncio.CancelledError:
+        logger.info("Handed over to a new process, shutting down")
+
     except Exception as e:
         logger.exception(e)
 
@@ -81,6 +166,34 @@ async def main_async(args=None):
     logger.info("Shutdown")
 
 
+def read_settings(path: str) -> Dict[str, Any]:
+    """Reads the settings file.
+
+    Args:
+        path (str): The path of the settings file.
+
+    Returns:
+        Dict[str, Any]: The settings.
+    """
+    with open(path, 'r') as f:
+        return cast(Dict[str, Any], json.load(f))
+
+
+async def reload_settings(main: Main, path: str):
+    """Reads the settings file again and applies it to the running bridge."""
+    try:
+        settings = read_settings(path)
+    except (OSError, ValueError) as e:
+        logging.getLogger("__main__." + __name__).error("Couldn't read settings file %s: %s", path, e)
+        return
+
+    # Runs as a separate task on SIGHUP, so nothing else would report a failed reload
+    try:
+        await main.reload(settings)
+    except Exception as e:
+        logging.getLogger("__main__." + __name__).exception("Couldn't reload settings: %s", e)
+
+
 # entrypoint for the snap
 def main(args=None):
     """Main method."""
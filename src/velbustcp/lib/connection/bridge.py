@@ -1,7 +1,26 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from velbustcp.lib import consts
+from velbustcp.lib.connection.poller import Poller
 from velbustcp.lib.connection.serial.bus import Bus
+from velbustcp.lib.connection.tcp.client import Client
 from velbustcp.lib.connection.tcp.networkmanager import NetworkManager
-from velbustcp.lib.signals import on_bus_receive, on_bus_send, on_tcp_receive
+from velbustcp.lib.events import EventBus, Subscription
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.handlers.busload import BusLoad
+from velbustcp.lib.packet.handlers.discoverycache import DiscoveryCache
+from velbustcp.lib.packet.handlers.latency import LatencyTracker
+from velbustcp.lib.packet.handlers.replayring import ReplayRing
+from velbustcp.lib.packet.handlers.statecache import StateCache
+from velbustcp.lib.packet.packetbuilder import build_clock_sync, build_module_type_request
+from velbustcp.lib.settings.discovery import DiscoverySettings
+from velbustcp.lib.settings.latency import LatencySettings
+from velbustcp.lib.settings.ntp import NtpSettings
+from velbustcp.lib.settings.poller import PollerSettings
+from velbustcp.lib.util.scheduler import Scheduler
 import asyncio
+import datetime
+import json
+import logging
 
 
 class Bridge():
@@ -13,30 +32,101 @@ class Bridge():
     __bus: Bus
     __network_manager: NetworkManager
 
-    def __init__(self, bus: Bus, network_manager: NetworkManager):
+    def __init__(
+        self,
+        bus: Bus,
+        network_manager: NetworkManager,
+        events: EventBus,
+        latency_settings: Optional[LatencySettings] = None,
+        discovery_settings: Optional[DiscoverySettings] = None,
+        poller_settings: Optional[PollerSettings] = None,
+        ntp_settings: Optional[NtpSettings] = None
+    ):
         """Initialises the Bridge class.
-        """
-
-        def handle_bus_receive(sender, **kwargs):
-            packet = kwargs["packet"]
-            asyncio.create_task(self.__network_manager.send(packet))
-        self.handle_bus_receive = handle_bus_receive
-        on_bus_receive.connect(handle_bus_receive)
 
-        def handle_bus_send(sender, **kwargs):
-            packet = kwargs["packet"]
-            asyncio.create_task(self.__network_manager.send(packet))
-        self.handle_bus_send = handle_bus_send
-        on_bus_send.connect(handle_bus_send)
+        Args:
+            bus (Bus): The bus connection.
+            network_manager (NetworkManager): The TCP network(s).
+            events (EventBus): The events shared by the bus and network(s).
+            latency_settings (Optional[LatencySettings]): The latency probe options.
+            discovery_settings (Optional[DiscoverySettings]): The discovery cache options.
+            poller_settings (Optional[PollerSettings]): The status poller options.
+            ntp_settings (Optional[NtpSettings]): The clock sync options.
+        """
 
-        def handle_tcp_receive(sender, **kwargs):
-            packet = kwargs["packet"]
-            asyncio.create_task(self.__bus.send(packet))
-        self.handle_tcp_receive = handle_tcp_receive
-        on_tcp_receive.connect(handle_tcp_receive)
+        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
 
         self.__bus: Bus = bus
         self.__network_manager: NetworkManager = network_manager
+        self.__latency_settings: LatencySettings = latency_settings or LatencySettings()
+        self.__latency: LatencyTracker = LatencyTracker()
+        self.__state_cache: StateCache = StateCache()
+        self.__replay: ReplayRing = ReplayRing()
+        self.__discovery_settings: DiscoverySettings = discovery_settings or DiscoverySettings()
+        self.__discovery: DiscoveryCache = DiscoveryCache(self.__discovery_settings.ttl)
+        self.__probe_index: int = 0
+        self.__bus_load: BusLoad = BusLoad()
+        self.__ntp_settings: NtpSettings = ntp_settings or NtpSettings()
+        self.__scheduler: Scheduler = Scheduler()
+        self.__network_queue: asyncio.Queue[Envelope] = asyncio.Queue(consts.BRIDGE_QUEUE_SIZE)
+        self.__bus_queue: asyncio.Queue[Envelope] = asyncio.Queue(consts.BRIDGE_QUEUE_SIZE)
+        self.__consumers: List[asyncio.Task[None]] = []
+        self.__dropped: int = 0
+
+        poller_settings = poller_settings or PollerSettings()
+        self.__poller: Optional[Poller] = None
+        if poller_settings.enabled and poller_settings.modules:
+            self.__poller = Poller(self.__send_to_bus, poller_settings, self.__state_cache, self.__bus_load, self.__scheduler)
+
+        self.__subscriptions: List[Subscription] = [
+            events.bus_receive.subscribe(self.handle_bus_receive),
+            events.bus_send.subscribe(self.handle_bus_send),
+            events.tcp_receive.subscribe(self.handle_tcp_receive),
+            events.client_control.subscribe(self.handle_client_control)
+        ]
+
+    def handle_bus_receive(self, packet: bytearray) -> None:
+        self.__bus_load.packet()
+        self.__latency.response_received(packet)
+        self.__state_cache.receive_packet(packet)
+        self.__discovery.receive_packet(packet)
+        self.__enqueue(self.__network_queue, Envelope(packet))
+
+    def handle_bus_send(self, envelope: Envelope) -> None:
+        envelope.direction = consts.FRAME_DIRECTION_SEND
+        self.__bus_load.packet()
+        self.__latency.request_sent(envelope.packet)
+        self.__discovery.request_sent(envelope.packet)
+        self.__enqueue(self.__network_queue, envelope)
+
+    def handle_tcp_receive(self, client: Client, packet: bytearray) -> None:
+
+        # Answer scan requests from the discovery cache when possible
+        if self.__discovery_settings.enabled:
+            responses = self.__discovery.answer(packet)
+            if responses is not None:
+                if responses:
+                    client.send(bytearray(b"".join(responses)))
+                return
+
+        self.__enqueue(self.__bus_queue, Envelope(packet, client))
+
+    def handle_client_control(self, client: Client, command: str, arguments: List[str]) -> None:
+
+        if command == consts.CONTROL_SNAPSHOT:
+            self.__send_snapshot(client)
+
+        elif command == consts.CONTROL_INVALIDATE:
+            try:
+                self.invalidate_discovery(int(arguments[0], 0) if arguments else None)
+            except ValueError:
+                self.__logger.warning("Invalid module address %s to invalidate", arguments[0])
+
+        elif command == consts.CONTROL_RESUME:
+            self.__resume(client, arguments)
+
+        elif command == consts.CONTROL_STATS:
+            client.send(bytearray(json.dumps(self.stats(), default=str).encode("utf-8") + b"\n"))
 
     async def start(self) -> None:
         """Starts bus and TCP network(s).
@@ -45,11 +135,218 @@ class Bridge():
         serial_task = asyncio.create_task(self.__bus.ensure())
         tcp_task = asyncio.create_task(self.__network_manager.start())
 
+        self.__consumers = [
+            asyncio.create_task(self.__forward_to_networks()),
+            asyncio.create_task(self.__forward(self.__bus_queue, self.__bus.send))
+        ]
+
+        if self.__latency_settings.probe:
+            self.__scheduler.call_every(self.__latency_settings.probe_interval, self.__probe)
+
+        if self.__poller is not None:
+            self.__poller.start()
+
+        if self.__ntp_settings.enabled:
+            self.__scheduler.call_daily(self.__ntp_settings.synctime, self.__sync_clock)
+
         await asyncio.gather(serial_task, tcp_task)
 
     async def stop(self) -> None:
         """Stops NTP, bus and network.
         """
 
+        self.__scheduler.stop()
+
+        for consumer in self.__consumers:
+            consumer.cancel()
+        self.__consumers.clear()
+
         await self.__network_manager.stop()
         await self.__bus.stop()
+
+    def close(self) -> None:
+        """Unsubscribes the bridge and its bus from their events, the bridge can't be used afterwards.
+        """
+
+        for subscription in self.__subscriptions:
+            subscription.cancel()
+        self.__subscriptions.clear()
+
+        self.__bus.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics about the bus and the modules on it.
+
+        Returns:
+            Dict[str, Any]: The statistics.
+        """
+
+        stats: Dict[str, Any] = {
+            "bus": self.__bus.stats(),
+            "load": round(self.__bus_load.rate(), 3),
+            "modules": self.__latency.stats(),
+            "state_cache": len(self.__state_cache),
+            "replay": self.__replay.stats(),
+            "discovery": self.__discovery.stats(),
+            "clients": self.__network_manager.stats(),
+            "networks": self.__network_manager.network_stats(),
+            "queues": {
+                "network": self.__network_queue.qsize(),
+                "bus": self.__bus_queue.qsize(),
+                "dropped": self.__dropped
+            }
+        }
+
+        if self.__poller is not None:
+            stats["poller"] = self.__poller.stats()
+
+        return stats
+
+    def invalidate_discovery(self, address: Optional[int] = None) -> None:
+        """Forgets the cached discovery responses, for example after hardware changed.
+
+        Args:
+            address (Optional[int]): The module address to forget, or None to forget all modules.
+        """
+
+        self.__logger.info("Invalidating discovery cache for %s", "all modules" if address is None else "0x{0:02X}".format(address))
+        self.__discovery.invalidate(address)
+
+    def __send_snapshot(self, client: Client) -> None:
+        """Replays the cached module states to the given client.
+
+        Args:
+            client (Client): The client that requested the snapshot.
+        """
+
+        snapshot = self.__state_cache.snapshot()
+
+        # A single write, so live packets can't be overtaken by older cached states
+        if snapshot:
+            client.send(bytearray(b"".join(snapshot)))
+
+    def __resume(self, client: Client, arguments: List[str]) -> None:
+        """Sends the packets a reconnecting client missed, or tells it to resync if they are no longer kept.
+        Only clients of framed networks know the run epoch and sequence numbers to resume from.
+
+        Args:
+            client (Client): The client that resumes.
+            arguments (List[str]): The run epoch and the sequence number of the last packet the client received.
+        """
+
+        if not client.connection().framed:
+            self.__logger.warning("Client %s can only resume on a framed network, requesting resync", client.address())
+            client.send(bytearray(consts.CONTROL_RESYNC))
+            return
+
+        try:
+            epoch, sequence = (int(argument) for argument in arguments)
+        except ValueError:
+            self.__logger.warning("Invalid arguments %s to resume from, expected a run epoch and a sequence number", " ".join(arguments))
+            client.send(bytearray(consts.CONTROL_RESYNC))
+            return
+
+        # Replay what the client would have received live, on its network and with its subscription
+        packet_filter = self.__network_manager.client_filter(client)
+        if packet_filter is None:
+            return
+
+        # Packets relayed since the client connected are already on their way
+        until = client.first_sequence() or None
+        envelopes = self.__replay.since(epoch, sequence, until)
+
+        if envelopes is None:
+            self.__logger.info("Client %s can't resume from %d:%d, requesting resync", client.address(), epoch, sequence)
+            client.send(bytearray(consts.CONTROL_RESYNC))
+            return
+
+        packets = [envelope.packet for envelope in envelopes if envelope.origin is not client and packet_filter.matches(envelope.packet)]
+        if packets:
+            client.send(bytearray(b"".join(packets)), envelopes[-1].sequence)
+
+    def __relay(self, envelope: Envelope) -> None:
+        """Numbers the given packet, keeps it for resuming clients and sends it to the networks.
+
+        Args:
+            envelope (Envelope): The packet to relay.
+        """
+
+        self.__replay.add(envelope)
+        self.__network_manager.send(envelope)
+
+    def __probe(self) -> None:
+        """Sends a module type request to the next known module, to measure its round-trip time.
+        """
+
+        modules = self.__latency.modules()
+        if not modules:
+            return
+
+        address = modules[self.__probe_index % len(modules)]
+        self.__probe_index += 1
+
+        # Don't interfere with an outstanding request
+        if self.__latency.is_pending(address):
+            return
+
+        self.__enqueue(self.__bus_queue, Envelope(build_module_type_request(address)))
+
+    def __sync_clock(self) -> None:
+        """Broadcasts the current local date and time to all modules.
+        """
+
+        self.__logger.info("Synchronising module clocks")
+        for packet in build_clock_sync(datetime.datetime.now()):
+            self.__enqueue(self.__bus_queue, Envelope(packet))
+
+    def __send_to_bus(self, envelope: Envelope) -> None:
+        """Queues a packet of the bridge itself to be sent on the bus.
+
+        Args:
+            envelope (Envelope): The packet to send.
+        """
+
+        self.__enqueue(self.__bus_queue, envelope)
+
+    def __enqueue(self, queue: "asyncio.Queue[Envelope]", envelope: Envelope) -> None:
+        """Queues a packet to be forwarded, dropping it if the queue is full.
+
+        Args:
+            queue (asyncio.Queue[Envelope]): The queue to put the packet on.
+            envelope (Envelope): The packet to forward.
+        """
+
+        try:
+            queue.put_nowait(envelope)
+        except asyncio.QueueFull:
+            self.__dropped += 1
+            self.__logger.warning("Forwarding queue full, dropping packet")
+
+    async def __forward_to_networks(self) -> None:
+        """Relays the packets of the network queue in order, until cancelled.
+        Relaying never waits, so packets are handled right here instead of in a coroutine each.
+        """
+
+        while True:
+            envelope = await self.__network_queue.get()
+
+            try:
+                self.__relay(envelope)
+            except Exception:
+                self.__logger.exception("Exception during forwarding packet")
+
+    async def __forward(self, queue: "asyncio.Queue[Envelope]", send: Callable[[Envelope], Awaitable[None]]) -> None:
+        """Forwards the packets of the given queue in order, until cancelled.
+
+        Args:
+            queue (asyncio.Queue[Envelope]): The queue to take the packets from.
+            send (Callable[[Envelope], Awaitable[None]]): The method to forward a packet with.
+        """
+
+        while True:
+            envelope = await queue.get()
+
+            try:
+                await send(envelope)
+            except Exception:
+                self.__logger.exception("Exception during forwarding packet")
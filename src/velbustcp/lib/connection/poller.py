@@ -0,0 +1,118 @@
+import logging
+import math
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from velbustcp.lib import consts
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.handlers.busload import BusLoad
+from velbustcp.lib.packet.handlers.statecache import StateCache
+from velbustcp.lib.packet.packetbuilder import build_packet
+from velbustcp.lib.settings.poller import PollerSettings
+from velbustcp.lib.util.scheduler import Job, Scheduler
+
+
+class Poller():
+    """Refreshes the state of the configured modules, using only the spare bus capacity.
+    """
+
+    def __init__(self, send: Callable[[Envelope], None], options: PollerSettings, state_cache: StateCache, bus_load: BusLoad, scheduler: Scheduler):
+        """Initialises the poller.
+
+        Args:
+            send (Callable[[Envelope], None]): Queues a status request to be sent on the bus, in order with the other packets of the bridge.
+            options (PollerSettings): The options used to configure the poller.
+            state_cache (StateCache): The state cache, to skip modules whose state was seen recently.
+            bus_load (BusLoad): The bus load meter, to adapt the poll rate to the spare bus capacity.
+            scheduler (Scheduler): The scheduler to schedule the polls on.
+        """
+
+        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
+        self.__send: Callable[[Envelope], None] = send
+        self.__options: PollerSettings = options
+        self.__state_cache: StateCache = state_cache
+        self.__bus_load: BusLoad = bus_load
+        self.__scheduler: Scheduler = scheduler
+        self.__job: Optional[Job] = None
+        self.__polled: Dict[int, float] = {}
+        self.__polls: int = 0
+
+    def next_due(self) -> Tuple[Optional[int], float]:
+        """Finds the most overdue module, modules whose state was seen recently aren't due.
+
+        Returns:
+            Tuple[Optional[int], float]: The address of the module, or None if no module is due,
+                and the time until the next module is due.
+        """
+
+        now = time.monotonic()
+        due_address = None
+        due_at = math.inf
+
+        for address in self.__options.modules:
+            seen = self.__state_cache.last_seen(address)
+            refreshed = max(self.__polled.get(address, -math.inf), -math.inf if seen is None else seen)
+
+            if refreshed + self.__options.interval < due_at:
+                due_address = address
+                due_at = refreshed + self.__options.interval
+
+        if due_at > now:
+            return None, due_at - now
+
+        return due_address, 0.0
+
+    def delay(self) -> float:
+        """Returns the time to wait between polls for the current bus load.
+
+        Returns:
+            float: The delay, in seconds.
+        """
+
+        rate = self.__bus_load.spare() * self.__options.budget
+
+        if rate <= 0:
+            return consts.POLLER_IDLE_DELAY
+
+        return min(1 / rate, consts.POLLER_IDLE_DELAY)
+
+    def start(self) -> None:
+        """Starts polling the configured modules.
+        """
+
+        self.__logger.info("Polling %d module(s) every %.0f seconds", len(self.__options.modules), self.__options.interval)
+        self.__job = self.__scheduler.call_later(self.delay(), self.__poll)
+
+    def stop(self) -> None:
+        """Stops polling.
+        """
+
+        if self.__job is not None:
+            self.__job.cancel()
+            self.__job = None
+
+    def __poll(self) -> None:
+        """Polls the most overdue module and schedules the next poll.
+        """
+
+        address, wait = self.next_due()
+
+        if address is not None:
+            self.__polled[address] = time.monotonic()
+            self.__polls += 1
+            packet = build_packet(consts.PRIORITY_LOW, address, bytes([consts.COMMAND_MODULE_STATUS_REQUEST, 0xFF]))
+            self.__send(Envelope(packet))
+
+        self.__job = self.__scheduler.call_later(max(wait, self.delay()), self.__poll)
+
+    def stats(self) -> Dict[str, float]:
+        """Returns statistics about the poller.
+
+        Returns:
+            Dict[str, float]: The amount of polls and the current delay between polls.
+        """
+
+        return {
+            "polls": self.__polls,
+            "delay": round(self.delay(), 3)
+        }
@@ -1,4 +1,5 @@
 import asyncio
+from typing import Any, Dict, List
 import serial_asyncio_fast
 import logging
 from velbustcp.lib.packet.handlers.busstatus import BusStatus
@@ -6,20 +7,24 @@ from velbustcp.lib.settings.serial import SerialSettings
 from velbustcp.lib.connection.serial.factory import set_serial_settings, find_port
 from velbustcp.lib.connection.serial.serialprotocol import VelbusSerialProtocol
 from velbustcp.lib.connection.serial.writerthread import WriterThread
-from velbustcp.lib.signals import on_bus_receive, on_bus_fault
+from velbustcp.lib.events import EventBus, Subscription
+from velbustcp.lib.packet.envelope import Envelope
 
 
 class Bus:
-    def __init__(self, options: SerialSettings):
+    def __init__(self, options: SerialSettings, events: EventBus):
         """Initialises a bus connection."""
         self.__logger = logging.getLogger("__main__." + __name__)
         self.__options = options
+        self.__events = events
         self.__bus_status: BusStatus = BusStatus()
         self.__do_reconnect: bool = False
         self.__connected: bool = False
 
-        on_bus_receive.connect(self.handle_on_bus_receive)
-        on_bus_fault.connect(self.handle_on_bus_fault)
+        self.__subscriptions: List[Subscription] = [
+            events.bus_receive.subscribe(self.handle_on_bus_receive),
+            events.bus_fault.subscribe(self.handle_on_bus_fault)
+        ]
 
     async def __reconnect(self):
         """Reconnects until active."""
@@ -53,11 +58,11 @@ class Bus:
 
         settings = set_serial_settings()
         self.__transport, self.__protocol = await serial_asyncio_fast.create_serial_connection(
-            asyncio.get_event_loop(), VelbusSerialProtocol, url=self.__port, **settings
+            asyncio.get_event_loop(), lambda: VelbusSerialProtocol(self.__events), url=self.__port, **settings
         )
         self.__connected = True
 
-        self.__writer = WriterThread(self.__transport)
+        self.__writer = WriterThread(self.__transport, self.__events)
         self.__logger.info("Serial connection active on port %s", self.__port)
 
         await self.__writer.run()
@@ -77,14 +82,36 @@ class Bus:
         if self.__writer:
             await self.__writer.close()
 
-    async def send(self, packet: bytearray):
+    async def send(self, envelope: Envelope):
         """Queues a packet to be sent on the serial connection."""
         if self.is_active():
-            await self.__writer.queue(packet)
+            await self.__writer.queue(envelope)
 
-    def handle_on_bus_receive(self, sender, **kwargs):
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics about the bus connection.
+
+        Returns:
+            Dict[str, Any]: The bus statistics.
+        """
+
+        stats: Dict[str, Any] = {
+            "active": self.is_active(),
+            "alive": self.__bus_status.alive
+        }
+
+        if self.is_active():
+            stats["writer"] = self.__writer.stats()
+
+        return stats
+
+    def close(self) -> None:
+        """Unsubscribes the bus from its events, the bus can't be used afterwards."""
+        for subscription in self.__subscriptions:
+            subscription.cancel()
+        self.__subscriptions.clear()
+
+    def handle_on_bus_receive(self, packet: bytearray) -> None:
         old_state = self.__bus_status.alive
-        packet = kwargs["packet"]
         self.__bus_status.receive_packet(packet)
 
         if old_state == self.__bus_status.alive:
@@ -99,5 +126,5 @@ class Bus:
         await self.stop()
         await self.ensure()
 
-    def handle_on_bus_fault(self, sender, **kwargs):
+    def handle_on_bus_fault(self) -> None:
         asyncio.create_task(self.on_reconnection())
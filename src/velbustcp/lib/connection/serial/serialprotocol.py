@@ -2,14 +2,15 @@ import asyncio
 import logging
 
 from velbustcp.lib.packet.packetparser import PacketParser
-from velbustcp.lib.signals import on_bus_receive, on_bus_fault
+from velbustcp.lib.events import EventBus
 
 
 class VelbusSerialProtocol(asyncio.Protocol):
     """Velbus serial protocol."""
 
-    def __init__(self):
+    def __init__(self, events: EventBus):
         self.__logger = logging.getLogger("__main__." + __name__)
+        self.__events = events
         self.__parser = PacketParser()
 
     def connection_made(self, transport):
@@ -22,10 +23,10 @@ class VelbusSerialProtocol(asyncio.Protocol):
             for packet in packets:
                 if self.__logger.isEnabledFor(logging.DEBUG):
                     self.__logger.debug("[BUS IN] %s", " ".join(hex(x) for x in packet))
-                on_bus_receive.send(self, packet=packet)
+                self.__events.bus_receive.emit(packet)
 
     def connection_lost(self, exc):
         self.__logger.error("Connection lost")
         if exc:
             self.__logger.exception(exc)
-        on_bus_fault.send(self)
+        self.__events.bus_fault.emit()
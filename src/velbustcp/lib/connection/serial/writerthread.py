@@ -1,18 +1,22 @@
 import asyncio
 from collections import deque
-from typing import Deque
+from typing import Any, Deque, Dict, Tuple
 import logging
 
 from velbustcp.lib import consts
-from velbustcp.lib.signals import on_bus_send
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.util.histogram import Histogram
 
 
 class WriterThread:
-    def __init__(self, serial_instance: asyncio.StreamWriter):
+    def __init__(self, serial_instance: asyncio.StreamWriter, events: EventBus):
         self.alive: bool = True
         self.__serial = serial_instance
+        self.__events = events
         self.__logger = logging.getLogger("__main__." + __name__)
-        self.__send_buffer: Deque[bytearray] = deque()
+        self.__send_buffer: Deque[Tuple[float, Envelope]] = deque()
+        self.__queue_delay: Histogram = Histogram()
         self.__serial_lock = asyncio.Lock()
         self.__buffer_condition = asyncio.Condition()
         self.__locked = False
@@ -23,10 +27,10 @@ class WriterThread:
         async with self.__buffer_condition:
             self.__buffer_condition.notify_all()  # Wake up the run loop if waiting
 
-    async def queue(self, packet: bytearray):
+    async def queue(self, envelope: Envelope):
         """Add a packet to the send buffer and notify the writer thread."""
         async with self.__buffer_condition:
-            self.__send_buffer.append(packet)
+            self.__send_buffer.append((asyncio.get_event_loop().time(), envelope))
             self.__buffer_condition.notify()  # Notify the writer thread that a packet is available
 
     async def run(self):
@@ -41,7 +45,8 @@ class WriterThread:
                     await self.__buffer_condition.wait_for(lambda: self.__send_buffer and not self.__locked)
 
                 # Get the next packet to send
-                packet = self.__send_buffer.popleft()
+                queued_time, envelope = self.__send_buffer.popleft()
+                packet = envelope.packet
 
                 # Enforce the send delay
                 delta_time = loop.time() - last_send_time
@@ -54,7 +59,8 @@ class WriterThread:
                             self.__logger.debug("[BUS OUT] %s", " ".join(hex(x) for x in packet))
 
                         self.__serial.write(packet)
-                        on_bus_send.send(self, packet=packet)
+                        self.__queue_delay.add(loop.time() - queued_time)
+                        self.__events.bus_send.emit(envelope)
                     except Exception as e:
                         self.__logger.exception(e)
 
@@ -77,3 +83,16 @@ class WriterThread:
         """Helper coroutine to notify the condition variable."""
         async with self.__buffer_condition:
             self.__buffer_condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics about the send queue.
+
+        Returns:
+            Dict[str, Any]: The amount of queued packets and the time packets spent waiting in the queue.
+        """
+
+        return {
+            "queued": len(self.__send_buffer),
+            "locked": self.__locked,
+            "queue_delay": self.__queue_delay.stats()
+        }
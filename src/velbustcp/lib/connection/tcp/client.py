@@ -1,76 +1,503 @@
 import asyncio
+import collections
 import logging
-from typing import Any, List
+import socket
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union, cast
 
+from velbustcp.lib import consts
 from velbustcp.lib.connection.tcp.clientconnection import ClientConnection
 from velbustcp.lib.packet.packetparser import PacketParser
-from velbustcp.lib.signals import on_tcp_receive, on_client_close
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.frame import encode_frame
+from velbustcp.lib.packet.packetexcluder import should_accept
+from velbustcp.lib.util.tokenbucket import TokenBucket
 
+_read_buffers = threading.local()
 
-class Client:
 
-    def __init__(self, connection: ClientConnection):
+def _read_buffer() -> memoryview:
+    """Returns the read buffer of the current thread.
+    Received data is handled before the next read, so all clients of an event loop can share a single buffer.
+    """
+
+    buffer: Optional[memoryview] = getattr(_read_buffers, "buffer", None)
+
+    if buffer is None:
+        buffer = _read_buffers.buffer = memoryview(bytearray(consts.CLIENT_READ_SIZE))
+
+    return buffer
+
+
+class OutboundQueue():
+    """The data waiting to be written to a client, in order.
+    Low priority data is also kept in a queue of its own, so the oldest can be dropped without searching for it.
+    """
+
+    __slots__ = ("__entries", "__low", "__size")
+
+    def __init__(self):
+        """Initialises the queue.
+        """
+
+        self.__entries: Deque[List[Any]] = collections.deque()  # [queued at, priority, data], data is None once dropped
+        self.__low: Deque[List[Any]] = collections.deque()
+        self.__size: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def append(self, priority: int, data: Union[bytes, bytearray]) -> None:
+        """Queues data to be written.
+
+        Args:
+            priority (int): The priority of the packet(s) in the data.
+            data (Union[bytes, bytearray]): The data to be written.
+        """
+
+        entry = [time.monotonic(), priority, data]
+        self.__entries.append(entry)
+        self.__size += 1
+
+        if priority == consts.PRIORITY_LOW:
+            self.__low.append(entry)
+
+    def drop_oldest(self, low_only: bool) -> bool:
+        """Drops the oldest low priority data, or the oldest data if there's no low priority data queued.
+
+        Args:
+            low_only (bool): Whether only low priority data can be dropped.
+
+        Returns:
+            bool: Whether or not any data was dropped.
+        """
+
+        if self.__low:
+            # Left in place, it's skipped when written
+            self.__low.popleft()[2] = None
+
+        elif low_only or not self.__size:
+            return False
+
+        else:
+            while self.__entries.popleft()[2] is None:
+                pass
+
+        self.__size -= 1
+        return True
+
+    def oldest(self) -> float:
+        """Returns when the oldest queued data was queued.
+
+        Returns:
+            float: The monotonic time the oldest data was queued.
+
+        Raises:
+            IndexError: When the queue is empty.
+        """
+
+        return cast(float, self.__entries[0][0])
+
+    def take(self) -> bytes:
+        """Takes all queued data out of the queue.
+
+        Returns:
+            bytes: The queued data, joined.
+        """
+
+        data = b"".join(entry[2] for entry in self.__entries if entry[2] is not None)
+        self.__entries.clear()
+        self.__low.clear()
+        self.__size = 0
+        return data
+
+
+class Client(asyncio.BufferedProtocol):
+    """A TCP client, received data is read straight into a buffer and handled as soon as it arrives.
+    Buffers, queues and the writer task are only created when needed, as most clients are idle most of the time.
+    """
+
+    __slots__ = (
+        "__connection", "__events", "__loop", "__transport", "__is_open", "__is_authorized", "__address", "__parser", "__control", "__in_control",
+        "__pending", "__resume_handle", "__auth_handle", "__queue", "__can_write", "__writer_task", "__dropped", "__writes", "__rejected", "__limited",
+        "__delayed", "__first_sequence", "__buckets", "__active_at", "__blocked_at"
+    )
+
+    __logger: logging.Logger = logging.getLogger("__main__." + __name__)
+
+    def __init__(self, connection: ClientConnection, events: EventBus, authorized: bool = False):
         """Initialises a network client.
 
         Args:
-            connection (ClientConnection): The ClientConnection for the client.
+            connection (ClientConnection): The options of the network the client connects to.
+            events (EventBus): The events to emit opening, received packets, control lines and closing on.
+            authorized (bool): Whether the client already authorized, like a client handed over by a previous process.
         """
 
-        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
         self.__connection: ClientConnection = connection
-        self.__is_active: bool = False
-        self.__address: str = connection.writer.get_extra_info('peername')
-        self.__received_packets: List[bytearray] = []
+        self.__events: EventBus = events
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__transport: Optional[asyncio.Transport] = None
+        self.__is_open: bool = False
+        self.__is_authorized: bool = authorized or not connection.should_authorize
+        self.__address: Any = None
+        self.__parser: Optional[PacketParser] = None
+        self.__control: Optional[bytearray] = None
+        self.__in_control: bool = True
+        self.__pending: Optional[Deque[bytearray]] = None
+        self.__resume_handle: Optional[asyncio.TimerHandle] = None
+        self.__auth_handle: Optional[asyncio.TimerHandle] = None
+        self.__queue: Optional[OutboundQueue] = None
+        self.__can_write: Optional[asyncio.Event] = None
+        self.__writer_task: Optional[asyncio.Task[None]] = None
+        self.__dropped: int = 0
+        self.__writes: int = 0
+        self.__rejected: int = 0
+        self.__limited: int = 0
+        self.__delayed: int = 0
+        self.__first_sequence: int = 0
+        self.__buckets: Tuple[TokenBucket, ...] = ()
+        self.__active_at: float = 0.0
+        self.__blocked_at: float = 0.0
+
+        if connection.rate:
+            self.__buckets += (TokenBucket(connection.rate, connection.burst),)
+
+        if connection.network_bucket is not None:
+            self.__buckets += (connection.network_bucket,)
+
+    def connection(self) -> ClientConnection:
+        """Returns the options of the network the client is connected to.
 
-    async def start(self) -> None:
-        """Starts receiving data from the client.
+        Returns:
+            ClientConnection: The options.
         """
 
-        if self.is_active():
-            return
+        return self.__connection
 
-        self.__is_active = True
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Returns the event loop serving the client, which is either the bridge's or a worker's.
+
+        Returns:
+            Optional[asyncio.AbstractEventLoop]: The event loop, None if the client isn't connected yet.
+        """
+
+        return self.__loop
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.__loop = asyncio.get_running_loop()
+        self.__transport = cast(asyncio.Transport, transport)
+        self.__address = transport.get_extra_info("peername")
+
+        self.__active_at = time.monotonic()
+
+        # Peers of a Unix socket have no name, tell them apart by their file descriptor
+        if not self.__address:
+            self.__address = "{0}#{1}".format(transport.get_extra_info("sockname"), transport.get_extra_info("socket").fileno())
+        elif self.__connection.keepalive_idle:
+            self.__set_keepalive(transport.get_extra_info("socket"))
+        self.__is_open = True
         self.__logger.info("Starting client connection for %s", self.address())
 
-        if not await self.__handle_authorization():
-            self.__logger.warning("Client authorization failed for %s", self.address())
-            await self.stop()
+        if not self.__is_authorized and self.__connection.auth_timeout:
+            self.__auth_handle = asyncio.get_running_loop().call_later(self.__connection.auth_timeout, self.__handle_auth_timeout)
+
+        self.__events.client_open.emit(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return _read_buffer()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        if not self.__is_open:
             return
 
-        await self.__handle_packets()
+        data = _read_buffer()[:nbytes]
+        self.__active_at = time.monotonic()
+
+        if not self.__is_authorized:
+            remainder = self.__handle_authorization(data)
+
+            if not remainder:
+                return
+
+            data = memoryview(remainder)
+
+        if self.__in_control:
+            control = self.__control = self.__control or bytearray()
+            control.extend(data)
+
+            if self.__handle_control_lines(control):
+                self.__control = control or None
+                return
+
+            data = memoryview(control)
+            self.__control = None
+            self.__in_control = False
+
+        if self.__parser is None:
+            self.__parser = PacketParser()
+
+        for packet in self.__parser.feed(data):
+            if not should_accept(packet, self.__connection.policy):
+                self.__rejected += 1
+                continue
+
+            self.__handle_rate_limit(packet)
 
-        await self.stop()
+    def eof_received(self) -> bool:
+        self.__logger.info("Received no data from client %s", self.address())
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if exc is not None:
+            self.__logger.warning("Connection of client %s lost: %s", self.address(), exc)
+
+        self.stop()
+
+    def pause_writing(self) -> None:
+        self.__can_write = asyncio.Event()
+        self.__blocked_at = time.monotonic()
 
-    async def stop(self) -> None:
+    def resume_writing(self) -> None:
+        self.__blocked_at = 0.0
+
+        if self.__can_write is not None:
+            self.__can_write.set()
+            self.__can_write = None
+
+    def stop(self) -> None:
         """Stops receiving data and disconnects from the client.
         """
 
-        if not self.is_active():
+        if not self.__is_open:
             return
 
-        self.__is_active = False
+        # Clients of a worker are stopped on the worker's loop
+        if self.__loop is not asyncio.get_running_loop():
+            cast(asyncio.AbstractEventLoop, self.__loop).call_soon_threadsafe(self.stop)
+            return
+
+        self.__is_open = False
         self.__logger.info("Closing client connection for %s", self.address())
-        self.__connection.writer.close()
-        await self.__connection.writer.wait_closed()
-        self.__received_packets.clear()
-        on_client_close.send(self)
 
-    async def send(self, data: bytearray) -> None:
-        """Sends data to the client.
+        if self.__writer_task is not None:
+            self.__writer_task.cancel()
+            self.__writer_task = None
+
+        if self.__resume_handle is not None:
+            self.__resume_handle.cancel()
+            self.__resume_handle = None
+
+        if self.__auth_handle is not None:
+            self.__auth_handle.cancel()
+            self.__auth_handle = None
+
+        if self.__transport is not None:
+            self.__transport.close()
+
+        self.__queue = None
+        self.__pending = None
+        self.__events.client_close.emit(self)
+
+    def detach(self) -> Optional[socket.socket]:
+        """Stops the client without closing its connection, to hand the connection over to another process.
+
+        Returns:
+            Optional[socket.socket]: A copy of the client's socket, None if the client isn't connected or uses TLS,
+                of which the session can't be handed over.
+        """
+
+        transport = self.__transport
+
+        if not self.__is_open or transport is None or transport.get_extra_info("sslcontext") is not None:
+            return None
+
+        # The connection stays open as long as the copy is
+        sock = transport.get_extra_info("socket")
+        copy = socket.fromfd(sock.fileno(), sock.family, sock.type)
+        self.stop()
+        return copy
+
+    def send(self, data: bytearray, sequence: int = 0) -> None:
+        """Queues data of the bridge itself to be sent to the client, without waiting for it to be written.
 
         Args:
             data (bytearray): The data to be sent.
+            sequence (int): The sequence number of the last relayed packet in the data, 0 if none.
         """
 
         if not self.is_active():
             return
 
-        if data in self.__received_packets:
-            self.__received_packets.remove(data)
+        # Clients of a worker are written to from the worker's loop
+        if self.__loop is not asyncio.get_running_loop():
+            cast(asyncio.AbstractEventLoop, self.__loop).call_soon_threadsafe(self.send, data, sequence)
+            return
+
+        priority = data[1] if len(data) > 1 else consts.PRIORITY_HIGH
+
+        if self.__connection.framed:
+            data = bytearray(encode_frame(data, consts.FRAME_DIRECTION_BRIDGE, sequence, time.time()))
+
+        self.__enqueue(data, priority)
+
+    def relay(self, envelope: Envelope) -> None:
+        """Queues a relayed packet to be sent to the client, without waiting for it to be written.
+
+        Args:
+            envelope (Envelope): The relayed packet.
+        """
+
+        if not self.is_active():
             return
 
-        self.__connection.writer.write(data)
-        await self.__connection.writer.drain()
+        if not self.__first_sequence:
+            self.__first_sequence = envelope.sequence
+
+        self.__enqueue(envelope.frame() if self.__connection.framed else envelope.packet, envelope.packet[1])
+
+    def __enqueue(self, data: Union[bytes, bytearray], priority: int) -> None:
+        """Queues data to be written, applying the overflow policy if the queue is full.
+
+        Args:
+            data (Union[bytes, bytearray]): The data to be written.
+            priority (int): The priority of the packet(s) in the data.
+        """
+
+        if self.__queue is None:
+            self.__queue = OutboundQueue()
+
+        if len(self.__queue) >= self.__connection.queue_size and not self.__handle_overflow(self.__queue, priority):
+            return
+
+        self.__queue.append(priority, data)
+
+        if self.__writer_task is None:
+            self.__writer_task = asyncio.create_task(self.__write_packets(self.__queue))
+
+    def first_sequence(self) -> int:
+        """Returns the sequence number of the first relayed packet sent to the client.
+
+        Returns:
+            int: The sequence number, 0 if no relayed packet was sent yet.
+        """
+
+        return self.__first_sequence
+
+    def lag(self) -> float:
+        """Returns how long the oldest queued data has been waiting to be written.
+
+        Returns:
+            float: The age of the oldest queued data in seconds, 0 if nothing is queued.
+        """
+
+        # The queue may be emptied by a worker meanwhile
+        try:
+            return time.monotonic() - self.__queue.oldest() if self.__queue else 0.0
+        except IndexError:
+            return 0.0
+
+    def idle(self) -> float:
+        """Returns how long ago anything was exchanged with the client.
+        Both data received from the client and data written to it count, so clients that only listen aren't idle.
+
+        Returns:
+            float: The time since data was last received or written, in seconds.
+        """
+
+        return time.monotonic() - self.__active_at
+
+    def blocked(self) -> float:
+        """Returns how long writing to the client has been paused, because it doesn't read what's written to it.
+
+        Returns:
+            float: The time writing has been paused, in seconds, 0 if it isn't.
+        """
+
+        blocked_at = self.__blocked_at
+        return time.monotonic() - blocked_at if blocked_at else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns statistics about the outbound queue of the client.
+
+        Returns:
+            Dict[str, float]: The amount of queued and dropped packets, the amount of writes,
+                the amount of received packets rejected by the inbound policy, dropped or delayed by the rate limits,
+                and the lag in seconds.
+        """
+
+        return {
+            "queued": len(self.__queue or ()),
+            "dropped": self.__dropped,
+            "writes": self.__writes,
+            "rejected": self.__rejected,
+            "limited": self.__limited,
+            "delayed": self.__delayed,
+            "lag": round(self.lag(), 3)
+        }
+
+    def __handle_overflow(self, queue: OutboundQueue, priority: int) -> bool:
+        """Applies the overflow policy when the outbound queue is full.
+
+        Args:
+            queue (OutboundQueue): The outbound queue.
+            priority (int): The priority of the data that doesn't fit in the queue.
+
+        Returns:
+            bool: Whether or not the data can still be queued.
+        """
+
+        if self.__connection.overflow == consts.OVERFLOW_DISCONNECT:
+            self.__logger.warning("Outbound queue of client %s is full, disconnecting", self.address())
+            self.stop()
+            return False
+
+        self.__dropped += 1
+
+        # Make room by dropping the oldest low priority packet.
+        # With only high priority packets queued, the new one is dropped instead if it's less important.
+        return queue.drop_oldest(low_only=priority == consts.PRIORITY_LOW)
+
+    async def __write_packets(self, queue: OutboundQueue) -> None:
+        """Writes the queued data to the client, until the queue is empty.
+        All data queued within the coalesce window is written at once, saving syscalls and TLS records during bursts.
+
+        Args:
+            queue (OutboundQueue): The outbound queue.
+        """
+
+        transport = cast(asyncio.Transport, self.__transport)
+
+        try:
+            while queue:
+
+                # Let the packets of the same burst queue up
+                await asyncio.sleep(self.__connection.coalesce_window)
+
+                data = queue.take()
+
+                try:
+                    transport.write(data)
+                    self.__writes += 1
+                    self.__active_at = time.monotonic()
+                except Exception:
+                    self.__logger.exception("Exception during writing to client %s", self.address())
+                    self.stop()
+                    return
+
+                # Wait for the transport to flush its buffer when the client reads slowly
+                if self.__can_write is not None:
+                    await self.__can_write.wait()
+
+            # Don't keep an empty queue around for idle clients
+            if self.__queue is queue:
+                self.__queue = None
+
+        finally:
+            if self.__writer_task is asyncio.current_task():
+                self.__writer_task = None
 
     def is_active(self) -> bool:
         """Returns whether the client is active for communication.
@@ -80,7 +507,16 @@ class Client:
             bool: Whether the client is active for communication.
         """
 
-        return self.__is_active
+        return self.__is_open and self.__is_authorized
+
+    def is_authorized(self) -> bool:
+        """Returns whether the client is authorized, clients of networks without authorization always are.
+
+        Returns:
+            bool: Whether the client is authorized.
+        """
+
+        return self.__is_authorized
 
     def address(self) -> Any:
         """Returns the address of the client.
@@ -91,51 +527,181 @@ class Client:
 
         return self.__address
 
-    async def __handle_authorization(self) -> bool:
-        """Handles client authorization.
+    def __set_keepalive(self, sock: socket.socket) -> None:
+        """Enables TCP keepalive on the client's socket, so dead peers are detected even if nothing is written to them.
+
+        Args:
+            sock (socket.socket): The socket of the client.
+        """
+
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # Not every platform allows tuning the probes
+        for option, value in (
+            ("TCP_KEEPIDLE", self.__connection.keepalive_idle),
+            ("TCP_KEEPINTVL", self.__connection.keepalive_interval),
+            ("TCP_KEEPCNT", self.__connection.keepalive_count)
+        ):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+    def __handle_authorization(self, data: memoryview) -> Optional[bytearray]:
+        """Handles client authorization, the received data should start with the newline-terminated authorization key.
+        Data sent after the key is kept, so clients don't have to wait for a round trip before sending.
+        A key without newline is accepted as well, as long as nothing else is sent with it.
+
+        Args:
+            data (memoryview): The received data.
 
         Returns:
-            bool: Whether or not the client is successfully authenticated.
+            Optional[bytearray]: The data received after the key, None if the client isn't authorized (yet).
         """
 
-        if not self.__connection.should_authorize:
-            return True
+        buffer = self.__control = self.__control or bytearray()
+        buffer.extend(data)
+        key = self.__connection.authorization_key.encode("utf-8")
+        end = buffer.find(b"\n")
 
-        try:
-            data = await self.__connection.reader.read(1024)
+        if end >= 0:
+            line = bytes(buffer[:end]).strip()
+            remainder = buffer[end + 1:]
+        else:
+            line = bytes(buffer).strip()
+            remainder = bytearray()
+
+            # Wait for the rest of the key
+            if line != key and key.startswith(line):
+                return None
 
-            if not data:
-                self.__logger.warning("Client %s disconnected before receiving authorization key", self.address())
-                return False
+        if line != key:
+            self.__logger.warning("Client authorization failed for %s", self.address())
+            self.stop()
+            return None
 
-            return self.__connection.authorization_key == data.decode("utf-8").strip()
+        self.__control = None
 
-        except Exception:
-            self.__logger.exception("Exception during authorization for %s", self.address())
+        if self.__auth_handle is not None:
+            self.__auth_handle.cancel()
+            self.__auth_handle = None
 
-        return False
+        self.__is_authorized = True
+        self.__events.client_authorize.emit(self)
+
+        return remainder
+
+    def __handle_auth_timeout(self) -> None:
+        """Disconnects the client when it didn't authorize in time.
+        """
+
+        self.__auth_handle = None
+        self.__logger.warning("Client %s didn't authorize in time, disconnecting", self.address())
+        self.stop()
+
+    def __handle_control_lines(self, buffer: bytearray) -> bool:
+        """Handles the control lines at the start of the buffer.
+        Control lines are newline-terminated text starting with a known command, only accepted before the client's first packet.
+        Anything else is left in the buffer, to be handled as packet data.
+
+        Args:
+            buffer (bytearray): The received data, handled lines are removed from it.
+
+        Returns:
+            bool: Whether or not more control lines can follow.
+        """
+
+        while buffer and buffer[0] != consts.STX:
+            end = buffer.find(b"\n")
+            text = bytes(buffer[:end] if end >= 0 else buffer)
+            words = text.split()
 
-    async def __handle_packets(self) -> None:
-        """Receives packet until client is no longer active.
+            # The command word is known once it's followed by anything, until then it has to be the start of a command
+            if words:
+                command = words[0].decode("ascii", errors="replace").upper()
+                complete = end >= 0 or len(text.lstrip()) > len(words[0])
+
+                if complete and command not in consts.CONTROL_COMMANDS:
+                    return False
+
+                if not complete and not any(known.startswith(command) for known in consts.CONTROL_COMMANDS):
+                    return False
+
+            if end < 0:
+                return len(buffer) <= consts.MAX_CONTROL_LENGTH
+
+            del buffer[:end + 1]
+
+            if words:
+                self.__logger.info("Received control line %s from client %s", command, self.address())
+                self.__events.client_control.emit(self, command, [word.decode("ascii", errors="replace") for word in words[1:]])
+
+        return not buffer
+
+    def __handle_rate_limit(self, packet: bytearray) -> None:
+        """Takes a token from the rate limits of the client and its network, and emits the packet.
+        With the delay policy, reading from the client is paused until the tokens are available.
+
+        Args:
+            packet (bytearray): The received packet.
         """
 
-        parser = PacketParser()
+        # Keep the order of packets that are already waiting
+        if self.__pending is not None:
+            self.__delayed += 1
+            self.__pending.append(packet)
+            return
+
+        if self.__buckets:
+            wait = max(bucket.delay() for bucket in self.__buckets)
+
+            if wait and self.__connection.rate_policy == consts.RATE_DROP:
+                self.__limited += 1
+                return
 
-        while self.is_active():
-            try:
-                data = await self.__connection.reader.read(1024)
-            except Exception:
-                self.__logger.exception("Exception during packet receiving")
+            if wait:
+                self.__delayed += 1
+                self.__pending = collections.deque((packet,))
+                self.__pause_reading(wait)
                 return
 
-            if not data:
-                self.__logger.info("Received no data from client %s", self.address())
+            for bucket in self.__buckets:
+                bucket.take()
+
+        self.__events.tcp_receive.emit(self, packet)
+
+    def __pause_reading(self, wait: float) -> None:
+        """Stops reading from the client's socket, until the waiting packets are emitted.
+
+        Args:
+            wait (float): The time until the next token is available, in seconds.
+        """
+
+        transport = cast(asyncio.Transport, self.__transport)
+        if transport.is_reading():
+            transport.pause_reading()
+
+        self.__resume_handle = asyncio.get_running_loop().call_later(wait, self.__handle_pending)
+
+    def __handle_pending(self) -> None:
+        """Emits the packets delayed by the rate limits, for as far as tokens are available.
+        """
+
+        self.__resume_handle = None
+        pending = self.__pending
+
+        while pending:
+            wait = max(bucket.delay() for bucket in self.__buckets)
+
+            if wait:
+                self.__pause_reading(wait)
                 return
 
-            packets = parser.feed(bytearray(data))
+            for bucket in self.__buckets:
+                bucket.take()
+
+            self.__events.tcp_receive.emit(self, pending.popleft())
 
-            for packet in packets:
-                self.__received_packets.append(packet)
-                on_tcp_receive.send(self, packet=packet)
+        self.__pending = None
 
-            await asyncio.sleep(0)
+        transport = cast(asyncio.Transport, self.__transport)
+        if self.__is_open and not transport.is_reading():
+            transport.resume_reading()
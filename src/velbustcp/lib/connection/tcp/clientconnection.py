@@ -1,11 +1,32 @@
-import asyncio
+from typing import Optional
+
+from velbustcp.lib import consts
+from velbustcp.lib.packet.packetexcluder import InboundPolicy
+from velbustcp.lib.util.tokenbucket import TokenBucket
 
 
 class ClientConnection:
-    """Represents an incoming client connection.
+    """The options of a network, shared by all of its clients.
     """
 
-    reader: asyncio.StreamReader
-    writer: asyncio.StreamWriter
-    should_authorize: bool = False
-    authorization_key: str = ""
+    __slots__ = (
+        "should_authorize", "authorization_key", "auth_timeout", "queue_size", "overflow", "coalesce_window", "framed", "policy", "rate", "burst",
+        "rate_policy", "network_bucket", "keepalive_idle", "keepalive_interval", "keepalive_count"
+    )
+
+    def __init__(self):
+        self.should_authorize: bool = False
+        self.authorization_key: str = ""
+        self.auth_timeout: float = consts.AUTH_TIMEOUT
+        self.queue_size: int = consts.CLIENT_QUEUE_SIZE
+        self.overflow: str = consts.OVERFLOW_DROP
+        self.coalesce_window: float = consts.COALESCE_WINDOW
+        self.framed: bool = False
+        self.policy: InboundPolicy = InboundPolicy()
+        self.rate: float = consts.RATE_LIMIT
+        self.burst: int = consts.RATE_BURST
+        self.rate_policy: str = consts.RATE_DELAY
+        self.network_bucket: Optional[TokenBucket] = None
+        self.keepalive_idle: int = consts.KEEPALIVE_IDLE
+        self.keepalive_interval: int = consts.KEEPALIVE_INTERVAL
+        self.keepalive_count: int = consts.KEEPALIVE_COUNT
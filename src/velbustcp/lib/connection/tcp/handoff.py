@@ -0,0 +1,314 @@
+import array
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from velbustcp.lib import consts
+
+if TYPE_CHECKING:  # pragma: no cover
+    from velbustcp.lib.connection.tcp.networkmanager import NetworkManager
+
+
+class AdoptedClient(NamedTuple):
+    """A client connection handed over by a previous process.
+    """
+
+    sock: socket.socket
+    subscription: List[str]
+
+
+class HandoffState():
+    """The sockets a process starts with, instead of opening them itself.
+    """
+
+    def __init__(self):
+        self.listeners: Dict[str, socket.socket] = {}
+        self.clients: Dict[str, List[AdoptedClient]] = {}
+        self.activated: Set[str] = set()
+
+    def close(self) -> None:
+        """Closes the sockets that weren't adopted by a network.
+        """
+
+        for listener in self.listeners.values():
+            listener.close()
+
+        for clients in self.clients.values():
+            for client in clients:
+                client.sock.close()
+
+        self.listeners.clear()
+        self.clients.clear()
+
+
+def socket_address(sock: socket.socket) -> str:
+    """Returns the address a listening socket is bound to, like the address of a network.
+
+    Args:
+        sock (socket.socket): The listening socket.
+
+    Returns:
+        str: The address, as host:port, or the path of a Unix socket.
+    """
+
+    address = sock.getsockname()
+
+    if isinstance(address, tuple):
+        return "{0}:{1}".format(address[0], address[1])
+
+    return address.decode() if isinstance(address, bytes) else address
+
+
+def send_fds(sock: socket.socket, data: bytes, fds: List[int]) -> None:
+    """Sends a message along with file descriptors over a Unix socket.
+
+    Args:
+        sock (socket.socket): The Unix socket.
+        data (bytes): The message.
+        fds (List[int]): The file descriptors.
+    """
+
+    sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))] if fds else [])
+
+
+def recv_fds(sock: socket.socket) -> Tuple[bytes, List[int]]:
+    """Receives a message along with file descriptors over a Unix socket.
+
+    Args:
+        sock (socket.socket): The Unix socket.
+
+    Returns:
+        Tuple[bytes, List[int]]: The message and the file descriptors.
+    """
+
+    fds = array.array("i")
+    data, ancdata, _, _ = sock.recvmsg(consts.HANDOFF_MAX_MESSAGE, socket.CMSG_SPACE(consts.HANDOFF_MAX_FDS * fds.itemsize))
+
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+
+    return data, list(fds)
+
+
+def inherited_sockets(state: HandoffState) -> None:
+    """Adds the listening sockets passed by systemd socket activation, see sd_listen_fds(3).
+
+    Args:
+        state (HandoffState): The state to add the sockets to.
+    """
+
+    if os.environ.get("LISTEN_PID") != str(os.getpid()):
+        return
+
+    count = int(os.environ.get("LISTEN_FDS", "0"))
+
+    # Child processes shouldn't take the sockets as well
+    for name in ("LISTEN_PID", "LISTEN_FDS", "LISTEN_FDNAMES"):
+        os.environ.pop(name, None)
+
+    for fd in range(consts.LISTEN_FDS_START, consts.LISTEN_FDS_START + count):
+        sock = socket.socket(fileno=fd)
+        address = socket_address(sock)
+        state.listeners[address] = sock
+        state.activated.add(address)
+
+
+def receive_handoff(path: str, timeout: float, state: HandoffState) -> None:
+    """Takes over the sockets of the process running on the handoff socket, if any.
+    When the handoff fails, the received sockets are closed and the process opens its own sockets.
+    This blocks, run it in a thread.
+
+    Args:
+        path (str): The path of the handoff socket.
+        timeout (float): The time to wait for the sockets, in seconds.
+        state (HandoffState): The state to add the received sockets to.
+    """
+
+    logger = logging.getLogger("__main__." + __name__)
+    received = HandoffState()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET) as sock:
+        sock.settimeout(timeout)
+
+        try:
+            sock.connect(path)
+        except OSError:
+            return
+
+        logger.info("Taking over the sockets of the running process")
+
+        try:
+            sock.sendall(consts.HANDOFF_REQUEST)
+            _receive_messages(sock, received)
+            sock.sendall(consts.HANDOFF_ACK)
+        except (OSError, ValueError, KeyError, TypeError, StopIteration) as e:
+            logger.error("Couldn't take over the sockets of the running process, opening new ones: %s", e)
+            received.close()
+            return
+
+    for address, listener in received.listeners.items():
+        if address in state.listeners:
+            listener.close()
+        else:
+            state.listeners[address] = listener
+
+    for network, clients in received.clients.items():
+        state.clients.setdefault(network, []).extend(clients)
+
+    logger.info("Took over %d listeners and %d clients", len(received.listeners), sum(len(clients) for clients in received.clients.values()))
+
+
+def _receive_messages(sock: socket.socket, received: HandoffState) -> None:
+    """Receives the handoff messages, up to the last one.
+
+    Args:
+        sock (socket.socket): The connection with the running process.
+        received (HandoffState): The state to add the received sockets to, right away so they're closed on a failure.
+
+    Raises:
+        ConnectionError: When the running process went away without handing over.
+    """
+
+    while True:
+        data, fds = recv_fds(sock)
+        sockets = iter([socket.socket(fileno=fd) for fd in fds])
+
+        try:
+            if not data:
+                raise ConnectionError("The running process closed the handoff socket")
+
+            message = json.loads(data)
+
+            for address in message["listeners"]:
+                received.listeners[address] = next(sockets)
+
+            for client in message["clients"]:
+                received.clients.setdefault(client["network"], []).append(AdoptedClient(next(sockets), client["subscription"]))
+        finally:
+            # Sockets that aren't listed in the message
+            for unused in sockets:
+                unused.close()
+
+        if message["done"]:
+            return
+
+
+class HandoffServer():
+    """Hands the listening sockets and client connections of the running process to a new process, on request.
+    """
+
+    def __init__(self, path: str, network_manager: "NetworkManager", on_handoff: Callable[[], Any], timeout: float = consts.HANDOFF_TIMEOUT):
+        """Initialises the handoff server.
+
+        Args:
+            path (str): The path of the handoff socket.
+            network_manager (NetworkManager): The networks to hand over.
+            on_handoff (Callable[[], Any]): Called once everything is handed over, to stop the process.
+            timeout (float): The time to wait for the new process to take the sockets, in seconds.
+        """
+
+        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
+        self.__path: str = path
+        self.__network_manager: "NetworkManager" = network_manager
+        self.__on_handoff: Callable[[], Any] = on_handoff
+        self.__timeout: float = timeout
+        self.__sock: Optional[socket.socket] = None
+        self.__task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Starts listening for a new process on the handoff socket.
+        """
+
+        # Replace the socket file of the previous process
+        try:
+            if stat.S_ISSOCK(os.stat(self.__path).st_mode):
+                os.remove(self.__path)
+        except FileNotFoundError:
+            pass
+
+        self.__sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.__sock.bind(self.__path)
+        os.chmod(self.__path, 0o600)
+        self.__sock.listen(1)
+        self.__sock.setblocking(False)
+        self.__task = asyncio.create_task(self.__serve(self.__sock))
+
+    def stop(self) -> None:
+        """Stops listening on the handoff socket.
+        """
+
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+        if self.__sock is not None:
+            self.__sock.close()
+            self.__sock = None
+
+    async def __serve(self, sock: socket.socket) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            connection, _ = await loop.sock_accept(sock)
+
+            with connection:
+                if await loop.sock_recv(connection, len(consts.HANDOFF_REQUEST)) != consts.HANDOFF_REQUEST:
+                    continue
+
+                self.__logger.info("Handing over to a new process")
+                listeners, clients = await self.__network_manager.handoff()
+
+                try:
+                    connection.settimeout(self.__timeout)
+                    await loop.run_in_executor(None, self.__send, connection, listeners, clients)
+                except OSError as e:
+                    # The networks still have their own listening sockets, and take back their clients
+                    self.__logger.error("Handing over to the new process failed, resuming: %s", e)
+                    await self.__network_manager.resume(clients)
+                    continue
+                finally:
+                    for listener in listeners.values():
+                        listener.close()
+
+                for _, client in clients:
+                    client.sock.close()
+
+            self.__logger.info("Handed over %d listeners and %d clients", len(listeners), len(clients))
+            self.__task = None
+            self.stop()
+            self.__on_handoff()
+            return
+
+    def __send(self, connection: socket.socket, listeners: Dict[str, socket.socket], clients: List[Tuple[str, AdoptedClient]]) -> None:
+        """Sends the sockets in messages of a limited amount of sockets each, and waits for the new process to take them.
+        This blocks.
+
+        Args:
+            connection (socket.socket): The connection with the new process.
+            listeners (Dict[str, socket.socket]): The listening sockets, per network address.
+            clients (List[Tuple[str, AdoptedClient]]): The client connections, with the address of their network.
+        """
+
+        entries: List[Tuple[str, Any, socket.socket]] = [("listeners", address, listener) for address, listener in listeners.items()]
+        entries += [("clients", {"network": network, "subscription": client.subscription}, client.sock) for network, client in clients]
+
+        while True:
+            chunk, entries = entries[:consts.HANDOFF_MAX_FDS], entries[consts.HANDOFF_MAX_FDS:]
+            message: Dict[str, Any] = {"listeners": [], "clients": [], "done": not entries}
+
+            # The listeners are listed first, so the sockets are in the same order as the entries
+            for kind, entry, _ in chunk:
+                message[kind].append(entry)
+
+            send_fds(connection, json.dumps(message).encode(), [sock.fileno() for _, _, sock in chunk])
+
+            if not entries:
+                break
+
+        if connection.recv(len(consts.HANDOFF_ACK)) != consts.HANDOFF_ACK:
+            raise ConnectionError("The new process didn't take the sockets")
@@ -1,39 +1,226 @@
 import asyncio
+import functools
+import os
+import socket
+import stat
 import ssl
 import logging
-from typing import List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, cast
+from velbustcp.lib import consts
 from velbustcp.lib.connection.tcp.client import Client
 from velbustcp.lib.connection.tcp.clientconnection import ClientConnection
+from velbustcp.lib.connection.tcp.handoff import AdoptedClient
+from velbustcp.lib.connection.tcp.worker import Worker
 from velbustcp.lib.settings.network import NetworkSettings
-from velbustcp.lib.signals import on_client_close
+from velbustcp.lib.events import EventBus, Subscription
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetfilter import FilterIndex, PacketFilter
+from velbustcp.lib.util.histogram import Histogram
+from velbustcp.lib.util.tokenbucket import TokenBucket
+
+
+class Handshake(asyncio.Protocol):
+    """Holds an accepted connection until the network starts its TLS handshake.
+    """
+
+    __slots__ = ("__callback",)
+
+    def __init__(self, callback: Callable[[asyncio.Transport], None]):
+        """Initialises the protocol.
+
+        Args:
+            callback (Callable[[asyncio.Transport], None]): Called with the transport of the accepted connection.
+        """
+
+        self.__callback: Callable[[asyncio.Transport], None] = callback
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        transport = cast(asyncio.Transport, transport)
+
+        # Leave the client hello for the TLS handshake
+        transport.pause_reading()
+        self.__callback(transport)
+
+
+class TimedSSLObject(ssl.SSLObject):
+    """TLS connection state that measures the CPU time spent in its handshake.
+    The event loop runs each step of the handshake synchronously, so the thread's CPU time covers just the handshake.
+    """
+
+    handshake_time: float = 0.0  # The CPU time spent in the handshake so far, in seconds
+
+    def do_handshake(self) -> None:
+        started = time.thread_time()
+
+        try:
+            super().do_handshake()
+        finally:
+            self.handshake_time += time.thread_time() - started
+
+
+class HandshakeBuffer(asyncio.BufferedProtocol):
+    """Takes the place of a client during its TLS handshake.
+    Data sent along with the end of the handshake is kept until the client is started, and handed to it then.
+    """
+
+    __slots__ = ("__client", "__data")
+
+    def __init__(self, client: Client):
+        """Initialises the protocol.
+
+        Args:
+            client (Client): The client the connection is handed to once the handshake completes.
+        """
+
+        self.__client: Client = client
+        self.__data: bytearray = bytearray()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.__client.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.__data.extend(self.__client.get_buffer(nbytes)[:nbytes])
+
+    def start(self, transport: asyncio.Transport) -> None:
+        """Hands the connection to the client, followed by the data received so far.
+
+        Args:
+            transport (asyncio.Transport): The TLS transport of the connection.
+        """
+
+        transport.set_protocol(self.__client)
+        self.__client.connection_made(transport)
+
+        data = memoryview(self.__data)
+
+        while data:
+            buffer = self.__client.get_buffer(len(data))
+            size = min(len(buffer), len(data))
+            buffer[:size] = data[:size]
+            data = data[size:]
+            self.__client.buffer_updated(size)
 
 
 class Network:
 
-    def __init__(self, options: NetworkSettings):
+    def __init__(self, options: NetworkSettings, events: EventBus):
         """Initialises a TCP network.
 
         Args:
             options (NetworkSettings): The options used to configure the network.
+            events (EventBus): The events shared with the clients of the network.
         """
 
         self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
-        self.__clients: List[Client] = []
+        self.__clients: Set[Client] = set()
+        self.__pending: Set[Client] = set()
+        self.__index: FilterIndex[Client] = FilterIndex()
+        self.__events: EventBus = events
+        self.__subscriptions: List[Subscription] = []
         self.__options: NetworkSettings = options
+        self.__connection: ClientConnection = self.__create_connection()
+        self.__accept_bucket: Optional[TokenBucket] = None
+        self.__handshakes: Set[asyncio.Task[None]] = set()
+        self.__handshake_time: Histogram = Histogram(consts.HANDSHAKE_CPU_BUCKETS)
+        self.__handshake_counts: Dict[str, int] = {"full": 0, "resumed": 0, "failed": 0, "refused": 0}
+        self.__reaper: Optional[asyncio.Task[None]] = None
+        self.__reaped: Dict[str, int] = {"idle": 0, "blocked": 0}
         self.__context: Optional[ssl.SSLContext] = None
         self.__server: Optional[asyncio.AbstractServer] = None
+        self.__workers: Dict[asyncio.AbstractEventLoop, Worker] = {}
+        self.__serving: Optional[asyncio.Future[None]] = None
+        self.__listener: Optional[socket.socket] = None
+        self.__owns_path: bool = True
+        self.__adopted_clients: List[AdoptedClient] = []
+        self.__adopted: Dict[Client, List[str]] = {}
+        self.__filters: Dict[Client, List[str]] = {}
         self.__is_active: bool = False  # New field to track server state
 
-        # Hook up signal
-        def handle_client_close(sender: Client, **kwargs):
-            self.__logger.info("TCP connection closed %s", sender.address())
+    def handle_client_open(self, client: Client) -> None:
+        if client.connection() is not self.__connection:
+            return
+
+        # Clients handed over by a previous process were admitted before
+        subscription = self.__adopted.pop(client, None)
+        reason = self.__refusal(client) if subscription is None else None
+
+        if reason is not None:
+            self.__logger.warning("Refused TCP connection %s: %s", client.address(), reason)
+            client.stop()
+            return
+
+        self.__clients.add(client)
+
+        # Packets are only relayed to clients once they're authorized
+        if client.is_authorized():
+            self.__index.add(client, self.__options.filter)
+        else:
+            self.__pending.add(client)
+
+        if subscription:
+            self.handle_client_control(client, consts.CONTROL_SUBSCRIBE, subscription)
+
+    def handle_client_authorize(self, client: Client) -> None:
+        if client not in self.__pending:
+            return
+
+        self.__pending.discard(client)
+        self.__index.add(client, self.__options.filter)
+
+    def handle_client_close(self, client: Client) -> None:
+        if client not in self.__clients:
+            return
+
+        self.__logger.info("TCP connection closed %s", client.address())
+        self.__clients.discard(client)
+        self.__pending.discard(client)
+        self.__filters.pop(client, None)
+        self.__index.remove(client)
+
+    def handle_client_control(self, client: Client, command: str, arguments: List[str]) -> None:
+        if command != consts.CONTROL_SUBSCRIBE or client not in self.__clients:
+            return
+
+        try:
+            packet_filter = PacketFilter.parse_arguments(arguments)
+        except ValueError as e:
+            self.__logger.warning("Invalid subscription from client %s: %s", client.address(), e)
+            return
+
+        # Clients can only narrow down what the network relays
+        self.__index.add(client, self.__options.filter.intersect(packet_filter))
+        self.__filters[client] = arguments
+
+    def client_filter(self, client: Client) -> Optional[PacketFilter]:
+        """Returns the packets the given client receives from the network, with its subscription.
+
+        Args:
+            client (Client): The client.
+
+        Returns:
+            Optional[PacketFilter]: The packets the client receives, None if it isn't relayed to by this network.
+        """
+
+        if client not in self.__clients or client in self.__pending or not self.__options.relay:
+            return None
+
+        if client not in self.__filters:
+            return self.__options.filter
+
+        return self.__options.filter.intersect(PacketFilter.parse_arguments(self.__filters[client]))
+
+    def address(self) -> str:
+        """Returns the address the network listens on.
+
+        Returns:
+            str: The address, as host:port, or the path of the Unix socket.
+        """
 
-            if sender not in self.__clients:
-                return
+        if self.__options.unix:
+            return self.__options.unix
 
-            self.__clients.remove(sender)
-        self.handle_client_close = handle_client_close
-        on_client_close.connect(handle_client_close)
+        return "{0}:{1}".format(*self.__options.address)
 
     def is_active(self) -> bool:
         """Checks if the TCP server is active.
@@ -48,21 +235,157 @@ class Network:
         """
 
         if self.__options.ssl:
-            self.__context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-            self.__context.load_cert_chain(self.__options.cert, keyfile=self.__options.pk)
-
-        self.__server = await asyncio.start_server(
-            self.__handle_client,
-            self.__options.host,
-            self.__options.port,
-            ssl=self.__context
-        )
+            self.__context = self.__create_context(self.__options)
+
+        if self.__options.accept_rate:
+            self.__accept_bucket = TokenBucket(self.__options.accept_rate, self.__options.accept_burst)
+
+        self.__subscriptions = [
+            self.__events.client_open.subscribe(self.handle_client_open),
+            self.__events.client_authorize.subscribe(self.handle_client_authorize),
+            self.__events.client_close.subscribe(self.handle_client_close),
+            self.__events.client_control.subscribe(self.handle_client_control)
+        ]
+
+        if self.__options.idle_timeout or self.__options.write_timeout:
+            self.__reaper = asyncio.create_task(self.__reap())
+
+        if self.__listener is None:
+            self.__listener = self.__create_listener()
+
+        loop = asyncio.get_running_loop()
+
+        # Every worker accepts on its own copy of the listening socket
+        for number in range(self.__options.workers):
+            worker = Worker("{0}-worker-{1}".format(self.address(), number), self.__events)
+            self.__workers[worker.loop] = worker
+            await worker.start(self.__create_protocol_factory(worker.events), self.__listener)
+
+        if not self.__workers:
+            await self.__create_server()
 
+        await self.__adopt_clients()
+
+        self.__serving = loop.create_future()
         self.__is_active = True  # Set to True when the server starts
-        self.__logger.info(f"Listening to TCP connections on {self.__options.address} [SSL:{self.__options.ssl}] [AUTH:{self.__options.auth}]")
+        self.__logger.info(
+            f"Listening to TCP connections on {self.address()} [SSL:{self.__options.ssl}] [AUTH:{self.__options.auth}] "
+            f"[WORKERS:{self.__options.workers}]"
+        )
+
+        await self.__serving
+
+    async def __create_server(self) -> None:
+        """Accepts connections on the loop of the bridge, when there are no workers.
+        """
+
+        assert self.__listener is not None
+        loop = asyncio.get_running_loop()
+
+        if self.__options.unix:
+            self.__server = await loop.create_unix_server(self.__create_protocol_factory(self.__events), sock=self.__listener.dup())
+        else:
+            self.__server = await loop.create_server(self.__create_protocol_factory(self.__events), sock=self.__listener.dup())
+
+    def adopt(self, listener: Optional[socket.socket], clients: List[AdoptedClient], activated: bool = False) -> None:
+        """Lets the network start with the sockets of another process, instead of opening its own.
+
+        Args:
+            listener (Optional[socket.socket]): The listening socket, None to open one.
+            clients (List[AdoptedClient]): The client connections handed over by a previous process.
+            activated (bool): Whether the listening socket was passed by systemd, which then owns its socket file.
+        """
+
+        self.__listener = listener
+        self.__adopted_clients = clients
+        self.__owns_path = not activated
+
+    async def __adopt_clients(self) -> None:
+        """Serves the client connections handed over by a previous process, spread over the workers if any.
+        """
+
+        workers = list(self.__workers.values())
+
+        for number, adopted in enumerate(self.__adopted_clients):
+            worker = workers[number % len(workers)] if workers else None
+            client = Client(self.__connection, self.__events if worker is None else worker.events, authorized=True)
+            self.__adopted[client] = adopted.subscription
+
+            try:
+                if worker is None:
+                    await self.__connect_accepted(client, adopted.sock)
+                else:
+                    await worker.call(self.__connect_accepted(client, adopted.sock))
+            except OSError as e:
+                self.__logger.warning("Couldn't take over client connection: %s", e)
+                self.__adopted.pop(client, None)
+                adopted.sock.close()
+
+        self.__adopted_clients = []
+
+    async def __connect_accepted(self, client: Client, sock: socket.socket) -> None:
+        await asyncio.get_running_loop().connect_accepted_socket(lambda: client, sock)
+
+    async def handoff(self) -> Tuple[Optional[socket.socket], List[AdoptedClient]]:
+        """Stops accepting connections and detaches the authorized clients, to hand them over to a new process.
+        Clients using TLS and clients that didn't authorize yet are left to be closed, and have to reconnect.
+
+        Returns:
+            Tuple[Optional[socket.socket], List[AdoptedClient]]: Copies of the listening socket and the client connections.
+        """
 
-        async with self.__server:
-            await self.__server.serve_forever()
+        listener = self.__listener.dup() if self.__listener is not None else None
+
+        # The new process takes over the socket file as well
+        self.__owns_path = False
+
+        if self.__server is not None:
+            self.__server.close()
+
+        for worker in self.__workers.values():
+            await worker.stop_serving()
+
+        clients: List[AdoptedClient] = []
+
+        for client in list(self.__clients):
+            if not client.is_active():
+                continue
+
+            subscription = self.__filters.get(client, [])
+            owner = self.__workers.get(cast(asyncio.AbstractEventLoop, client.loop()))
+            sock = client.detach() if owner is None else await owner.call(self.__detach(client))
+
+            if sock is not None:
+                clients.append(AdoptedClient(sock, subscription))
+
+        return listener, clients
+
+    async def __detach(self, client: Client) -> Optional[socket.socket]:
+        return client.detach()
+
+    async def resume(self, clients: List[AdoptedClient]) -> None:
+        """Accepts connections again and serves the detached clients again, after a failed handoff.
+
+        Args:
+            clients (List[AdoptedClient]): The client connections that were detached by the handoff.
+        """
+
+        if self.__listener is None:
+            for adopted in clients:
+                adopted.sock.close()
+            return
+
+        self.__owns_path = True
+
+        for worker in self.__workers.values():
+            await worker.serve(self.__create_protocol_factory(worker.events), self.__listener)
+
+        if not self.__workers:
+            await self.__create_server()
+
+        self.__adopted_clients = clients
+        await self.__adopt_clients()
+        self.__logger.info("Resumed TCP connection %s", self.address())
 
     async def stop(self) -> None:
         """Stops the TCP server
@@ -73,32 +396,335 @@ class Network:
             await self.__server.wait_closed()
             self.__server = None
 
-        for client in self.__clients:
-            await client.stop()
+        if self.__reaper is not None:
+            self.__reaper.cancel()
+            self.__reaper = None
+
+        for client in list(self.__clients):
+            client.stop()
+
+        for adopted in self.__adopted_clients:
+            adopted.sock.close()
+        self.__adopted_clients = []
+        self.__adopted.clear()
+
+        # Stopping the workers cancels their handshakes as well
+        for worker in self.__workers.values():
+            await worker.stop()
+        self.__workers.clear()
+
+        for task in list(self.__handshakes):
+            task.cancel()
+
+        if self.__serving is not None:
+            self.__serving.cancel()
+            self.__serving = None
+
+        if self.__listener is not None:
+            self.__listener.close()
+            self.__listener = None
 
         self.__clients.clear()
+        self.__pending.clear()
+        self.__filters.clear()
+        self.__index = FilterIndex()
+
+        for subscription in self.__subscriptions:
+            subscription.cancel()
+        self.__subscriptions.clear()
+
+        if self.__options.unix and self.__owns_path:
+            self.__remove_unix_socket()
+
+        self.__owns_path = True
         self.__is_active = False  # Set to False when the server stops
-        self.__logger.info("Stopped TCP connection %s", self.__options.address)
+        self.__logger.info("Stopped TCP connection %s", self.address())
+
+    def reconfigure(self, options: NetworkSettings) -> bool:
+        """Applies new options to the running network, without disconnecting its clients.
+        Connected clients keep their authorization, the new options apply to what they do next.
 
-    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        """Handles a new client connection
+        Args:
+            options (NetworkSettings): The new options of the network.
+
+        Returns:
+            bool: Whether the options were applied, False if the network has to be restarted for them.
+
+        Raises:
+            OSError: When the certificate or private key can't be loaded, the network is left unchanged then.
+        """
+
+        if any(getattr(options, name) != getattr(self.__options, name) for name in consts.RESTART_SETTINGS):
+            return False
+
+        # Renewed certificates are loaded before anything changes, so a bad one leaves the network as it was.
+        # The next handshakes use the new context, sessions of the old one can't be resumed.
+        context = self.__create_context(options) if self.__context is not None else None
+
+        self.__options = options
+        self.__configure_connection(self.__connection)
+
+        # The shared rate limit is adjusted in place, enabling or disabling it applies to new clients
+        bucket = self.__connection.network_bucket
+        if bucket is not None and options.network_rate:
+            bucket.rate = options.network_rate
+            bucket.burst = max(options.network_burst, 1)
+        else:
+            self.__connection.network_bucket = TokenBucket(options.network_rate, options.network_burst) if options.network_rate else None
+
+        self.__accept_bucket = TokenBucket(options.accept_rate, options.accept_burst) if options.accept_rate else None
+
+        if context is not None:
+            self.__context = context
+
+        if self.__is_active and self.__reaper is None and (options.idle_timeout or options.write_timeout):
+            self.__reaper = asyncio.create_task(self.__reap())
+        elif self.__reaper is not None and not (options.idle_timeout or options.write_timeout):
+            self.__reaper.cancel()
+            self.__reaper = None
+
+        # Narrow down or widen what the authorized clients receive, keeping their own subscriptions
+        for client in self.__clients - self.__pending:
+            self.__index.add(client, options.filter)
+
+            if client in self.__filters:
+                self.handle_client_control(client, consts.CONTROL_SUBSCRIBE, self.__filters[client])
+
+        self.__logger.info("Reconfigured TCP connection %s", self.address())
+        return True
+
+    def __create_listener(self) -> socket.socket:
+        """Creates the listening socket of the network.
+
+        Returns:
+            socket.socket: The listening socket.
+        """
+
+        if self.__options.unix:
+            return self.__create_unix_socket()
+
+        family = socket.AF_INET6 if ":" in self.__options.host else socket.AF_INET
+        return socket.create_server(self.__options.address, family=family)
+
+    def __create_unix_socket(self) -> socket.socket:
+        """Creates the listening Unix socket of the network, replacing the socket file of a previous run.
+
+        Returns:
+            socket.socket: The listening socket.
+        """
+
+        self.__remove_unix_socket()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.__options.unix)
+        os.chmod(self.__options.unix, self.__options.unix_mode)
+        sock.listen(100)
+        sock.setblocking(False)
+        return sock
+
+    def __remove_unix_socket(self) -> None:
+        """Removes the socket file of the network, if any.
+        """
+
+        try:
+            if stat.S_ISSOCK(os.stat(self.__options.unix).st_mode):
+                os.remove(self.__options.unix)
+        except FileNotFoundError:
+            pass
+
+    def __create_connection(self) -> ClientConnection:
+        """Creates the options shared by the clients of the network.
         """
 
         connection = ClientConnection()
-        connection.reader = reader
-        connection.writer = writer
+        self.__configure_connection(connection)
+
+        if self.__options.network_rate:
+            connection.network_bucket = TokenBucket(self.__options.network_rate, self.__options.network_burst)
+
+        return connection
+
+    def __configure_connection(self, connection: ClientConnection) -> None:
+        """Sets the options shared by the clients of the network, connected clients read them as they go.
+
+        Args:
+            connection (ClientConnection): The shared options to set.
+        """
+
         connection.should_authorize = self.__options.auth
         connection.authorization_key = self.__options.auth_key
+        connection.auth_timeout = self.__options.auth_timeout
+        connection.queue_size = self.__options.queue_size
+        connection.overflow = self.__options.overflow
+        connection.coalesce_window = self.__options.coalesce_window
+        connection.framed = self.__options.framed
+        connection.policy = self.__options.policy
+        connection.rate = self.__options.client_rate
+        connection.burst = self.__options.client_burst
+        connection.rate_policy = self.__options.rate_policy
+        connection.keepalive_idle = self.__options.keepalive_idle
+        connection.keepalive_interval = self.__options.keepalive_interval
+        connection.keepalive_count = self.__options.keepalive_count
+
+    def __refusal(self, client: Client) -> Optional[str]:
+        """Checks the admission limits of the network for a new client.
+
+        Args:
+            client (Client): The newly connected client.
+
+        Returns:
+            Optional[str]: Why the client is refused, None if it's admitted.
+        """
+
+        if self.__options.max_clients and len(self.__clients) >= self.__options.max_clients:
+            return "maximum amount of clients reached"
+
+        if not client.is_authorized() and self.__options.max_pending and len(self.__pending) >= self.__options.max_pending:
+            return "maximum amount of authorizing clients reached"
+
+        if self.__accept_bucket is not None and not self.__accept_bucket.take():
+            return "accept rate exceeded"
+
+        return None
+
+    async def __reap(self) -> None:
+        """Periodically disconnects the clients that nothing was exchanged with for too long, or don't read what's written to them.
+        """
+
+        while True:
+            await asyncio.sleep(consts.REAP_INTERVAL)
+
+            # Read on every pass, so reloaded timeouts apply right away
+            idle_timeout = self.__options.idle_timeout
+            write_timeout = self.__options.write_timeout
+
+            for client in list(self.__clients):
+                if idle_timeout and client.idle() > idle_timeout:
+                    self.__logger.warning("Nothing was exchanged with client %s for %.0f seconds, disconnecting", client.address(), client.idle())
+                    self.__reaped["idle"] += 1
+                elif write_timeout and client.blocked() > write_timeout:
+                    self.__logger.warning("Client %s read nothing for %.0f seconds, disconnecting", client.address(), client.blocked())
+                    self.__reaped["blocked"] += 1
+                else:
+                    continue
+
+                # Leave the fan-out right away, clients of workers are stopped on the worker's loop
+                self.handle_client_close(client)
+                client.stop()
+
+    def __create_protocol_factory(self, events: EventBus) -> Callable[[], asyncio.BaseProtocol]:
+        """Creates the protocol factory of accepted connections.
+
+        Args:
+            events (EventBus): The events the clients emit on, either the bridge's or a worker's.
+        """
+
+        if self.__context is None:
+            return functools.partial(self.__create_client, events)
+
+        # TLS handshakes are done by the network itself, so it can limit and measure them
+        return functools.partial(self.__create_handshake, events)
+
+    def __create_client(self, events: EventBus) -> Client:
+        """Creates the protocol of a new client connection, it registers once the connection is made.
+
+        Args:
+            events (EventBus): The events the client emits on.
+        """
+
+        return Client(self.__connection, events)
+
+    def __create_context(self, options: NetworkSettings) -> ssl.SSLContext:
+        """Creates the TLS context of the network.
+        Sessions are resumed through the server side session cache of OpenSSL, and session tickets unless disabled.
+
+        Args:
+            options (NetworkSettings): The options of the network.
+
+        Raises:
+            OSError: When the certificate or private key can't be loaded, ssl.SSLError is a subclass of it.
+        """
+
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(options.cert, keyfile=options.pk)
+        context.num_tickets = options.tls_tickets
+        context.sslobject_class = TimedSSLObject
+
+        if not options.tls_tickets:
+            context.options |= ssl.OP_NO_TICKET
+
+        return context
+
+    def __create_handshake(self, events: EventBus) -> Handshake:
+        """Creates the protocol of a new TLS connection, the client is created once the handshake completes.
+
+        Args:
+            events (EventBus): The events the client emits on.
+        """
+
+        return Handshake(functools.partial(self.__start_handshake, events))
+
+    def __start_handshake(self, events: EventBus, transport: asyncio.Transport) -> None:
+        """Starts the TLS handshake of an accepted connection, unless too many are in progress.
+
+        Args:
+            events (EventBus): The events the client emits on.
+            transport (asyncio.Transport): The transport of the accepted connection.
+        """
+
+        if self.__options.max_handshakes and len(self.__handshakes) >= self.__options.max_handshakes:
+            self.__logger.warning("Refused TCP connection %s: maximum amount of TLS handshakes reached", transport.get_extra_info("peername"))
+            self.__handshake_counts["refused"] += 1
+            transport.close()
+            return
+
+        task = asyncio.create_task(self.__handshake(events, transport))
+        self.__handshakes.add(task)
+        task.add_done_callback(self.__handshakes.discard)
+
+    async def __handshake(self, events: EventBus, transport: asyncio.Transport) -> None:
+        """Performs the TLS handshake of an accepted connection and hands the connection to a new client.
+
+        Args:
+            events (EventBus): The events the client emits on.
+            transport (asyncio.Transport): The transport of the accepted connection.
+        """
+
+        client = self.__create_client(events)
+        protocol = HandshakeBuffer(client)
+
+        try:
+            tls_transport = await asyncio.get_running_loop().start_tls(
+                transport,
+                protocol,
+                cast(ssl.SSLContext, self.__context),
+                server_side=True,
+                ssl_handshake_timeout=self.__options.handshake_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self.__logger.warning("TLS handshake with %s failed: %s", transport.get_extra_info("peername"), e)
+            self.__handshake_counts["failed"] += 1
+            transport.close()
+            return
+
+        if tls_transport is None:
+            return
+
+        ssl_object = tls_transport.get_extra_info("ssl_object")
+        self.__handshake_counts["resumed" if ssl_object is not None and ssl_object.session_reused else "full"] += 1
 
-        client = Client(connection)
-        self.__clients.append(client)
-        await client.start()
+        if isinstance(ssl_object, TimedSSLObject):
+            self.__handshake_time.add(ssl_object.handshake_time)
 
-    async def send(self, data: bytearray) -> None:
-        """Sends given data to all connected clients to the network.
+        # The client may have disconnected right after the handshake
+        if not tls_transport.is_closing():
+            protocol.start(tls_transport)
+
+    def send(self, envelope: Envelope) -> None:
+        """Sends given packet to all connected clients to the network, except the client it came from.
 
         Args:
-            data (bytearray): Specifies the packet to send to the connected clients of this network.
+            envelope (Envelope): Specifies the packet to send to the connected clients of this network.
         """
 
         if not self.is_active():
@@ -108,7 +734,71 @@ class Network:
             return
 
         if self.__logger.isEnabledFor(logging.DEBUG):  # pragma: no cover
-            self.__logger.debug("[TCP OUT] %s", " ".join(hex(x) for x in data))
+            self.__logger.debug("[TCP OUT] %s", " ".join(hex(x) for x in envelope.packet))
+
+        if self.__workers:
+            self.__publish(envelope)
+            return
+
+        for client in self.__index.match(envelope.packet):
+            if client is not envelope.origin:
+                client.relay(envelope)
+
+    def __publish(self, envelope: Envelope) -> None:
+        """Hands the packet to each worker once, with the clients of the worker it should be relayed to.
+
+        Args:
+            envelope (Envelope): The packet to relay.
+        """
+
+        batches: Dict[Optional[asyncio.AbstractEventLoop], List[Client]] = {}
+
+        for client in self.__index.match(envelope.packet):
+            if client is not envelope.origin:
+                batches.setdefault(client.loop(), []).append(client)
+
+        for loop, clients in batches.items():
+            worker = self.__workers.get(cast(asyncio.AbstractEventLoop, loop))
+
+            if worker is not None:
+                worker.publish(envelope, clients)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the outbound queue statistics of the connected clients.
+
+        Returns:
+            Dict[str, Any]: The statistics per client address.
+        """
+
+        return {str(client.address()): client.stats() for client in self.__clients}
+
+    def network_stats(self) -> Dict[str, Any]:
+        """Returns statistics about the network itself.
+
+        Returns:
+            Dict[str, Any]: The amount of reaped clients, and the TLS handshake statistics if the network uses TLS.
+        """
+
+        stats: Dict[str, Any] = {"reaped": dict(self.__reaped)}
+        handshakes = self.handshake_stats()
+
+        if handshakes is not None:
+            stats["handshakes"] = handshakes
+
+        return stats
+
+    def handshake_stats(self) -> Optional[Dict[str, Any]]:
+        """Returns statistics about the TLS handshakes of the network.
+
+        Returns:
+            Optional[Dict[str, Any]]: The amount of full, resumed, failed and refused handshakes, the amount in progress
+                and a histogram of the CPU time of the completed ones, None if the network doesn't use TLS.
+        """
+
+        if not self.__options.ssl:
+            return None
 
-        tasks = [client.send(data) for client in self.__clients]
-        await asyncio.gather(*tasks)
+        stats: Dict[str, Any] = dict(self.__handshake_counts)
+        stats["active"] = len(self.__handshakes)
+        stats["cpu_time"] = self.__handshake_time.stats()
+        return stats
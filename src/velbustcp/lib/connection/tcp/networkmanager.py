@@ -1,8 +1,15 @@
 import logging
-from typing import List
+import socket
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
 import asyncio
 
+from velbustcp.lib.connection.tcp.client import Client
+from velbustcp.lib.connection.tcp.handoff import AdoptedClient, HandoffState
 from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.settings.network import NetworkSettings
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetfilter import PacketFilter
 
 
 class NetworkManager:
@@ -10,16 +17,48 @@ class NetworkManager:
     def __init__(self) -> None:
         self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
         self.__networks: List[Network] = []
+        self.__tasks: Dict[Network, "asyncio.Task[None]"] = {}
+        self.__reloaded: Set[Network] = set()
+        self.__reload_lock: asyncio.Lock = asyncio.Lock()
+        self.__reload_done: Optional["asyncio.Future[None]"] = None
 
     def add_network(self, network: Network):
         self.__networks.append(network)
 
     async def start(self):
-        """Starts all available networks.
+        """Starts all available networks, and serves them until they're stopped.
+        Networks started by a reload are served as well.
         """
 
-        tasks = [network.start() for network in self.__networks]
-        await asyncio.gather(*tasks)
+        for network in self.__networks:
+            self.__tasks[network] = asyncio.create_task(network.start())
+
+        while self.__tasks:
+            # Also woken up by a reload, to watch the networks it started
+            self.__reload_done = asyncio.get_running_loop().create_future()
+            done, _ = await asyncio.wait([*self.__tasks.values(), self.__reload_done], return_when=asyncio.FIRST_COMPLETED)
+            self.__reload_done.cancel()
+
+            for network, task in list(self.__tasks.items()):
+                if task not in done:
+                    continue
+
+                del self.__tasks[network]
+                reloaded = network in self.__reloaded
+                self.__reloaded.discard(network)
+
+                if task.cancelled() or task.exception() is None:
+                    continue
+
+                # A network that fails to start on a reload shouldn't take down the others
+                if not reloaded:
+                    raise cast(BaseException, task.exception())
+
+                self.__logger.error("Couldn't start TCP network %s: %s", network.address(), task.exception())
+                await network.stop()
+
+                if network in self.__networks:
+                    self.__networks.remove(network)
 
     async def stop(self):
         """Stops all connected networks.
@@ -28,12 +67,154 @@ class NetworkManager:
         tasks = [network.stop() for network in self.__networks]
         await asyncio.gather(*tasks)
 
-    async def send(self, packet: bytearray):
+    def adopt(self, state: HandoffState) -> None:
+        """Lets the networks start with the sockets passed by systemd or handed over by a previous process.
+        Sockets that don't belong to any network are closed.
+
+        Args:
+            state (HandoffState): The passed sockets.
+        """
+
+        for network in self.__networks:
+            address = network.address()
+            network.adopt(state.listeners.pop(address, None), state.clients.pop(address, []), address in state.activated)
+
+        for address in state.listeners:
+            self.__logger.warning("No network for passed listening socket %s, closing it", address)
+
+        state.close()
+
+    async def handoff(self) -> Tuple[Dict[str, socket.socket], List[Tuple[str, AdoptedClient]]]:
+        """Stops accepting connections on all networks and detaches their clients, to hand them over to a new process.
+
+        Returns:
+            Tuple[Dict[str, socket.socket], List[Tuple[str, AdoptedClient]]]: The listening sockets per network address,
+                and the client connections with the address of their network.
+        """
+
+        listeners: Dict[str, socket.socket] = {}
+        clients: List[Tuple[str, AdoptedClient]] = []
+
+        for network in self.__networks:
+            listener, adopted = await network.handoff()
+
+            if listener is not None:
+                listeners[network.address()] = listener
+
+            clients += [(network.address(), client) for client in adopted]
+
+        return listeners, clients
+
+    async def resume(self, clients: List[Tuple[str, AdoptedClient]]) -> None:
+        """Lets the networks accept connections and serve their detached clients again, after a failed handoff.
+
+        Args:
+            clients (List[Tuple[str, AdoptedClient]]): The client connections detached by the handoff, with the address of their network.
+        """
+
+        for network in self.__networks:
+            await network.resume([client for address, client in clients if address == network.address()])
+
+    async def reload(self, settings: List[NetworkSettings], events: EventBus) -> None:
+        """Applies new network settings to the running networks, networks are matched by their address.
+        Networks that are no longer configured are stopped, new ones are started and the others are reconfigured.
+        Only networks whose listening socket or wire format changed are restarted, which disconnects their clients.
+
+        Args:
+            settings (List[NetworkSettings]): The new settings of the networks.
+            events (EventBus): The events of the bridge, used by new networks.
+        """
+
+        async with self.__reload_lock:
+            running = {network.address(): network for network in self.__networks}
+            networks: List[Network] = []
+            added: List[Network] = []
+
+            for options in settings:
+                network = running.pop(self.__address(options), None)
+
+                if network is not None:
+                    try:
+                        reconfigured = network.reconfigure(options)
+                    except OSError as e:
+                        self.__logger.error("Couldn't reconfigure TCP network %s, keeping its current settings: %s", network.address(), e)
+                        reconfigured = True
+
+                    if reconfigured:
+                        networks.append(network)
+                        continue
+
+                    self.__logger.info("Restarting TCP network %s to apply its settings", network.address())
+                    await network.stop()
+
+                network = Network(options=options, events=events)
+                networks.append(network)
+                added.append(network)
+
+            for network in running.values():
+                self.__logger.info("Stopping TCP network %s, it's no longer configured", network.address())
+                await network.stop()
+
+            self.__networks = networks
+
+            for network in added:
+                self.__reloaded.add(network)
+                self.__tasks[network] = asyncio.create_task(network.start())
+
+            if self.__reload_done is not None and not self.__reload_done.done():
+                self.__reload_done.set_result(None)
+
+    @staticmethod
+    def __address(options: NetworkSettings) -> str:
+        """Returns the address a network with the given settings listens on, like Network.address().
+        """
+
+        if options.unix:
+            return options.unix
+
+        return "{0}:{1}".format(*options.address)
+
+    def send(self, envelope: Envelope) -> None:
         """Sends the given packet to all networks.
 
         Args:
-            packet (bytearray): The packet to send.
+            envelope (Envelope): The packet to send.
         """
 
-        tasks = [network.send(packet) for network in self.__networks]
-        await asyncio.gather(*tasks)
+        for network in self.__networks:
+            network.send(envelope)
+
+    def client_filter(self, client: Client) -> Optional[PacketFilter]:
+        """Returns the packets the given client receives from its network, with its subscription.
+
+        Args:
+            client (Client): The client.
+
+        Returns:
+            Optional[PacketFilter]: The packets the client receives, None if no network relays to it.
+        """
+
+        for network in self.__networks:
+            packet_filter = network.client_filter(client)
+            if packet_filter is not None:
+                return packet_filter
+
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the client statistics of all networks.
+
+        Returns:
+            Dict[str, Any]: The client statistics per client address, per network address.
+        """
+
+        return {network.address(): network.stats() for network in self.__networks}
+
+    def network_stats(self) -> Dict[str, Any]:
+        """Returns the statistics of the networks themselves.
+
+        Returns:
+            Dict[str, Any]: The network statistics, per network address.
+        """
+
+        return {network.address(): network.network_stats() for network in self.__networks}
@@ -0,0 +1,160 @@
+import asyncio
+import collections
+import functools
+import logging
+import socket
+import ssl
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Deque, List, Optional, Tuple, TypeVar
+
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+
+if TYPE_CHECKING:  # pragma: no cover
+    from velbustcp.lib.connection.tcp.client import Client
+
+T = TypeVar("T")
+
+
+class Worker:
+    """An event loop in its own thread, serving a share of the clients of a network.
+    Reading, writing and TLS encryption of its clients happen on the worker, off the loop that paces the bus.
+    """
+
+    def __init__(self, name: str, events: EventBus):
+        """Initialises the worker.
+
+        Args:
+            name (str): The name of the worker thread.
+            events (EventBus): The events of the bridge, the events of the worker's clients are forwarded to it.
+        """
+
+        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
+        self.__name: str = name
+        self.__loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, name=name, daemon=True)
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__relayed: Deque[Tuple[Envelope, List["Client"]]] = collections.deque()
+        self.__scheduled: bool = False
+
+        # The clients emit on the worker's own events, which are handled on the loop of the bridge
+        self.events: EventBus = EventBus()
+        main_loop = asyncio.get_running_loop()
+
+        for name in ("tcp_receive", "client_open", "client_authorize", "client_close", "client_control"):
+            forward = functools.partial(main_loop.call_soon_threadsafe, getattr(events, name).emit)
+            getattr(self.events, name).subscribe(forward)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.__loop
+
+    def __run(self) -> None:
+        asyncio.set_event_loop(self.__loop)
+
+        try:
+            self.__loop.run_forever()
+
+            # Let the remaining tasks of the clients finish their cancellation
+            tasks = asyncio.all_tasks(self.__loop)
+            for task in tasks:
+                task.cancel()
+
+            self.__loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self.__loop.close()
+
+    async def call(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Runs a coroutine on the worker's loop.
+
+        Args:
+            coroutine (Coroutine[Any, Any, T]): The coroutine to run.
+
+        Returns:
+            T: The result of the coroutine.
+        """
+
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.__loop))
+
+    async def start(self, protocol_factory: Callable[[], asyncio.BaseProtocol], sock: socket.socket, context: Optional[ssl.SSLContext] = None) -> None:
+        """Starts the worker thread and accepts connections on its own copy of the listening socket.
+
+        Args:
+            protocol_factory (Callable[[], asyncio.BaseProtocol]): Creates the protocol of an accepted connection.
+            sock (socket.socket): The listening socket of the network, shared by all of its workers.
+            context (Optional[ssl.SSLContext]): The TLS context of the accepted connections, if any.
+        """
+
+        self.__thread.start()
+        await self.serve(protocol_factory, sock, context)
+        self.__logger.info("Started worker %s", self.__name)
+
+    async def serve(self, protocol_factory: Callable[[], asyncio.BaseProtocol], sock: socket.socket, context: Optional[ssl.SSLContext] = None) -> None:
+        """Accepts connections on the worker's own copy of the listening socket, again after stop_serving.
+
+        Args:
+            protocol_factory (Callable[[], asyncio.BaseProtocol]): Creates the protocol of an accepted connection.
+            sock (socket.socket): The listening socket of the network, shared by all of its workers.
+            context (Optional[ssl.SSLContext]): The TLS context of the accepted connections, if any.
+        """
+
+        self.__server = await self.call(self.__loop_create_server(protocol_factory, sock.dup(), context))
+
+    async def __loop_create_server(self, protocol_factory: Callable[[], asyncio.BaseProtocol], sock: socket.socket,
+                                   context: Optional[ssl.SSLContext]) -> asyncio.AbstractServer:
+        if sock.family == getattr(socket, "AF_UNIX", None):
+            return await asyncio.get_running_loop().create_unix_server(protocol_factory, sock=sock)
+
+        return await asyncio.get_running_loop().create_server(protocol_factory, sock=sock, ssl=context)
+
+    async def stop(self) -> None:
+        """Stops accepting connections and stops the worker thread, the clients should be stopped beforehand.
+        """
+
+        if not self.__thread.is_alive():
+            return
+
+        await self.stop_serving()
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        await asyncio.get_running_loop().run_in_executor(None, self.__thread.join)
+        self.__logger.info("Stopped worker %s", self.__name)
+
+    async def stop_serving(self) -> None:
+        """Stops accepting connections, the clients of the worker are still served.
+        """
+
+        if self.__server is not None:
+            await self.call(self.__loop_close_server(self.__server))
+            self.__server = None
+
+    async def __loop_close_server(self, server: asyncio.AbstractServer) -> None:
+        server.close()
+
+    def publish(self, envelope: Envelope, clients: List["Client"]) -> None:
+        """Hands a packet to the worker, to be relayed to the given clients of the worker.
+        The worker is only woken up if it isn't already about to relay.
+
+        Args:
+            envelope (Envelope): The packet to relay.
+            clients (List[Client]): The clients of the worker to relay the packet to.
+        """
+
+        self.__relayed.append((envelope, clients))
+
+        if not self.__scheduled:
+            self.__scheduled = True
+            self.__loop.call_soon_threadsafe(self.__relay)
+
+    def __relay(self) -> None:
+        """Relays the published packets, on the worker's loop.
+        """
+
+        # Reset before draining, so packets published while draining either get drained now or schedule a new run
+        self.__scheduled = False
+        relayed = self.__relayed
+
+        while relayed:
+            envelope, clients = relayed.popleft()
+
+            for client in clients:
+                client.relay(envelope)
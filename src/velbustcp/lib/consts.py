@@ -8,18 +8,145 @@ COMMAND_BUS_OFF = 0x09
 COMMAND_BUS_ACTIVE = 0x0A
 COMMAND_BUS_BUFFERFULL = 0x0B
 COMMAND_BUS_BUFFERREADY = 0x0C
+COMMAND_MODULE_TYPE = 0xFF
+COMMAND_MODULE_SUBTYPE_2 = 0xA7
+COMMAND_MODULE_SUBTYPE = 0xB0
+COMMAND_MODULE_NAME_REQUEST = 0xEF
+COMMAND_MODULE_STATUS_REQUEST = 0xFA
+COMMAND_SET_DAYLIGHT_SAVING = 0xAF
+COMMAND_SET_REALTIME_DATE = 0xB7
+COMMAND_SET_REALTIME_CLOCK = 0xD8
+COMMAND_MODULE_NAME_PART1 = 0xF0
+COMMAND_MODULE_NAME_PART2 = 0xF1
+COMMAND_MODULE_NAME_PART3 = 0xF2
+MODULE_NAME_PARTS = [COMMAND_MODULE_NAME_PART1, COMMAND_MODULE_NAME_PART2, COMMAND_MODULE_NAME_PART3]
+
+# Status commands, mapped to whether or not their first data byte holds the channel
+COMMAND_SLIDER_STATUS = 0x0F
+COMMAND_DIMMER_CHANNEL_STATUS = 0xB8
+COMMAND_SENSOR_TEMPERATURE = 0xE6
+COMMAND_TEMP_SENSOR_STATUS = 0xEA
+COMMAND_BLIND_STATUS = 0xEC
+COMMAND_MODULE_STATUS = 0xED
+COMMAND_DIMMER_STATUS = 0xEE
+COMMAND_RELAY_STATUS = 0xFB
+STATUS_COMMANDS = {
+    COMMAND_SLIDER_STATUS: True,
+    COMMAND_DIMMER_CHANNEL_STATUS: True,
+    COMMAND_SENSOR_TEMPERATURE: False,
+    COMMAND_TEMP_SENSOR_STATUS: False,
+    COMMAND_BLIND_STATUS: True,
+    COMMAND_MODULE_STATUS: False,
+    COMMAND_DIMMER_STATUS: False,
+    COMMAND_RELAY_STATUS: True
+}
+
+ADDRESS_BROADCAST = 0x00
 
 MAX_BUFFER_LENGTH = 292  # 292 full-sized velbus-packets (14 bytes), so 4096 bytes.
+PARSER_BUFFER_SIZE = 10000  # Maximum amount of received bytes kept while looking for a packet
 
 # Magic packet numbers
 STX = 0x0F
 ETX = 0x04
 LENGTH_MASK = 0x0F
+RTR = 0x40              # Remote transmit request flag in the RTR+data length byte
 HEADER_LENGTH = 4       # Header: [STX, priority, address, RTR+data length]
 MAX_DATA_AMOUNT = 8     # Maximum amount of data bytes in a packet
 MIN_PACKET_LENGTH = 6   # Smallest possible packet: [STX, priority, address, RTR+data length, CRC, ETC]
 
+# Control lines, sent by TCP clients as newline-terminated text before their first packet
+MAX_CONTROL_LENGTH = 256
+CONTROL_SNAPSHOT = "SNAPSHOT"
+CONTROL_INVALIDATE = "INVALIDATE"
+CONTROL_SUBSCRIBE = "SUBSCRIBE"
+CONTROL_RESUME = "RESUME"
+CONTROL_STATS = "STATS"  # Answered with the statistics of the bridge, as a single line of JSON
+CONTROL_COMMANDS = [CONTROL_SNAPSHOT, CONTROL_INVALIDATE, CONTROL_SUBSCRIBE, CONTROL_RESUME, CONTROL_STATS]
+CONTROL_RESYNC = b"RESYNC\n"  # Sent to a resuming client when the missed packets are no longer kept
+
 # Serial
 SEND_DELAY = 0.05  # The minimum required time between consecutive bus writes, in seconds
 READ_DELAY = 0.01
+BUS_CAPACITY = 1 / SEND_DELAY  # The amount of packets the bus can carry, per second
+BUS_LOAD_WINDOW = 10.0  # Time constant of the measured bus load, in seconds
 PRODUCT_IDS = ['VID:PID=10CF:0B1B', 'VID:PID=10CF:0516', 'VID:PID=10CF:0517', 'VID:PID=10CF:0518', 'VID:PID=10CF:0B1C']
+
+# Latency
+LATENCY_TIMEOUT = 2.0  # Maximum time to wait for a module to respond to a request, in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0)  # Histogram bucket upper bounds, in seconds
+
+# Discovery
+DISCOVERY_RESPONSE_WINDOW = 1.0  # Time after which an unanswered module type request means there's no module, in seconds
+DISCOVERY_NEGATIVE_TTL = 10.0  # How long an address without a module is answered as empty, in seconds
+
+# Scheduler
+SCHEDULER_RESOLUTION = SEND_DELAY  # The duration of a single scheduler tick, in seconds
+
+# Poller
+POLLER_IDLE_DELAY = 5.0  # Time to wait before checking again when the bus has no spare capacity, in seconds
+
+# Clients
+CLIENT_READ_SIZE = 4096  # Size of the buffer a client's received data is read into
+
+# Client admission
+AUTH_TIMEOUT = 10.0  # Time a client gets to send its authorization key, in seconds, 0 for no limit
+MAX_PENDING_CLIENTS = 100  # Maximum amount of clients still authorizing per network, 0 for no limit
+MAX_CLIENTS = 0  # Maximum amount of clients per network, 0 for no limit
+ACCEPT_RATE = 0.0  # Maximum amount of accepted connections per second, 0 for no limit
+ACCEPT_BURST = 20  # Amount of connections that can be accepted at once before the accept rate applies
+
+# TLS handshakes
+TLS_TICKETS = 2  # Amount of TLS 1.3 session tickets sent after a full handshake, 0 to disable session tickets
+HANDSHAKE_TIMEOUT = 10.0  # Time a client gets to complete its TLS handshake, in seconds
+HANDSHAKE_CPU_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)  # Histogram bucket upper bounds of handshake CPU time, in seconds
+MAX_HANDSHAKES = 32  # Maximum amount of concurrent TLS handshakes per network, 0 for no limit
+
+# Unix domain sockets
+UNIX_MODE = 0o660  # Permissions of the socket file of a Unix socket network, access control is left to the filesystem
+
+# Dead peers
+KEEPALIVE_IDLE = 60  # Time a connection is idle before TCP keepalive probes are sent, in seconds, 0 to disable keepalive
+KEEPALIVE_INTERVAL = 10  # Time between TCP keepalive probes, in seconds
+KEEPALIVE_COUNT = 5  # Amount of unanswered TCP keepalive probes before the connection is dropped
+IDLE_TIMEOUT = 0.0  # Time after which a client that nothing was exchanged with is disconnected, in seconds, 0 for no limit
+WRITE_TIMEOUT = 60.0  # Time after which a client that doesn't read what's written to it is disconnected, in seconds, 0 for no limit
+REAP_INTERVAL = 1.0  # Time between checks for idle and blocked clients, in seconds
+
+# Restarts
+LISTEN_FDS_START = 3  # First file descriptor passed by systemd socket activation
+HANDOFF_REQUEST = b"HANDOFF"  # Sent by a new process to take over the sockets of the running one
+HANDOFF_ACK = b"TAKEN"  # Sent by the new process once it received all sockets, the running process resumes without it
+HANDOFF_MAX_FDS = 200  # Maximum amount of sockets passed in a single handoff message
+HANDOFF_MAX_MESSAGE = 1 << 20  # Maximum size of a single handoff message, in bytes
+HANDOFF_TIMEOUT = 10.0  # Time to wait for the running process to hand over its sockets, in seconds
+
+# Workers
+WORKERS = 0  # Amount of worker threads serving the clients of a network, 0 to serve them on the loop of the bridge
+
+# Reload, network settings that can only change by restarting the network, which disconnects its clients
+RESTART_SETTINGS = ["host", "port", "unix", "unix_mode", "ssl", "tls_tickets", "workers", "framed"]
+
+# Client outbound queues
+CLIENT_QUEUE_SIZE = 1000  # Maximum amount of packets queued for a single client
+OVERFLOW_DROP = "drop"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = [OVERFLOW_DROP, OVERFLOW_DISCONNECT]
+COALESCE_WINDOW = 0.0  # Time to collect queued packets into a single write, in seconds, 0 for a single event loop iteration
+
+# Client inbound rate limits
+RATE_LIMIT = 0.0  # Maximum amount of packets received per second, 0 for no limit
+RATE_BURST = 20  # Amount of packets that can be received at once before the rate limit applies
+RATE_DELAY = "delay"
+RATE_DROP = "drop"
+RATE_POLICIES = [RATE_DELAY, RATE_DROP]
+
+# Framed wire mode, header: [payload length, direction, run epoch, sequence number, receive time in microseconds since the epoch]
+FRAME_HEADER_FORMAT = "!HBIIQ"
+FRAME_DIRECTION_BUS = 0     # Received from the bus
+FRAME_DIRECTION_SEND = 1    # Sent to the bus
+FRAME_DIRECTION_BRIDGE = 2  # Sent by the bridge itself, like snapshots and replays
+
+# Bridge
+BRIDGE_QUEUE_SIZE = 10000  # Maximum amount of packets waiting to be forwarded, per direction
+REPLAY_SIZE = 4096  # Amount of recently relayed packets kept for resuming clients
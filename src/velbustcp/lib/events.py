@@ -0,0 +1,118 @@
+from typing import TYPE_CHECKING, Any, Callable, Generic, List, Tuple, TypeVar, cast
+
+if TYPE_CHECKING:  # pragma: no cover
+    from velbustcp.lib.connection.tcp.client import Client
+    from velbustcp.lib.packet.envelope import Envelope
+
+H = TypeVar("H", bound=Callable[..., None])
+
+
+class Subscription():
+    """Handle to a subscribed handler, cancel it to unsubscribe.
+    """
+
+    def __init__(self, event: "Event[Any]", handler: Callable[..., None]):
+        self.__event: Event[Any] = event
+        self.__handler: Callable[..., None] = handler
+        self.__cancelled: bool = False
+
+    def cancel(self) -> None:
+        """Unsubscribes the handler, it won't be called anymore.
+        """
+
+        if self.__cancelled:
+            return
+
+        self.__cancelled = True
+        self.__event.unsubscribe(self.__handler)
+
+
+class Event(Generic[H]):
+    """A typed event, its handlers are called in subscription order with the emitted arguments.
+    """
+
+    def __init__(self, name: str):
+        """Initialises the event.
+
+        Args:
+            name (str): The name of the event, for logging.
+        """
+
+        self.name: str = name
+        self.__handlers: Tuple[H, ...] = ()
+
+        # Emitting has the same signature as the handlers
+        self.emit: H = cast(H, self.__emit)
+
+    def __len__(self) -> int:
+        """Returns the amount of subscribed handlers.
+
+        Returns:
+            int: The amount of subscribed handlers.
+        """
+
+        return len(self.__handlers)
+
+    def subscribe(self, handler: H) -> Subscription:
+        """Subscribes a handler to the event.
+
+        Args:
+            handler (H): The handler to call when the event is emitted.
+
+        Returns:
+            Subscription: The subscription, to unsubscribe the handler with.
+        """
+
+        # Replace instead of append, so emitting isn't affected by handlers (un)subscribing
+        self.__handlers = self.__handlers + (handler,)
+        return Subscription(self, handler)
+
+    def unsubscribe(self, handler: H) -> None:
+        """Unsubscribes a handler from the event.
+
+        Args:
+            handler (H): The handler to unsubscribe.
+        """
+
+        handlers = list(self.__handlers)
+
+        if handler in handlers:
+            handlers.remove(handler)
+            self.__handlers = tuple(handlers)
+
+    def clear(self) -> None:
+        """Unsubscribes all handlers.
+        """
+
+        self.__handlers = ()
+
+    def __emit(self, *args: Any) -> None:
+        for handler in self.__handlers:
+            handler(*args)
+
+
+class EventBus():
+    """The events of a single bridge, shared by its bus, networks and clients.
+    """
+
+    def __init__(self):
+        self.bus_receive: Event[Callable[[bytearray], None]] = Event("bus-receive")
+        self.bus_send: Event[Callable[["Envelope"], None]] = Event("bus-send")
+        self.bus_fault: Event[Callable[[], None]] = Event("bus-fault")
+        self.tcp_receive: Event[Callable[["Client", bytearray], None]] = Event("tcp-receive")
+        self.client_open: Event[Callable[["Client"], None]] = Event("client-open")
+        self.client_authorize: Event[Callable[["Client"], None]] = Event("client-authorize")
+        self.client_close: Event[Callable[["Client"], None]] = Event("client-close")
+        self.client_control: Event[Callable[["Client", str, List[str]], None]] = Event("client-control")
+
+    def clear(self) -> None:
+        """Unsubscribes all handlers of all events.
+        """
+
+        events = (
+            self.bus_receive, self.bus_send, self.bus_fault, self.tcp_receive, self.client_open, self.client_authorize, self.client_close,
+            self.client_control
+        )
+
+        for event in events:
+            event.clear()
@@ -0,0 +1,42 @@
+import time
+from typing import TYPE_CHECKING, Optional
+
+from velbustcp.lib import consts
+from velbustcp.lib.packet.frame import encode_frame
+
+if TYPE_CHECKING:  # pragma: no cover
+    from velbustcp.lib.connection.tcp.client import Client
+
+
+class Envelope():
+    """A packet travelling through the bridge, tagged with the client it came from.
+    """
+
+    __slots__ = ("packet", "origin", "sequence", "received", "direction", "__frame")
+
+    def __init__(self, packet: bytearray, origin: Optional["Client"] = None):
+        """Initialises the envelope.
+
+        Args:
+            packet (bytearray): The packet.
+            origin (Optional[Client]): The client that sent the packet, or None if the bridge or bus did.
+        """
+
+        self.packet: bytearray = packet
+        self.origin: Optional[Client] = origin
+        self.sequence: int = 0  # Numbered by the bridge when relayed to the networks
+        self.received: float = time.time()  # Wall clock, so clients on other hosts can relate it to their own clock
+        self.direction: int = consts.FRAME_DIRECTION_BUS
+        self.__frame: Optional[bytes] = None
+
+    def frame(self) -> bytes:
+        """Returns the packet wrapped in a frame, encoded once for all clients of framed networks.
+
+        Returns:
+            bytes: The frame.
+        """
+
+        if self.__frame is None:
+            self.__frame = encode_frame(self.packet, self.direction, self.sequence, self.received)
+
+        return self.__frame
@@ -0,0 +1,63 @@
+import random
+import struct
+from typing import List, NamedTuple, Union
+
+from velbustcp.lib import consts
+
+FRAME_HEADER = struct.Struct(consts.FRAME_HEADER_FORMAT)
+
+# Identifies this run of the bridge, sequence numbers of different runs can't be compared
+RUN_EPOCH = random.getrandbits(32) or 1
+
+
+class Frame(NamedTuple):
+    """A decoded frame of the framed wire mode.
+    """
+
+    direction: int
+    epoch: int
+    sequence: int
+    timestamp: float
+    payload: bytes
+
+
+def encode_frame(payload: Union[bytes, bytearray], direction: int, sequence: int, timestamp: float) -> bytes:
+    """Wraps the given packet(s) in a length-prefixed frame, stamped with the run epoch of the bridge.
+
+    Args:
+        payload (Union[bytes, bytearray]): The packet, or multiple packets.
+        direction (int): Where the payload comes from, one of the FRAME_DIRECTION constants.
+        sequence (int): The sequence number of the last relayed packet in the payload, 0 if none.
+        timestamp (float): The wall clock time the bridge received the payload, in seconds since the epoch.
+
+    Returns:
+        bytes: The frame.
+    """
+
+    return FRAME_HEADER.pack(len(payload), direction, RUN_EPOCH, sequence & 0xFFFFFFFF, int(timestamp * 1000000)) + bytes(payload)
+
+
+def decode_frames(data: bytes) -> List[Frame]:
+    """Decodes the complete frames in the given data.
+
+    Args:
+        data (bytes): The received data, starting at a frame boundary.
+
+    Returns:
+        List[Frame]: The decoded frames, a trailing incomplete frame is ignored.
+    """
+
+    frames: List[Frame] = []
+    offset = 0
+
+    while offset + FRAME_HEADER.size <= len(data):
+        length, direction, epoch, sequence, timestamp = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+
+        if start + length > len(data):
+            break
+
+        frames.append(Frame(direction, epoch, sequence, timestamp / 1000000, bytes(data[start:start + length])))
+        offset = start + length
+
+    return frames
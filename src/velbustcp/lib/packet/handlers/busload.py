@@ -0,0 +1,51 @@
+import math
+import time
+
+from velbustcp.lib import consts
+
+
+class BusLoad():
+    """Measures the recent amount of packets on the bus, as an exponentially decaying rate.
+    """
+
+    def __init__(self, window: float = consts.BUS_LOAD_WINDOW):
+        """Initialises the bus load meter.
+
+        Args:
+            window (float): The time constant of the measurement, in seconds.
+        """
+
+        self.__window: float = window
+        self.__value: float = 0.0
+        self.__updated: float = time.monotonic()
+
+    def __decay(self) -> None:
+        now = time.monotonic()
+        self.__value *= math.exp((self.__updated - now) / self.__window)
+        self.__updated = now
+
+    def packet(self) -> None:
+        """Registers a packet seen on the bus.
+        """
+
+        self.__decay()
+        self.__value += 1
+
+    def rate(self) -> float:
+        """Returns the recent bus load.
+
+        Returns:
+            float: The amount of packets per second.
+        """
+
+        self.__decay()
+        return self.__value / self.__window
+
+    def spare(self) -> float:
+        """Returns the spare bus capacity.
+
+        Returns:
+            float: The amount of packets per second that the bus can still carry.
+        """
+
+        return max(0.0, consts.BUS_CAPACITY - self.rate())
@@ -0,0 +1,166 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from velbustcp.lib import consts
+
+
+class DiscoveredModule():
+    """Discovery responses of a single module.
+    """
+
+    def __init__(self):
+        self.module_type: Optional[bytes] = None
+        self.updated: float = 0.0
+        self.subtypes: Dict[int, bytes] = {}
+        self.names: Dict[Tuple[int, int], Tuple[float, bytes]] = {}
+
+
+class DiscoveryCache():
+    """Remembers module type, subtype (serial number) and name responses seen on the bus,
+    so scan requests can be answered without using bus time.
+    """
+
+    def __init__(self, ttl: float):
+        """Initialises the discovery cache.
+
+        Args:
+            ttl (float): How long a response stays valid, in seconds.
+        """
+
+        self.__ttl: float = ttl
+        self.__modules: Dict[int, DiscoveredModule] = {}
+        self.__requested: Dict[int, float] = {}
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def receive_packet(self, packet: bytearray) -> None:
+        """Caches the given packet if it is a discovery response.
+
+        Args:
+            packet (bytearray): The packet received from the bus.
+        """
+
+        length = packet[3] & consts.LENGTH_MASK
+        if (packet[3] & consts.RTR) or not length:
+            return
+
+        address = packet[2]
+        command = packet[4]
+        now = time.monotonic()
+
+        if command == consts.COMMAND_MODULE_TYPE:
+            module_type = bytes(packet)
+            module = self.__modules.get(address)
+
+            # Another module type means the hardware changed, forget what we knew about the old one
+            if module is None or module.module_type != module_type:
+                module = self.__modules[address] = DiscoveredModule()
+
+            module.module_type = module_type
+            module.updated = now
+            self.__requested.pop(address, None)
+
+        elif command in (consts.COMMAND_MODULE_SUBTYPE, consts.COMMAND_MODULE_SUBTYPE_2):
+            self.__modules.setdefault(address, DiscoveredModule()).subtypes[command] = bytes(packet)
+
+        elif command in consts.MODULE_NAME_PARTS and length > 1:
+            self.__modules.setdefault(address, DiscoveredModule()).names[(packet[5], command)] = (now, bytes(packet))
+
+    def request_sent(self, packet: bytearray) -> None:
+        """Registers a packet written to the bus, to detect addresses without a module.
+
+        Args:
+            packet (bytearray): The packet written to the bus.
+        """
+
+        if packet[3] != consts.RTR:
+            return
+
+        address = packet[2]
+        now = time.monotonic()
+        requested = self.__requested.get(address)
+
+        if requested is None or now - requested > consts.DISCOVERY_RESPONSE_WINDOW + consts.DISCOVERY_NEGATIVE_TTL:
+            self.__requested[address] = now
+
+    def answer(self, packet: bytearray) -> Optional[List[bytes]]:
+        """Answers a scan request from the cache.
+
+        Args:
+            packet (bytearray): The request received from a client.
+
+        Returns:
+            Optional[List[bytes]]: The cached responses, an empty list if no module is present on the address,
+                or None if the request isn't covered by the cache.
+        """
+
+        is_type_request = packet[3] == consts.RTR
+        is_name_request = packet[3] == 2 and packet[4] == consts.COMMAND_MODULE_NAME_REQUEST
+
+        if not (is_type_request or is_name_request):
+            return None
+
+        responses = self.__answer(packet, is_type_request)
+
+        if responses is None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+
+        return responses
+
+    def __answer(self, packet: bytearray, is_type_request: bool) -> Optional[List[bytes]]:
+        address = packet[2]
+        now = time.monotonic()
+        module = self.__modules.get(address)
+
+        if is_type_request:
+            if module is not None and module.module_type is not None:
+                if now - module.updated > self.__ttl:
+                    return None
+                return [module.module_type] + list(module.subtypes.values())
+
+            # Nobody answered a recent request, so there's no module on this address.
+            # This is only trusted shortly, so a module that's added later is found by the next scan.
+            requested = self.__requested.get(address)
+            negative_until = consts.DISCOVERY_RESPONSE_WINDOW + consts.DISCOVERY_NEGATIVE_TTL
+            if requested is not None and consts.DISCOVERY_RESPONSE_WINDOW <= now - requested <= negative_until:
+                return []
+
+            return None
+
+        # Module name request
+        if module is not None:
+            parts = [module.names.get((packet[5], command)) for command in consts.MODULE_NAME_PARTS]
+            if all(part is not None and now - part[0] <= self.__ttl for part in parts):
+                return [part[1] for part in parts if part is not None]
+
+        return None
+
+    def invalidate(self, address: Optional[int] = None) -> None:
+        """Forgets the cached responses, for example after hardware changed.
+
+        Args:
+            address (Optional[int]): The module address to forget, or None to forget all modules.
+        """
+
+        if address is None:
+            self.__modules.clear()
+            self.__requested.clear()
+            return
+
+        self.__modules.pop(address, None)
+        self.__requested.pop(address, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics about the discovery cache.
+
+        Returns:
+            Dict[str, Any]: The amount of known modules and the cache hits and misses.
+        """
+
+        return {
+            "modules": sum(1 for module in self.__modules.values() if module.module_type is not None),
+            "hits": self.__hits,
+            "misses": self.__misses
+        }
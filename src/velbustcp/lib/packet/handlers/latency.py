@@ -0,0 +1,130 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from velbustcp.lib import consts
+from velbustcp.lib.util.histogram import Histogram
+
+
+class ModuleLatency():
+    """Round-trip statistics of a single module.
+    """
+
+    def __init__(self):
+        self.histogram: Histogram = Histogram()
+        self.timeouts: int = 0
+        self.pending: Optional[float] = None
+
+
+class LatencyTracker():
+    """Correlates requests written to the bus with the next packet received from the same address,
+    and keeps a round-trip histogram per module.
+    """
+
+    def __init__(self, timeout: float = consts.LATENCY_TIMEOUT):
+        """Initialises the latency tracker.
+
+        Args:
+            timeout (float): Time after which a request is considered unanswered, in seconds.
+        """
+
+        self.__timeout: float = timeout
+        self.__modules: Dict[int, ModuleLatency] = {}
+
+    def request_sent(self, packet: bytearray) -> None:
+        """Registers a packet that was written to the bus.
+        Only modules that have been seen on the bus are tracked, so scans of empty addresses don't show up.
+
+        Args:
+            packet (bytearray): The packet written to the bus.
+        """
+
+        address = packet[2]
+        if address == consts.ADDRESS_BROADCAST:
+            return
+
+        module = self.__modules.get(address)
+        if module is None:
+            return
+
+        now = time.monotonic()
+
+        # Keep measuring from the oldest outstanding request, unless it expired
+        if module.pending is not None:
+            if now - module.pending <= self.__timeout:
+                return
+            module.timeouts += 1
+
+        module.pending = now
+
+    def response_received(self, packet: bytearray) -> None:
+        """Registers a packet that was received from the bus.
+
+        Args:
+            packet (bytearray): The packet received from the bus.
+        """
+
+        address = packet[2]
+        if address == consts.ADDRESS_BROADCAST:
+            return
+
+        module = self.__modules.get(address)
+        if module is None:
+            self.__modules[address] = ModuleLatency()
+            return
+
+        if module.pending is None:
+            return
+
+        rtt = time.monotonic() - module.pending
+        module.pending = None
+
+        if rtt > self.__timeout:
+            module.timeouts += 1
+        else:
+            module.histogram.add(rtt)
+
+    def modules(self) -> List[int]:
+        """Returns the addresses of all modules seen on the bus.
+
+        Returns:
+            List[int]: The module addresses, sorted.
+        """
+
+        return sorted(self.__modules)
+
+    def is_pending(self, address: int) -> bool:
+        """Returns whether a request to the given address is awaiting its response.
+
+        Args:
+            address (int): The module address.
+
+        Returns:
+            bool: Whether a request is outstanding.
+        """
+
+        module = self.__modules.get(address)
+        return module is not None and module.pending is not None and time.monotonic() - module.pending <= self.__timeout
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the round-trip statistics per module, slowest module first.
+
+        Returns:
+            Dict[str, Any]: The statistics, keyed by module address.
+        """
+
+        now = time.monotonic()
+
+        for module in self.__modules.values():
+            if module.pending is not None and now - module.pending > self.__timeout:
+                module.pending = None
+                module.timeouts += 1
+
+        ordered = sorted(self.__modules.items(), key=lambda item: item[1].histogram.mean, reverse=True)
+
+        return {
+            "0x{0:02X}".format(address): {
+                "rtt": module.histogram.stats(),
+                "timeouts": module.timeouts
+            }
+            for address, module in ordered
+        }
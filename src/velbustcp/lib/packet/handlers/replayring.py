@@ -0,0 +1,91 @@
+import collections
+import itertools
+from typing import Any, Deque, Dict, List, Optional
+
+from velbustcp.lib import consts
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.frame import RUN_EPOCH
+
+
+class ReplayRing():
+    """Keeps the most recent packets relayed to the networks, numbered with consecutive sequence numbers.
+    The numbers restart on every run of the bridge, they're only valid along with the run epoch.
+    """
+
+    def __init__(self, size: int = consts.REPLAY_SIZE):
+        """Initialises the ring.
+
+        Args:
+            size (int): The maximum amount of packets kept.
+        """
+
+        self.__envelopes: Deque[Envelope] = collections.deque(maxlen=size)
+        self.__last: int = 0
+
+    def __len__(self) -> int:
+        """Returns the amount of kept packets.
+
+        Returns:
+            int: The amount of kept packets.
+        """
+
+        return len(self.__envelopes)
+
+    @property
+    def epoch(self) -> int:
+        """The run epoch the sequence numbers belong to."""
+        return RUN_EPOCH
+
+    @property
+    def last(self) -> int:
+        """The sequence number of the latest packet, 0 if none yet."""
+        return self.__last
+
+    def add(self, envelope: Envelope) -> int:
+        """Numbers a packet and adds it to the ring, dropping the oldest packet if full.
+
+        Args:
+            envelope (Envelope): The packet relayed to the networks.
+
+        Returns:
+            int: The sequence number of the packet.
+        """
+
+        self.__last += 1
+        envelope.sequence = self.__last
+        self.__envelopes.append(envelope)
+        return self.__last
+
+    def since(self, epoch: int, sequence: int, until: Optional[int] = None) -> Optional[List[Envelope]]:
+        """Returns the packets after the given sequence number.
+
+        Args:
+            epoch (int): The run epoch of the sequence number.
+            sequence (int): The sequence number of the last packet that was received.
+            until (Optional[int]): The sequence number to stop before, or None to return all newer packets.
+
+        Returns:
+            Optional[List[Envelope]]: The missed packets, or None if some of them are no longer kept.
+        """
+
+        first = self.__last - len(self.__envelopes) + 1
+
+        # Sequence numbers of another run, or packets that have been dropped from the ring
+        if epoch != RUN_EPOCH or sequence > self.__last or sequence + 1 < first:
+            return None
+
+        end = self.__last + 1 if until is None else min(until, self.__last + 1)
+        return list(itertools.islice(self.__envelopes, sequence + 1 - first, end - first))
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics about the ring.
+
+        Returns:
+            Dict[str, Any]: The amount of kept packets, the run epoch and the latest sequence number.
+        """
+
+        return {
+            "size": len(self.__envelopes),
+            "epoch": RUN_EPOCH,
+            "last": self.__last
+        }
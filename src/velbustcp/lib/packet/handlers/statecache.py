@@ -0,0 +1,63 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from velbustcp.lib import consts
+
+
+class StateCache():
+    """Keeps the latest status packet per (address, command, channel) seen on the bus.
+    """
+
+    def __init__(self):
+        self.__packets: Dict[Tuple[int, int, int], bytes] = {}
+        self.__last_seen: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        """Returns the amount of cached status packets.
+
+        Returns:
+            int: The amount of cached status packets.
+        """
+
+        return len(self.__packets)
+
+    def receive_packet(self, packet: bytearray) -> None:
+        """Caches the given packet if it is a status packet.
+
+        Args:
+            packet (bytearray): The packet received from the bus.
+        """
+
+        # Remote transmit requests and packets without a command carry no state
+        if (packet[3] & consts.RTR) or not (packet[3] & consts.LENGTH_MASK):
+            return
+
+        command = packet[4]
+        has_channel = consts.STATUS_COMMANDS.get(command)
+        if has_channel is None:
+            return
+
+        channel = packet[5] if has_channel and (packet[3] & consts.LENGTH_MASK) > 1 else 0
+        self.__packets[(packet[2], command, channel)] = bytes(packet)
+        self.__last_seen[packet[2]] = time.monotonic()
+
+    def last_seen(self, address: int) -> Optional[float]:
+        """Returns when a status packet of the given module was last seen.
+
+        Args:
+            address (int): The module address.
+
+        Returns:
+            Optional[float]: The monotonic time the last status packet was seen, or None if never.
+        """
+
+        return self.__last_seen.get(address)
+
+    def snapshot(self) -> List[bytes]:
+        """Returns the cached status packets.
+
+        Returns:
+            List[bytes]: The cached status packets, in the order they were first seen.
+        """
+
+        return list(self.__packets.values())
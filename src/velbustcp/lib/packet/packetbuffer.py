@@ -1,21 +1,19 @@
-import itertools
-import collections
-import logging
-from typing import Deque, Union, overload
+from typing import Union, overload
 
-from velbustcp.lib.consts import STX
+from velbustcp.lib.consts import PARSER_BUFFER_SIZE, STX
 
 
 class PacketBuffer:
     """Packet buffer.
     """
 
+    __slots__ = ("__buffer",)
+
     def __init__(self):
         """Initialises the packet buffer.
         """
 
-        self.__buffer: Deque[int] = collections.deque(maxlen=10000)
-        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
+        self.__buffer: bytearray = bytearray()
 
     def __len__(self) -> int:
         """Return the number of items in the buffer.
@@ -37,21 +35,15 @@ class PacketBuffer:
     def __getitem__(self, item: Union[int, slice]) -> Union[int, bytearray]:
         """..."""
 
-        if isinstance(item, slice):
-            return bytearray(itertools.islice(self.__buffer, item.start, item.stop - item.start, item.step))
-
         return self.__buffer[item]
 
     def realign(self) -> None:
         """Realigns buffer by shifting the queue until the next STX or until the buffer runs out.
         """
 
-        amount = 1
+        amount = self.__buffer.find(STX, 1)
 
-        while (amount < len(self.__buffer)) and (self.__buffer[amount] != STX):
-            amount += 1
-
-        self.shift(amount)
+        self.shift(amount if amount > 0 else len(self.__buffer))
 
     def shift(self, amount: int) -> None:
         """Shifts the buffer by the specified amount.
@@ -60,14 +52,17 @@ class PacketBuffer:
             amount (int): The amount of bytes that the buffer needs to be shifted.
         """
 
-        for _ in itertools.repeat(None, amount):
-            self.__buffer.popleft()
+        del self.__buffer[:amount]
 
-    def feed(self, data: bytearray) -> None:
+    def feed(self, data: Union[bytearray, memoryview]) -> None:
         """Feed data into the parser to be processed.
 
         Args:
-            array (bytearray): The data that will be added to the parser.
+            array (Union[bytearray, memoryview]): The data that will be added to the parser.
         """
 
         self.__buffer.extend(data)
+
+        # Only keep the most recent data when no packets can be found in it
+        if len(self.__buffer) > PARSER_BUFFER_SIZE:
+            del self.__buffer[:len(self.__buffer) - PARSER_BUFFER_SIZE]
@@ -0,0 +1,62 @@
+import datetime
+import time
+from typing import List
+
+from velbustcp.lib import consts
+from velbustcp.lib.packet.packetparser import PacketParser
+
+
+def build_packet(priority: int, address: int, data: bytes = b"", rtr: bool = False) -> bytearray:
+    """Builds a Velbus packet, including its checksum.
+
+    Args:
+        priority (int): The priority of the packet.
+        address (int): The address of the module the packet is meant for.
+        data (bytes): The data of the packet, starting with the command byte.
+        rtr (bool): Whether or not the packet is a remote transmit request.
+
+    Returns:
+        bytearray: The Velbus packet.
+    """
+
+    if len(data) > consts.MAX_DATA_AMOUNT:
+        raise ValueError("Packet data too long, expected at most {0} bytes, got {1}".format(consts.MAX_DATA_AMOUNT, len(data)))
+
+    packet = bytearray([consts.STX, priority, address, (consts.RTR if rtr else 0x00) | len(data)])
+    packet.extend(data)
+    packet.append(PacketParser.checksum(packet))
+    packet.append(consts.ETX)
+
+    return packet
+
+
+def build_module_type_request(address: int) -> bytearray:
+    """Builds a module type request for the given address.
+    This is the cheapest request there is, every module answers it with its module type.
+
+    Args:
+        address (int): The address of the module.
+
+    Returns:
+        bytearray: The module type request packet.
+    """
+
+    return build_packet(consts.PRIORITY_LOW, address, rtr=True)
+
+
+def build_clock_sync(now: datetime.datetime) -> List[bytearray]:
+    """Builds the broadcasts that set the real-time clock, date and daylight saving of all modules.
+
+    Args:
+        now (datetime.datetime): The local date and time to set.
+
+    Returns:
+        List[bytearray]: The broadcast packets.
+    """
+
+    daylight_saving = time.localtime(now.timestamp()).tm_isdst > 0
+    clock = [consts.COMMAND_SET_REALTIME_CLOCK, now.weekday(), now.hour, now.minute]
+    date = [consts.COMMAND_SET_REALTIME_DATE, now.day, now.month, now.year >> 8, now.year & 0xFF]
+    dst = [consts.COMMAND_SET_DAYLIGHT_SAVING, int(daylight_saving)]
+
+    return [build_packet(consts.PRIORITY_LOW, consts.ADDRESS_BROADCAST, bytes(data)) for data in (clock, date, dst)]
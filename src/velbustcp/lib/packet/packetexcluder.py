@@ -1,15 +1,94 @@
-from velbustcp.lib.connection.tcp.client import Client
+from typing import Any, FrozenSet, Optional  # noqa: F401
 
+from velbustcp.lib import consts
+from velbustcp.lib.packet.packetfilter import FILTER_KEYS, PacketFilter
+from velbustcp.lib.util.util import str2bool
 
-def should_accept(packet: bytearray, client: Client) -> bool:
-    """Determines whether or not given packet should be accepted from given client.
+
+class InboundPolicy():
+    """Which packets clients of a network are allowed to put on the bus.
+    The rules are compiled into lookup tables, so checking a packet doesn't depend on the amount of rules.
+    Like a filter, the allow and deny rules only match a packet when all of their fields match it.
+    """
+
+    def __init__(self, allow: Optional[PacketFilter] = None, deny: Optional[PacketFilter] = None, firmware: bool = True, read_only: bool = False):
+        """Initialises and compiles the policy.
+
+        Args:
+            allow (Optional[PacketFilter]): The packets that are allowed, everything if None.
+            deny (Optional[PacketFilter]): The packets that are denied, even if allowed.
+            firmware (bool): Whether or not firmware priority packets are allowed.
+            read_only (bool): Whether or not all packets are denied.
+        """
+
+        self.allow: PacketFilter = allow or PacketFilter()
+        self.deny: PacketFilter = deny or PacketFilter()
+        self.firmware: bool = firmware
+        self.read_only: bool = read_only
+
+        self.addresses: bytearray = self.__compile(self.allow.addresses)
+        self.commands: bytearray = self.__compile(self.allow.commands)
+        self.priorities: bytearray = self.__compile(self.allow.priorities)
+        self.no_command: bool = self.allow.commands is None
+
+        # A packet is only denied when it matches every field of the deny rule
+        self.denies: bool = any(getattr(self.deny, key) is not None for key in FILTER_KEYS)
+        self.denied_addresses: bytearray = self.__compile(self.deny.addresses)
+        self.denied_commands: bytearray = self.__compile(self.deny.commands)
+        self.denied_priorities: bytearray = self.__compile(self.deny.priorities)
+        self.denied_no_command: bool = self.deny.commands is None
+
+        if not firmware:
+            self.priorities[consts.PRIORITY_FIRMWARE] = 0
+
+    @staticmethod
+    def __compile(values: Optional[FrozenSet[int]]) -> bytearray:
+        table = bytearray([1]) * 256 if values is None else bytearray(256)
+
+        for value in values or ():
+            table[value] = 1
+
+        return table
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Any) -> InboundPolicy
+
+        if not isinstance(settings_dict, dict):
+            raise ValueError("Provided policy incorrect, expected an object, got '{0}'".format(settings_dict))
+
+        return InboundPolicy(
+            allow=PacketFilter.parse(settings_dict["allow"]) if "allow" in settings_dict else None,
+            deny=PacketFilter.parse(settings_dict["deny"]) if "deny" in settings_dict else None,
+            firmware=str2bool(settings_dict["firmware"]) if "firmware" in settings_dict else True,
+            read_only=str2bool(settings_dict["read_only"]) if "read_only" in settings_dict else False
+        )
+
+
+def should_accept(packet: bytearray, policy: InboundPolicy) -> bool:
+    """Determines whether or not given packet should be accepted from a client.
 
     Args:
         packet (bytearray): A Velbus packet.
-        client (Client): A TCP Client.
+        policy (InboundPolicy): The inbound policy of the network the client is connected to.
 
     Returns:
         bool: A boolean, indicating whether or not the packet should be accepted from the client.
     """
 
-    return True
+    if policy.read_only:
+        return False
+
+    if not (policy.priorities[packet[1]] and policy.addresses[packet[2]]):
+        return False
+
+    has_command = not (packet[3] & consts.RTR) and (packet[3] & consts.LENGTH_MASK)
+
+    if not (policy.commands[packet[4]] if has_command else policy.no_command):
+        return False
+
+    if not policy.denies:
+        return True
+
+    denied_command = policy.denied_commands[packet[4]] if has_command else policy.denied_no_command
+    return not (policy.denied_priorities[packet[1]] and policy.denied_addresses[packet[2]] and denied_command)
@@ -0,0 +1,217 @@
+from typing import Any, Dict, FrozenSet, Generic, Iterator, List, Optional, TypeVar
+
+from velbustcp.lib import consts
+
+T = TypeVar("T")
+
+FILTER_KEYS = ("addresses", "commands", "priorities")
+
+
+def _parse_values(key: str, values: Any) -> FrozenSet[int]:
+    """Parses a list of byte values, given as numbers or (hex) strings.
+    """
+
+    if isinstance(values, str):
+        values = values.split(",")
+
+    try:
+        parsed = frozenset(int(str(value), 0) for value in values)
+    except (TypeError, ValueError):
+        raise ValueError("Provided filter {0} incorrect, expected a list of numbers, got '{1}'".format(key, values))
+
+    if any(value < 0 or value > 0xFF for value in parsed):
+        raise ValueError("Provided filter {0} incorrect, values should be between 0 and 255".format(key))
+
+    return parsed
+
+
+class PacketFilter():
+    """Selects packets by address, command and priority. A criterion that is None matches everything.
+    """
+
+    def __init__(
+        self,
+        addresses: Optional[FrozenSet[int]] = None,
+        commands: Optional[FrozenSet[int]] = None,
+        priorities: Optional[FrozenSet[int]] = None
+    ):
+        self.addresses: Optional[FrozenSet[int]] = addresses
+        self.commands: Optional[FrozenSet[int]] = commands
+        self.priorities: Optional[FrozenSet[int]] = priorities
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Any) -> PacketFilter
+
+        if not isinstance(settings_dict, dict):
+            raise ValueError("Provided filter incorrect, expected an object, got '{0}'".format(settings_dict))
+
+        unknown = set(settings_dict) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError("Unknown filter option(s) {0}".format(", ".join(sorted(unknown))))
+
+        packet_filter = PacketFilter()
+
+        for key in FILTER_KEYS:
+            if key in settings_dict:
+                setattr(packet_filter, key, _parse_values(key, settings_dict[key]))
+
+        return packet_filter
+
+    @staticmethod
+    def parse_arguments(arguments: List[str]) -> "PacketFilter":
+        """Parses the arguments of a SUBSCRIBE control line, like ["addresses=0x12,0x13", "priorities=0xF8"].
+
+        Args:
+            arguments (List[str]): The arguments of the control line.
+
+        Returns:
+            PacketFilter: The parsed filter.
+        """
+
+        settings_dict: Dict[str, Any] = {}
+
+        for argument in arguments:
+            key, separator, values = argument.partition("=")
+            if not separator:
+                raise ValueError("Provided filter argument incorrect, expected 'key=values', got '{0}'".format(argument))
+            settings_dict[key.lower()] = values
+
+        return PacketFilter.parse(settings_dict)
+
+    def intersect(self, other: "PacketFilter") -> "PacketFilter":
+        """Returns a filter that only matches packets matched by both filters.
+
+        Args:
+            other (PacketFilter): The other filter.
+
+        Returns:
+            PacketFilter: The combined filter.
+        """
+
+        def combine(first: Optional[FrozenSet[int]], second: Optional[FrozenSet[int]]) -> Optional[FrozenSet[int]]:
+            if first is None:
+                return second
+            if second is None:
+                return first
+            return first & second
+
+        return PacketFilter(
+            combine(self.addresses, other.addresses),
+            combine(self.commands, other.commands),
+            combine(self.priorities, other.priorities)
+        )
+
+    def matches(self, packet: bytearray) -> bool:
+        """Returns whether or not the filter matches the given packet.
+
+        Args:
+            packet (bytearray): The packet.
+
+        Returns:
+            bool: Whether or not the packet matches.
+        """
+
+        if self.priorities is not None and packet[1] not in self.priorities:
+            return False
+
+        if self.addresses is not None and packet[2] not in self.addresses:
+            return False
+
+        if self.commands is not None:
+            has_command = not (packet[3] & consts.RTR) and (packet[3] & consts.LENGTH_MASK)
+            return bool(has_command) and packet[4] in self.commands
+
+        return True
+
+
+class FilterIndex(Generic[T]):
+    """Matches packets to the subscribers whose filter accepts them.
+    Every subscriber gets a bit, each table holds the bits of the subscribers accepting that byte value,
+    so matching a packet is three lookups and two ANDs, no matter how many subscribers there are.
+    """
+
+    def __init__(self):
+        self.__subscribers: List[Optional[T]] = []
+        self.__bits: Dict[T, int] = {}
+        self.__free: List[int] = []
+        self.__addresses: List[int] = [0] * 256
+        self.__commands: List[int] = [0] * 256
+        self.__priorities: List[int] = [0] * 256
+        self.__no_command: int = 0
+
+    def __len__(self) -> int:
+        """Returns the amount of subscribers.
+
+        Returns:
+            int: The amount of subscribers.
+        """
+
+        return len(self.__bits)
+
+    def add(self, subscriber: T, packet_filter: PacketFilter) -> None:
+        """Adds a subscriber, or replaces its filter.
+
+        Args:
+            subscriber (T): The subscriber.
+            packet_filter (PacketFilter): The packets the subscriber wants to receive.
+        """
+
+        self.remove(subscriber)
+
+        bit = self.__free.pop() if self.__free else len(self.__subscribers)
+        if bit == len(self.__subscribers):
+            self.__subscribers.append(subscriber)
+        else:
+            self.__subscribers[bit] = subscriber
+        self.__bits[subscriber] = bit
+
+        mask = 1 << bit
+        tables = ((self.__addresses, packet_filter.addresses), (self.__commands, packet_filter.commands), (self.__priorities, packet_filter.priorities))
+        for table, values in tables:
+            for value in range(256) if values is None else values:
+                table[value] |= mask
+
+        if packet_filter.commands is None:
+            self.__no_command |= mask
+
+    def remove(self, subscriber: T) -> None:
+        """Removes a subscriber, if present.
+
+        Args:
+            subscriber (T): The subscriber.
+        """
+
+        bit = self.__bits.pop(subscriber, None)
+        if bit is None:
+            return
+
+        mask = ~(1 << bit)
+        for table in (self.__addresses, self.__commands, self.__priorities):
+            for value in range(256):
+                table[value] &= mask
+
+        self.__no_command &= mask
+        self.__subscribers[bit] = None
+        self.__free.append(bit)
+
+    def match(self, packet: bytearray) -> Iterator[T]:
+        """Yields the subscribers whose filter matches the given packet.
+
+        Args:
+            packet (bytearray): The packet.
+
+        Returns:
+            Iterator[T]: The matching subscribers.
+        """
+
+        has_command = not (packet[3] & consts.RTR) and (packet[3] & consts.LENGTH_MASK)
+        commands = self.__commands[packet[4]] if has_command else self.__no_command
+        mask = self.__priorities[packet[1]] & self.__addresses[packet[2]] & commands
+
+        while mask:
+            lowest = mask & -mask
+            subscriber = self.__subscribers[lowest.bit_length() - 1]
+            if subscriber is not None:
+                yield subscriber
+            mask ^= lowest
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from velbustcp.lib import consts
 from velbustcp.lib.packet.packetbuffer import PacketBuffer
@@ -11,12 +11,15 @@ class PacketParser:
     The packet protocol is detailed at https://github.com/velbus/packetprotocol.
     """
 
+    __slots__ = ("buffer",)
+
+    logger: logging.Logger = logging.getLogger("__main__." + __name__)
+
     def __init__(self):
         """Initialises the packet parser.
         """
 
         self.buffer: PacketBuffer = PacketBuffer()
-        self.logger = logging.getLogger("__main__." + __name__)
 
     @staticmethod
     def checksum(arr: bytearray) -> int:
@@ -85,11 +88,11 @@ class PacketParser:
         packet_length = consts.MIN_PACKET_LENGTH + body_length
         return len(self.buffer) >= packet_length
 
-    def feed(self, array: bytearray) -> List[bytearray]:
+    def feed(self, array: Union[bytearray, memoryview]) -> List[bytearray]:
         """Feed data into the parser to be processed.
 
         Args:
-            array (bytearray): The data that will be added to the parser.
+            array (Union[bytearray, memoryview]): The data that will be added to the parser.
         """
 
         self.buffer.feed(array)
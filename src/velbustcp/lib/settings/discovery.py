@@ -0,0 +1,27 @@
+from typing import Dict  # noqa: F401
+from velbustcp.lib.util.util import str2bool
+
+
+class DiscoverySettings():
+
+    enabled: bool = False
+    ttl: float = 3600.0
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Dict[str, str]) -> DiscoverySettings
+
+        settings = DiscoverySettings()
+
+        # Enabled
+        if "enabled" in settings_dict:
+            settings.enabled = str2bool(settings_dict["enabled"])
+
+        # TTL
+        if "ttl" in settings_dict:
+            settings.ttl = float(settings_dict["ttl"])
+
+            if settings.ttl <= 0:
+                raise ValueError("The provided discovery.ttl is invalid {0}".format(settings.ttl))
+
+        return settings
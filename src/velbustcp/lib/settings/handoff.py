@@ -0,0 +1,32 @@
+import os
+from typing import Dict  # noqa: F401
+
+from velbustcp.lib import consts
+
+
+class HandoffSettings():
+
+    path: str = ""
+    timeout: float = consts.HANDOFF_TIMEOUT
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Dict[str, str]) -> HandoffSettings
+
+        settings = HandoffSettings()
+
+        # Path of the handoff socket
+        if settings_dict.get("path"):
+            settings.path = settings_dict["path"]
+
+            if not os.path.isdir(os.path.dirname(os.path.abspath(settings.path))):
+                raise ValueError("The directory of the provided handoff.path doesn't exist {0}".format(settings.path))
+
+        # Timeout
+        if "timeout" in settings_dict:
+            settings.timeout = float(settings_dict["timeout"])
+
+            if settings.timeout <= 0:
+                raise ValueError("The provided handoff.timeout is invalid {0}".format(settings.timeout))
+
+        return settings
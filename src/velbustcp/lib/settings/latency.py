@@ -0,0 +1,27 @@
+from typing import Dict  # noqa: F401
+from velbustcp.lib.util.util import str2bool
+
+
+class LatencySettings():
+
+    probe: bool = False
+    probe_interval: float = 60.0
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Dict[str, str]) -> LatencySettings
+
+        settings = LatencySettings()
+
+        # Probe
+        if "probe" in settings_dict:
+            settings.probe = str2bool(settings_dict["probe"])
+
+        # Probe interval
+        if "probe_interval" in settings_dict:
+            settings.probe_interval = float(settings_dict["probe_interval"])
+
+            if settings.probe_interval <= 0:
+                raise ValueError("The provided latency.probe_interval is invalid {0}".format(settings.probe_interval))
+
+        return settings
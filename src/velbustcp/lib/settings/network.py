@@ -1,19 +1,57 @@
 import ipaddress
 import os
 from typing import Dict, Tuple  # noqa: F401
+from velbustcp.lib import consts
+from velbustcp.lib.packet.packetexcluder import InboundPolicy
+from velbustcp.lib.packet.packetfilter import PacketFilter
 from velbustcp.lib.util.util import str2bool
 
 
 class NetworkSettings():
 
-    relay: bool = True
-    host: str = "0.0.0.0"
-    port: int = 27015
-    ssl: bool = False
-    pk: str = ""
-    cert: str = ""
-    auth: bool = False
-    auth_key: str = ""
+    __slots__ = (
+        "relay", "host", "port", "ssl", "pk", "cert", "auth", "auth_key", "queue_size", "overflow", "coalesce_window", "framed",
+        "client_rate", "client_burst", "network_rate", "network_burst", "rate_policy", "auth_timeout", "max_pending", "max_clients",
+        "accept_rate", "accept_burst", "tls_tickets", "handshake_timeout", "max_handshakes", "workers", "unix",
+        "unix_mode", "keepalive_idle", "keepalive_interval", "keepalive_count", "idle_timeout", "write_timeout", "filter", "policy"
+    )
+
+    def __init__(self):
+        self.relay: bool = True
+        self.host: str = "0.0.0.0"
+        self.port: int = 27015
+        self.ssl: bool = False
+        self.pk: str = ""
+        self.cert: str = ""
+        self.auth: bool = False
+        self.auth_key: str = ""
+        self.queue_size: int = consts.CLIENT_QUEUE_SIZE
+        self.overflow: str = consts.OVERFLOW_DROP
+        self.coalesce_window: float = consts.COALESCE_WINDOW
+        self.framed: bool = False
+        self.client_rate: float = consts.RATE_LIMIT
+        self.client_burst: int = consts.RATE_BURST
+        self.network_rate: float = consts.RATE_LIMIT
+        self.network_burst: int = consts.RATE_BURST
+        self.rate_policy: str = consts.RATE_DELAY
+        self.auth_timeout: float = consts.AUTH_TIMEOUT
+        self.max_pending: int = consts.MAX_PENDING_CLIENTS
+        self.max_clients: int = consts.MAX_CLIENTS
+        self.accept_rate: float = consts.ACCEPT_RATE
+        self.accept_burst: int = consts.ACCEPT_BURST
+        self.tls_tickets: int = consts.TLS_TICKETS
+        self.handshake_timeout: float = consts.HANDSHAKE_TIMEOUT
+        self.max_handshakes: int = consts.MAX_HANDSHAKES
+        self.workers: int = consts.WORKERS
+        self.unix: str = ""
+        self.unix_mode: int = consts.UNIX_MODE
+        self.keepalive_idle: int = consts.KEEPALIVE_IDLE
+        self.keepalive_interval: int = consts.KEEPALIVE_INTERVAL
+        self.keepalive_count: int = consts.KEEPALIVE_COUNT
+        self.idle_timeout: float = consts.IDLE_TIMEOUT
+        self.write_timeout: float = consts.WRITE_TIMEOUT
+        self.filter: PacketFilter = PacketFilter()
+        self.policy: InboundPolicy = InboundPolicy()
 
     @property
     def address(self) -> Tuple[str, int]:
@@ -73,4 +111,132 @@ class NetworkSettings():
 
                 settings.auth_key = settings_dict["auth_key"]
 
+        # Outbound queue size
+        if "queue_size" in settings_dict:
+            settings.queue_size = int(settings_dict["queue_size"])
+
+            if settings.queue_size < 1:
+                raise ValueError("The provided queue size is invalid {0}".format(settings.queue_size))
+
+        # Overflow policy
+        if "overflow" in settings_dict:
+            settings.overflow = settings_dict["overflow"]
+
+            if settings.overflow not in consts.OVERFLOW_POLICIES:
+                raise ValueError("Provided overflow policy incorrect, expected one of {0}, got '{1}'".format(consts.OVERFLOW_POLICIES, settings.overflow))
+
+        # Coalesce window
+        if "coalesce_window" in settings_dict:
+            settings.coalesce_window = float(settings_dict["coalesce_window"])
+
+            if settings.coalesce_window < 0:
+                raise ValueError("The provided coalesce window is invalid {0}".format(settings.coalesce_window))
+
+        # Framed wire mode
+        if "framed" in settings_dict:
+            settings.framed = str2bool(settings_dict["framed"])
+
+        # Inbound rate limits
+        for key in ("client_rate", "network_rate"):
+            if key in settings_dict:
+                setattr(settings, key, float(settings_dict[key]))
+
+                if getattr(settings, key) < 0:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        for key in ("client_burst", "network_burst"):
+            if key in settings_dict:
+                setattr(settings, key, int(settings_dict[key]))
+
+                if getattr(settings, key) < 1:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        # Rate limit policy
+        if "rate_policy" in settings_dict:
+            settings.rate_policy = settings_dict["rate_policy"]
+
+            if settings.rate_policy not in consts.RATE_POLICIES:
+                raise ValueError("Provided rate policy incorrect, expected one of {0}, got '{1}'".format(consts.RATE_POLICIES, settings.rate_policy))
+
+        # Admission limits
+        for key in ("auth_timeout", "accept_rate"):
+            if key in settings_dict:
+                setattr(settings, key, float(settings_dict[key]))
+
+                if getattr(settings, key) < 0:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        for key in ("max_pending", "max_clients"):
+            if key in settings_dict:
+                setattr(settings, key, int(settings_dict[key]))
+
+                if getattr(settings, key) < 0:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        if "accept_burst" in settings_dict:
+            settings.accept_burst = int(settings_dict["accept_burst"])
+
+            if settings.accept_burst < 1:
+                raise ValueError("The provided accept_burst is invalid {0}".format(settings_dict["accept_burst"]))
+
+        # TLS handshakes
+        for key in ("tls_tickets", "max_handshakes"):
+            if key in settings_dict:
+                setattr(settings, key, int(settings_dict[key]))
+
+                if getattr(settings, key) < 0:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        if "handshake_timeout" in settings_dict:
+            settings.handshake_timeout = float(settings_dict["handshake_timeout"])
+
+            if settings.handshake_timeout <= 0:
+                raise ValueError("The provided handshake_timeout is invalid {0}".format(settings_dict["handshake_timeout"]))
+
+        # Workers
+        if "workers" in settings_dict:
+            settings.workers = int(settings_dict["workers"])
+
+            if settings.workers < 0:
+                raise ValueError("The provided amount of workers is invalid {0}".format(settings.workers))
+
+        # Unix domain socket
+        if settings_dict.get("unix"):
+            settings.unix = settings_dict["unix"]
+
+            if not os.path.isdir(os.path.dirname(os.path.abspath(settings.unix))):
+                raise ValueError("The directory of the provided Unix socket doesn't exist {0}".format(settings.unix))
+
+            if settings.ssl:
+                raise ValueError("SSL can't be enabled on a Unix socket, access is controlled through its file permissions")
+
+        if "unix_mode" in settings_dict:
+            settings.unix_mode = int(str(settings_dict["unix_mode"]), 8)
+
+            if not (0 <= settings.unix_mode <= 0o777):
+                raise ValueError("The provided Unix socket mode is invalid {0}".format(settings_dict["unix_mode"]))
+
+        # Dead peers
+        for key in ("keepalive_idle", "keepalive_interval", "keepalive_count"):
+            if key in settings_dict:
+                setattr(settings, key, int(settings_dict[key]))
+
+                if getattr(settings, key) < (0 if key == "keepalive_idle" else 1):
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        for key in ("idle_timeout", "write_timeout"):
+            if key in settings_dict:
+                setattr(settings, key, float(settings_dict[key]))
+
+                if getattr(settings, key) < 0:
+                    raise ValueError("The provided {0} is invalid {1}".format(key, settings_dict[key]))
+
+        # Filter
+        if "filter" in settings_dict:
+            settings.filter = PacketFilter.parse(settings_dict["filter"])
+
+        # Inbound policy
+        if "policy" in settings_dict:
+            settings.policy = InboundPolicy.parse(settings_dict["policy"])
+
         return settings
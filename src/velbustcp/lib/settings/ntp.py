@@ -0,0 +1,28 @@
+import datetime
+from typing import Dict  # noqa: F401
+from velbustcp.lib.util.util import str2bool
+
+
+class NtpSettings():
+
+    enabled: bool = False
+    synctime: datetime.time = datetime.time(3, 0)
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Dict[str, str]) -> NtpSettings
+
+        settings = NtpSettings()
+
+        # Enabled
+        if "enabled" in settings_dict:
+            settings.enabled = str2bool(settings_dict["enabled"])
+
+        # Sync time
+        if "synctime" in settings_dict:
+            try:
+                settings.synctime = datetime.datetime.strptime(settings_dict["synctime"], "%H:%M").time()
+            except ValueError:
+                raise ValueError("Provided option ntp.synctime incorrect, expected 'HH:MM', got '{0}'".format(settings_dict["synctime"]))
+
+        return settings
@@ -0,0 +1,45 @@
+from typing import Dict, List  # noqa: F401
+from velbustcp.lib.util.util import str2bool
+
+
+class PollerSettings():
+
+    enabled: bool = False
+    modules: List[int] = []
+    interval: float = 300.0
+    budget: float = 0.5
+
+    @staticmethod
+    def parse(settings_dict):
+        # type: (Dict[str, str]) -> PollerSettings
+
+        settings = PollerSettings()
+
+        # Enabled
+        if "enabled" in settings_dict:
+            settings.enabled = str2bool(settings_dict["enabled"])
+
+        # Modules
+        if "modules" in settings_dict:
+            settings.modules = [int(str(address), 0) for address in settings_dict["modules"]]
+
+            for address in settings.modules:
+                # 0xFF is the broadcast address, not a module
+                if (address <= 0x00) or (address >= 0xFF):
+                    raise ValueError("The provided poller module address is invalid {0}".format(address))
+
+        # Interval
+        if "interval" in settings_dict:
+            settings.interval = float(settings_dict["interval"])
+
+            if settings.interval <= 0:
+                raise ValueError("The provided poller.interval is invalid {0}".format(settings.interval))
+
+        # Budget
+        if "budget" in settings_dict:
+            settings.budget = float(settings_dict["budget"])
+
+            if (settings.budget <= 0) or (settings.budget > 1):
+                raise ValueError("The provided poller.budget is invalid {0}, expected a fraction between 0 and 1".format(settings.budget))
+
+        return settings
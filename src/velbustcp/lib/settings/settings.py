@@ -3,28 +3,58 @@ from typing import List
 from velbustcp.lib.settings.serial import SerialSettings
 from velbustcp.lib.settings.network import NetworkSettings
 from velbustcp.lib.settings.logging import LoggingSettings
+from velbustcp.lib.settings.latency import LatencySettings
+from velbustcp.lib.settings.discovery import DiscoverySettings
+from velbustcp.lib.settings.poller import PollerSettings
+from velbustcp.lib.settings.ntp import NtpSettings
+from velbustcp.lib.settings.handoff import HandoffSettings
 
 network_settings: List[NetworkSettings] = [NetworkSettings()]
 serial_settings: SerialSettings = SerialSettings()
 logging_settings: LoggingSettings = LoggingSettings()
+latency_settings: LatencySettings = LatencySettings()
+discovery_settings: DiscoverySettings = DiscoverySettings()
+poller_settings: PollerSettings = PollerSettings()
+ntp_settings: NtpSettings = NtpSettings()
+handoff_settings: HandoffSettings = HandoffSettings()
 
 
-def validate_and_set_settings(settings):
+def validate_and_set_settings(settings, reload=False):
+    """Validates the given settings and replaces the current ones.
+    Nothing is replaced when any of the settings is invalid, sections that aren't given get their defaults.
 
-    # Has connection(s)
-    if "connections" in settings:
-        global network_settings
-        network_settings = []  # clear default
-
-        for connection in settings["connections"]:
-            network_settings.append(NetworkSettings.parse(connection))
+    Args:
+        settings (Dict[str, Any]): The settings, as read from the settings file.
+        reload (bool): Whether the settings are reloaded by a running process. Only the network and logging settings
+            are replaced then, the other sections are used once at startup and keep describing what is running.
 
-    # Serial
-    if "serial" in settings:
-        global serial_settings
-        serial_settings = SerialSettings.parse(settings["serial"])
+    Raises:
+        ValueError: When any of the settings is invalid.
+    """
 
-    # Logging
-    if "logging" in settings:
-        global logging_settings
-        logging_settings = LoggingSettings.parse(settings["logging"])
+    # Has connection(s)
+    new_network_settings = [NetworkSettings()]
+    if "connections" in settings:
+        new_network_settings = [NetworkSettings.parse(connection) for connection in settings["connections"]]
+
+    new_serial_settings = SerialSettings.parse(settings["serial"]) if "serial" in settings else SerialSettings()
+    new_logging_settings = LoggingSettings.parse(settings["logging"]) if "logging" in settings else LoggingSettings()
+    new_latency_settings = LatencySettings.parse(settings["latency"]) if "latency" in settings else LatencySettings()
+    new_discovery_settings = DiscoverySettings.parse(settings["discovery"]) if "discovery" in settings else DiscoverySettings()
+    new_poller_settings = PollerSettings.parse(settings["poller"]) if "poller" in settings else PollerSettings()
+    new_ntp_settings = NtpSettings.parse(settings["ntp"]) if "ntp" in settings else NtpSettings()
+    new_handoff_settings = HandoffSettings.parse(settings["handoff"]) if "handoff" in settings else HandoffSettings()
+
+    global network_settings, serial_settings, logging_settings, latency_settings, discovery_settings, poller_settings, ntp_settings, handoff_settings
+    network_settings = new_network_settings
+    logging_settings = new_logging_settings
+
+    if reload:
+        return
+
+    serial_settings = new_serial_settings
+    latency_settings = new_latency_settings
+    discovery_settings = new_discovery_settings
+    poller_settings = new_poller_settings
+    ntp_settings = new_ntp_settings
+    handoff_settings = new_handoff_settings
@@ -0,0 +1,67 @@
+import bisect
+from typing import Any, Dict, List, Sequence
+
+from velbustcp.lib import consts
+
+
+class Histogram:
+    """Fixed-bucket histogram for durations, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = consts.LATENCY_BUCKETS):
+        """Initialises the histogram.
+
+        Args:
+            buckets (Sequence[float]): The ascending upper bounds of the buckets, in seconds.
+        """
+
+        self.__buckets: Sequence[float] = buckets
+        self.__counts: List[int] = [0] * (len(buckets) + 1)
+        self.__count: int = 0
+        self.__total: float = 0.0
+        self.__min: float = 0.0
+        self.__max: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__total / self.__count if self.__count else 0.0
+
+    def add(self, value: float) -> None:
+        """Adds a sample to the histogram.
+
+        Args:
+            value (float): The sample, in seconds.
+        """
+
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+
+        if not self.__count or value < self.__min:
+            self.__min = value
+
+        if value > self.__max:
+            self.__max = value
+
+        self.__count += 1
+        self.__total += value
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the histogram as a dictionary, durations are in milliseconds.
+
+        Returns:
+            Dict[str, Any]: The histogram.
+        """
+
+        buckets = {"{0:g}ms".format(bound * 1000): count for bound, count in zip(self.__buckets, self.__counts)}
+        buckets["+inf"] = self.__counts[-1]
+
+        return {
+            "count": self.__count,
+            "mean": round(self.mean * 1000, 3),
+            "min": round(self.__min * 1000, 3),
+            "max": round(self.__max * 1000, 3),
+            "buckets": buckets
+        }
@@ -0,0 +1,295 @@
+import asyncio
+import datetime
+import logging
+import math
+from typing import Callable, Dict, List, Optional
+
+from velbustcp.lib import consts
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4
+MAX_TICKS = (1 << (SLOT_BITS * LEVELS)) - 1
+
+
+class Job():
+    """A job scheduled on the scheduler.
+    """
+
+    __slots__ = ("callback", "interval", "expiry", "level", "slot", "cancelled", "scheduler")
+
+    def __init__(self, scheduler: "Scheduler", callback: Callable[[], None], interval: int):
+        self.scheduler: Scheduler = scheduler
+        self.callback: Callable[[], None] = callback
+        self.interval: int = interval
+        self.expiry: int = 0
+        self.level: int = 0
+        self.slot: int = 0
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        """Cancels the job, it won't be run anymore.
+        """
+
+        if not self.cancelled:
+            self.cancelled = True
+            self.scheduler.remove(self)
+
+
+class Scheduler():
+    """Hierarchical timer wheel on the event loop.
+    Inserting and cancelling a job are O(1), no matter how many jobs are scheduled.
+    The event loop is woken up when a slot holding jobs is due and, while jobs are waiting on the higher levels,
+    every time the lowest level wraps around to cascade them down.
+    """
+
+    def __init__(self, resolution: float = consts.SCHEDULER_RESOLUTION):
+        """Initialises the scheduler.
+
+        Args:
+            resolution (float): The duration of a single tick, in seconds.
+        """
+
+        self.__logger: logging.Logger = logging.getLogger("__main__." + __name__)
+        self.__resolution: float = resolution
+        self.__wheels: List[List[Dict[Job, None]]] = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self.__occupied: List[int] = [0] * LEVELS
+        self.__jobs: int = 0
+        self.__tick: int = 0
+        self.__origin: Optional[float] = None
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__timer_tick: int = 0
+        self.__processing: bool = False
+
+    def __len__(self) -> int:
+        """Returns the amount of scheduled jobs.
+
+        Returns:
+            int: The amount of scheduled jobs.
+        """
+
+        return self.__jobs
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Job:
+        """Runs the callback once, after the given delay.
+
+        Args:
+            delay (float): The delay, in seconds.
+            callback (Callable[[], None]): The callback to run.
+
+        Returns:
+            Job: The scheduled job.
+        """
+
+        job = Job(self, callback, 0)
+        self.__insert(job, self.__now() + self.__ticks(delay))
+        return job
+
+    def call_every(self, interval: float, callback: Callable[[], None], delay: Optional[float] = None) -> Job:
+        """Runs the callback periodically.
+
+        Args:
+            interval (float): The time between runs, in seconds.
+            callback (Callable[[], None]): The callback to run.
+            delay (Optional[float]): The delay before the first run in seconds, defaults to the interval.
+
+        Returns:
+            Job: The scheduled job.
+        """
+
+        job = Job(self, callback, self.__ticks(interval))
+        self.__insert(job, self.__now() + self.__ticks(interval if delay is None else delay))
+        return job
+
+    def call_daily(self, at: datetime.time, callback: Callable[[], None]) -> Job:
+        """Runs the callback every day at the given local time.
+
+        Args:
+            at (datetime.time): The local time of day to run the callback at.
+            callback (Callable[[], None]): The callback to run.
+
+        Returns:
+            Job: The scheduled job, which stays valid across days.
+        """
+
+        def delay() -> float:
+            now = datetime.datetime.now()
+            next_run = datetime.datetime.combine(now.date(), at)
+            if next_run <= now:
+                next_run += datetime.timedelta(days=1)
+            return (next_run - now).total_seconds()
+
+        def run() -> None:
+            callback()
+            self.__insert(job, self.__now() + self.__ticks(delay()))
+
+        job = Job(self, run, 0)
+        self.__insert(job, self.__now() + self.__ticks(delay()))
+        return job
+
+    def remove(self, job: Job) -> None:
+        """Removes the job from the wheel, use Job.cancel instead.
+
+        Args:
+            job (Job): The job to remove.
+        """
+
+        slot = self.__wheels[job.level][job.slot]
+        if job not in slot:
+            return
+
+        del slot[job]
+        self.__jobs -= 1
+        if not slot:
+            self.__occupied[job.level] &= ~(1 << job.slot)
+
+    def stop(self) -> None:
+        """Cancels all jobs.
+        """
+
+        for level in self.__wheels:
+            for slot in level:
+                for job in slot:
+                    job.cancelled = True
+                slot.clear()
+
+        self.__occupied = [0] * LEVELS
+        self.__jobs = 0
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+    def __ticks(self, delay: float) -> int:
+        ticks = max(1, math.ceil(delay / self.__resolution))
+
+        if ticks > MAX_TICKS:
+            raise ValueError("The delay of {0} seconds exceeds the maximum of {1} seconds".format(delay, MAX_TICKS * self.__resolution))
+
+        return ticks
+
+    def __now(self) -> int:
+        """Returns the current tick, according to the event loop clock.
+        """
+
+        if self.__loop is None or self.__origin is None:
+            self.__loop = asyncio.get_event_loop()
+            self.__origin = self.__loop.time()
+
+        return int((self.__loop.time() - self.__origin) / self.__resolution)
+
+    def __insert(self, job: Job, expiry: int) -> None:
+        if job.cancelled:
+            return
+
+        # Skip the ticks that passed while the wheel was empty
+        if not self.__jobs and not self.__processing:
+            self.__tick = max(self.__tick, self.__now())
+
+        delta = min(max(expiry - self.__tick, 0), MAX_TICKS)
+        job.expiry = self.__tick + delta
+
+        level = 0
+        while delta >= (1 << (SLOT_BITS * (level + 1))):
+            level += 1
+
+        job.level = level
+        job.slot = (job.expiry >> (SLOT_BITS * level)) & SLOT_MASK
+        self.__wheels[level][job.slot][job] = None
+        self.__occupied[level] |= 1 << job.slot
+        self.__jobs += 1
+
+        self.__schedule_timer()
+
+    def __next_tick(self) -> Optional[int]:
+        """Returns the next tick at which something has to happen, or None if no jobs are scheduled.
+        """
+
+        position = self.__tick & SLOT_MASK
+        occupied = self.__occupied[0]
+        next_tick: Optional[int] = None
+
+        if occupied:
+            # Rotate so bit 0 is the slot right after the current one
+            rotated = ((occupied >> (position + 1)) | (occupied << (SLOTS - position - 1))) & ((1 << SLOTS) - 1)
+            next_tick = self.__tick + (rotated & -rotated).bit_length()
+
+        # Jobs on the higher levels cascade down when the lowest level wraps around, which can come first
+        if any(self.__occupied[1:]):
+            wrap_tick = self.__tick + SLOTS - position
+            next_tick = wrap_tick if next_tick is None else min(next_tick, wrap_tick)
+
+        return next_tick
+
+    def __schedule_timer(self) -> None:
+        if self.__processing:
+            return
+
+        next_tick = self.__next_tick()
+        if next_tick is None:
+            return
+
+        if self.__timer is not None:
+            if self.__timer_tick <= next_tick:
+                return
+            self.__timer.cancel()
+
+        assert self.__loop is not None and self.__origin is not None
+        self.__timer_tick = next_tick
+        self.__timer = self.__loop.call_at(self.__origin + next_tick * self.__resolution, self.__on_timer)
+
+    def __on_timer(self) -> None:
+        self.__timer = None
+        target = max(self.__now(), self.__timer_tick)
+        self.__processing = True
+
+        try:
+            while self.__tick < target and self.__jobs:
+                self.__tick += 1
+                self.__process_tick()
+        finally:
+            self.__processing = False
+
+        self.__tick = max(self.__tick, target)
+        self.__schedule_timer()
+
+    def __process_tick(self) -> None:
+        tick = self.__tick
+
+        # Cascade jobs from the higher levels down when the lower level wraps around
+        level = 1
+        while level < LEVELS and not (tick >> (SLOT_BITS * (level - 1))) & SLOT_MASK:
+            slot_index = (tick >> (SLOT_BITS * level)) & SLOT_MASK
+            slot = self.__wheels[level][slot_index]
+
+            if slot:
+                jobs = list(slot)
+                slot.clear()
+                self.__occupied[level] &= ~(1 << slot_index)
+                self.__jobs -= len(jobs)
+
+                for job in jobs:
+                    self.__insert(job, job.expiry)
+
+            level += 1
+
+        slot_index = tick & SLOT_MASK
+        slot = self.__wheels[0][slot_index]
+        if not slot:
+            return
+
+        jobs = list(slot)
+        slot.clear()
+        self.__occupied[0] &= ~(1 << slot_index)
+        self.__jobs -= len(jobs)
+
+        for job in jobs:
+            try:
+                job.callback()
+            except Exception:
+                self.__logger.exception("Exception in scheduled job")
+
+            if job.interval and not job.cancelled:
+                self.__insert(job, max(job.expiry + job.interval, tick + 1))
@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Limits the rate of events, while allowing short bursts.
+    A bucket can be shared by the event loops of a network's workers, so it's thread-safe.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """Initialises a full bucket.
+
+        Args:
+            rate (float): The amount of tokens added per second.
+            burst (int): The maximum amount of tokens in the bucket.
+        """
+
+        self.rate: float = rate
+        self.burst: int = max(burst, 1)
+        self.__tokens: float = float(self.burst)
+        self.__updated: float = time.monotonic()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(float(self.burst), self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def delay(self) -> float:
+        """Returns how long it takes before a token can be taken.
+
+        Returns:
+            float: The time until a token is available, in seconds, 0 if one is available now.
+        """
+
+        with self.__lock:
+            self.__refill()
+
+            if self.__tokens >= 1:
+                return 0.0
+
+            return (1 - self.__tokens) / self.rate
+
+    def take(self) -> bool:
+        """Takes a token from the bucket, if available.
+
+        Returns:
+            bool: Whether or not a token was taken.
+        """
+
+        with self.__lock:
+            self.__refill()
+
+            if self.__tokens < 1:
+                return False
+
+            self.__tokens -= 1
+            return True
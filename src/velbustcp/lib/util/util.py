@@ -23,10 +23,7 @@ def setup_logging(settings: LoggingSettings) -> logging.Logger:
     print(settings.type)
 
     # Set type
-    if settings.type == "debug":
-        logger.setLevel(logging.DEBUG)
-    else:
-        logger.setLevel(logging.INFO)
+    set_log_level(settings)
 
     # Set handler
     handler: logging.Handler
@@ -42,6 +39,21 @@ def setup_logging(settings: LoggingSettings) -> logging.Logger:
     return logger
 
 
+def set_log_level(settings: LoggingSettings) -> None:
+    """Sets the level of the logger of the library, it can be changed while running.
+
+    Args:
+        settings (LoggingSettings): The logging settings.
+    """
+
+    logger = logging.getLogger(settings.name)
+
+    if settings.type == "debug":
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.INFO)
+
+
 def search_for_serial() -> List[str]:
     """Searches the connected serial list for an eligible device.
 
@@ -1,5 +1,6 @@
 from pytest_mock import MockFixture
 from velbustcp.lib.connection.serial.bus import Bus
+from velbustcp.lib.events import EventBus
 from velbustcp.lib.settings.serial import SerialSettings
 
 
@@ -7,7 +8,7 @@ def test_defaults(mocker: MockFixture):
 
     # Arrange
     options = SerialSettings()
-    bus = Bus(options=options)
+    bus = Bus(options=options, events=EventBus())
 
     # Assert
     assert not bus.is_active()
@@ -1,241 +1,565 @@
 import asyncio
+import socket
+import time
 import pytest
-from velbustcp.lib.connection.tcp.client import Client
-from pytest_mock import MockFixture, MockerFixture
+from velbustcp.lib.connection.tcp.client import Client, OutboundQueue
+from pytest_mock import MockerFixture
 from velbustcp.lib.connection.tcp.clientconnection import ClientConnection
-from velbustcp.lib.signals import on_client_close, on_tcp_receive
+from velbustcp.lib.consts import (
+    AUTH_TIMEOUT, CLIENT_QUEUE_SIZE, COALESCE_WINDOW, FRAME_DIRECTION_BRIDGE, FRAME_DIRECTION_BUS, OVERFLOW_DISCONNECT, OVERFLOW_DROP,
+    PRIORITY_HIGH, PRIORITY_LOW, RATE_BURST, RATE_DELAY, RATE_DROP, RATE_LIMIT
+)
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.frame import decode_frames
+from velbustcp.lib.packet.packetexcluder import InboundPolicy
+from velbustcp.lib.packet.packetparser import PacketParser
+from velbustcp.lib.util.tokenbucket import TokenBucket
+
+PACKET = bytes([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
 
 
 def get_mock_connection(mocker: MockerFixture):
-    """Creates a mock ClientConnection with mocked reader and writer."""
+    """Creates a mock ClientConnection with the default options."""
     connection = mocker.Mock(spec=ClientConnection)
-    connection.reader = mocker.AsyncMock()
-    connection.writer = mocker.AsyncMock()
-    connection.writer.get_extra_info = mocker.Mock(return_value="mock")
+    connection.should_authorize = False
+    connection.authorization_key = ""
+    connection.auth_timeout = AUTH_TIMEOUT
+    connection.queue_size = CLIENT_QUEUE_SIZE
+    connection.overflow = OVERFLOW_DROP
+    connection.coalesce_window = COALESCE_WINDOW
+    connection.framed = False
+    connection.policy = InboundPolicy()
+    connection.rate = RATE_LIMIT
+    connection.burst = RATE_BURST
+    connection.rate_policy = RATE_DELAY
+    connection.network_bucket = None
+    connection.keepalive_idle = 0
     return connection
 
 
-def test_defaults(mocker: MockerFixture):
-    # Create connection
-    conn = get_mock_connection(mocker)
+def get_mock_transport(mocker: MockerFixture):
+    """Creates a mock transport that is reading."""
+    transport = mocker.Mock(spec=asyncio.Transport)
+    transport.get_extra_info = mocker.Mock(return_value="mock")
+    transport.is_reading = mocker.Mock(return_value=True)
+    return transport
+
+
+def receive(client: Client, data: bytes) -> None:
+    """Lets the client receive the given data, like the event loop does."""
+    buffer = client.get_buffer(-1)
+    buffer[:len(data)] = data
+    client.buffer_updated(len(data))
 
+
+def test_defaults(mocker: MockerFixture):
     # Create client
-    client = Client(conn)
+    client = Client(get_mock_connection(mocker), EventBus())
+
+    # Check if not active
+    assert client.address() is None
+    assert not client.is_active()
+
+
+@pytest.mark.asyncio
+async def test_connection_made(mocker: MockerFixture):
+    opened = []
+    events = EventBus()
+    events.client_open.subscribe(opened.append)
+
+    client = Client(get_mock_connection(mocker), events)
+    client.connection_made(get_mock_transport(mocker))
 
-    # Check if address is correct
     assert client.address() == "mock"
+    assert client.is_active()
+    assert opened == [client]
 
-    # Check if not active
+    client.stop()
+
+
+@pytest.mark.asyncio
+async def test_auth(mocker: MockerFixture):
+    conn = get_mock_connection(mocker)
+    conn.should_authorize = True
+    conn.authorization_key = "velbus"
+
+    authorized = []
+    events = EventBus()
+    events.client_authorize.subscribe(authorized.append)
+
+    client = Client(conn, events)
+    client.connection_made(get_mock_transport(mocker))
     assert not client.is_active()
+    assert not client.is_authorized()
+
+    receive(client, b"velbus\n")
+    assert client.is_active()
+    assert authorized == [client]
+
+    client.stop()
 
 
 @pytest.mark.asyncio
-async def test_auth_wrong_key(mocker: MockerFixture):
-    # Create connection
+async def test_auth_pipelined(mocker: MockerFixture):
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value="velbus".encode("utf-8"))
     conn.should_authorize = True
-    conn.authorization_key = "something-different"
+    conn.authorization_key = "velbus"
 
-    # Create client
-    e = asyncio.Event()
+    received = []
+    controls = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: received.append(packet))
+    events.client_control.subscribe(lambda client, command, arguments: controls.append(command))
 
-    def handle_client_close(sender, **kwargs):
-        e.set()
+    client = Client(conn, events)
+    client.connection_made(get_mock_transport(mocker))
+    receive(client, b"velbus\r\nSUBSCRIBE addresses=0x01\n" + PACKET)
 
-    on_client_close.connect(handle_client_close)
+    assert client.is_active()
+    assert controls == ["SUBSCRIBE"]
+    assert received == [PACKET]
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
+    client.stop()
 
-    await e.wait()  # Wait for the event to be set
 
-    await client.stop()
-    await task
+@pytest.mark.asyncio
+async def test_auth_split(mocker: MockerFixture):
+    conn = get_mock_connection(mocker)
+    conn.should_authorize = True
+    conn.authorization_key = "velbus"
+
+    received = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: received.append(packet))
 
+    client = Client(conn, events)
+    client.connection_made(get_mock_transport(mocker))
+
+    receive(client, b"vel")
     assert not client.is_active()
 
+    receive(client, b"bus\n" + PACKET[:2])
+    assert client.is_active()
+
+    receive(client, PACKET[2:])
+    assert received == [PACKET]
+
+    client.stop()
+
 
 @pytest.mark.asyncio
-async def test_auth_no_data(mocker: MockerFixture):
-    # Create connection
+async def test_auth_wrong_prefix(mocker: MockerFixture):
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value=b"")
     conn.should_authorize = True
     conn.authorization_key = "velbus"
+    transport = get_mock_transport(mocker)
 
-    # Create client
-    e = asyncio.Event()
-
-    def handle_client_close(sender, **kwargs):
-        e.set()
+    client = Client(conn, EventBus())
+    client.connection_made(transport)
+    receive(client, b"velbux")
 
-    on_client_close.connect(handle_client_close)
+    assert not client.is_active()
+    transport.close.assert_called_once()
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
 
-    await e.wait()  # Wait for the event to be set
+@pytest.mark.asyncio
+async def test_auth_timeout(mocker: MockerFixture):
+    conn = get_mock_connection(mocker)
+    conn.should_authorize = True
+    conn.authorization_key = "velbus"
+    conn.auth_timeout = 0.05
+    transport = get_mock_transport(mocker)
 
-    await client.stop()
-    await task
+    client = Client(conn, EventBus())
+    client.connection_made(transport)
+    await asyncio.sleep(0.1)
 
     assert not client.is_active()
+    transport.close.assert_called_once()
 
 
 @pytest.mark.asyncio
-async def test_auth_recv_exception(mocker: MockerFixture):
-    # Create connection
+async def test_auth_in_time(mocker: MockerFixture):
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(side_effect=Exception("Thrown on purpose"))
     conn.should_authorize = True
     conn.authorization_key = "velbus"
+    conn.auth_timeout = 0.05
+    transport = get_mock_transport(mocker)
 
-    # Create client
-    e = asyncio.Event()
+    client = Client(conn, EventBus())
+    client.connection_made(transport)
+    receive(client, b"velbus")
+    await asyncio.sleep(0.1)
 
-    def handle_client_close(sender, **kwargs):
-        e.set()
+    assert client.is_active()
+    transport.close.assert_not_called()
 
-    on_client_close.connect(handle_client_close)
+    client.stop()
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
 
-    await e.wait()  # Wait for the event to be set
+@pytest.mark.asyncio
+async def test_auth_wrong_key(mocker: MockerFixture):
+    conn = get_mock_connection(mocker)
+    conn.should_authorize = True
+    conn.authorization_key = "something-different"
+    transport = get_mock_transport(mocker)
 
-    await client.stop()
-    await task
+    closed = []
+    events = EventBus()
+    events.client_close.subscribe(closed.append)
+
+    client = Client(conn, events)
+    client.connection_made(transport)
+    receive(client, b"velbus")
 
     assert not client.is_active()
+    assert closed == [client]
+    transport.close.assert_called_once()
 
 
 @pytest.mark.asyncio
-async def test_packet_empty(mocker: MockFixture):
-    # Create connection
+async def test_auth_no_data(mocker: MockerFixture):
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value=b"")
-    conn.should_authorize = False
+    conn.should_authorize = True
+    conn.authorization_key = "velbus"
 
-    # Create client
-    e = asyncio.Event()
+    client = Client(conn, EventBus())
+    client.connection_made(get_mock_transport(mocker))
 
-    def handle_client_close(sender, **kwargs):
-        e.set()
+    # The transport closes on end of file
+    assert not client.eof_received()
+    client.connection_lost(None)
 
-    on_client_close.connect(handle_client_close)
+    assert not client.is_active()
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
 
-    await e.wait()  # Wait for the event to be set
+@pytest.mark.asyncio
+async def test_connection_lost(mocker: MockerFixture):
+    closed = []
+    events = EventBus()
+    events.client_close.subscribe(closed.append)
 
-    await client.stop()
-    await task
+    client = Client(get_mock_connection(mocker), events)
+    client.connection_made(get_mock_transport(mocker))
+    client.connection_lost(ConnectionResetError())
+    client.stop()
 
     assert not client.is_active()
+    assert closed == [client]
 
 
 @pytest.mark.asyncio
-async def test_packet_handling(mocker: MockFixture):
-    # Create connection
-    data = bytes([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
-    conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value=data)
-    conn.should_authorize = False
+async def test_packet_handling(mocker: MockerFixture):
+    packets = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
+
+    client = Client(get_mock_connection(mocker), events)
+    client.connection_made(get_mock_transport(mocker))
+
+    # Packets can be split over multiple reads
+    receive(client, PACKET + PACKET[:2])
+    receive(client, PACKET[2:])
+
+    assert packets == [bytearray(PACKET), bytearray(PACKET)]
+
+    client.stop()
+
+
+@pytest.mark.asyncio
+async def test_client_send(mocker: MockerFixture):
+    transport = get_mock_transport(mocker)
 
     # Create client
-    e = asyncio.Event()
+    client = Client(get_mock_connection(mocker), EventBus())
 
-    def on_packet_receive(sender, **kwargs):
-        packet = kwargs["packet"]
-        if packet == bytearray(data) and not e.is_set():
-            e.set()
+    # First send data without client being connected
+    client.send(bytearray(PACKET))
+    await asyncio.sleep(0)
+    transport.write.assert_not_called()
 
-    on_tcp_receive.connect(on_packet_receive)
+    # Connect client and try sending
+    client.connection_made(transport)
+    client.send(bytearray(PACKET))
+    await asyncio.sleep(0.01)
+    transport.write.assert_called_with(PACKET)
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
+    client.stop()
 
-    await e.wait()  # Wait for the event to be set
 
-    await client.stop()
-    await task
+@pytest.mark.asyncio
+async def test_client_send_framed(mocker: MockerFixture):
+    # Create connection of a framed network
+    conn = get_mock_connection(mocker)
+    conn.framed = True
+    transport = get_mock_transport(mocker)
 
-    await client.stop()
-    assert not client.is_active()
+    client = Client(conn, EventBus())
+    client.connection_made(transport)
+
+    envelope = Envelope(bytearray(PACKET))
+    envelope.sequence = 7
+    client.relay(envelope)
+    client.send(bytearray(b"snapshot"))
+    await asyncio.sleep(0.01)
+
+    frames = decode_frames(transport.write.call_args.args[0])
+    assert [(frame.direction, frame.sequence, frame.payload) for frame in frames] == [
+        (FRAME_DIRECTION_BUS, 7, bytes(envelope.packet)),
+        (FRAME_DIRECTION_BRIDGE, 0, b"snapshot")
+    ]
+    assert frames[0].timestamp == pytest.approx(envelope.received, abs=1e-6)
+    assert frames[1].timestamp == pytest.approx(time.time(), abs=1)
+    assert client.first_sequence() == 7
+
+    client.stop()
+
+
+@pytest.mark.asyncio
+async def test_control_lines(mocker: MockerFixture):
+    # Collect control lines and packets
+    controls = []
+    packets = []
+
+    events = EventBus()
+    events.client_control.subscribe(lambda client, command, arguments: controls.append((command, arguments)))
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
+
+    client = Client(get_mock_connection(mocker), events)
+    client.connection_made(get_mock_transport(mocker))
+    receive(client, b"snapshot\nSUBSCRIBE 1 ")
+    receive(client, b"2\n" + PACKET)
+
+    assert controls == [("SNAPSHOT", []), ("SUBSCRIBE", ["1", "2"])]
+    assert packets == [bytearray(PACKET)]
+
+    client.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data", [b"\x00\x01", b"unknown\n", b"SNAPSHOTS ", b"SNAX"])
+async def test_control_lines_unknown(mocker: MockerFixture, data: bytes):
+    # Collect control lines and what the parser is fed
+    controls = []
+    feed = mocker.spy(PacketParser, "feed")
+
+    events = EventBus()
+    events.client_control.subscribe(lambda client, command, arguments: controls.append(command))
+
+    client = Client(get_mock_connection(mocker), events)
+    client.connection_made(get_mock_transport(mocker))
+
+    # Data that doesn't start with a known command goes to the parser right away
+    receive(client, data)
+
+    assert not controls
+    assert bytes(feed.call_args.args[1]) == data
+
+    client.stop()
 
 
 @pytest.mark.asyncio
-async def test_packet_recv_exception(mocker: MockerFixture):
-    # Create connection
+async def test_packet_policy(mocker: MockerFixture):
+    # Create connection on a read-only network
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(side_effect=Exception("Thrown on purpose"))
-    conn.should_authorize = False
+    conn.policy = InboundPolicy(read_only=True)
 
-    # Create client
-    e = asyncio.Event()
+    packets = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
 
-    def handle_client_close(sender, **kwargs):
-        e.set()
+    client = Client(conn, events)
+    client.connection_made(get_mock_transport(mocker))
+    receive(client, PACKET)
 
-    on_client_close.connect(handle_client_close)
+    assert packets == []
+    assert client.stats()["rejected"] == 1
 
-    client = Client(conn)
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
+    client.stop()
 
-    await e.wait()  # Wait for the event to be set
 
-    await client.stop()
-    await task
+@pytest.mark.asyncio
+async def test_rate_limit_drop(mocker: MockerFixture):
+    # Create connection that sends three packets at once, with room for two
+    conn = get_mock_connection(mocker)
+    conn.rate = 1
+    conn.burst = 2
+    conn.rate_policy = RATE_DROP
 
-    assert not client.is_active()
+    packets = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
+
+    client = Client(conn, events)
+    client.connection_made(get_mock_transport(mocker))
+    receive(client, PACKET * 3)
+
+    assert len(packets) == 2
+    assert client.stats()["limited"] == 1
+
+    client.stop()
 
 
 @pytest.mark.asyncio
-async def test_client_send(mocker: MockerFixture):
-    # Create connection
-    data = bytes([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+async def test_rate_limit_delay(mocker: MockerFixture):
+    # Create connection limited by a bucket shared with the rest of the network
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value=b"\x00")
-    conn.should_authorize = False
+    conn.network_bucket = TokenBucket(100, 1)
+    transport = get_mock_transport(mocker)
 
-    # Create client
-    client = Client(conn)
+    packets = []
+    events = EventBus()
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
 
-    # First send data without client being connected
-    await client.send(data)
-    conn.writer.write.assert_not_called()
+    client = Client(conn, events)
+    client.connection_made(transport)
+    receive(client, PACKET * 2)
+
+    # Reading pauses until the second packet can be emitted
+    assert len(packets) == 1
+    transport.pause_reading.assert_called_once()
+
+    transport.is_reading.return_value = False
+    await asyncio.sleep(0.05)
+
+    assert len(packets) == 2
+    transport.resume_reading.assert_called_once()
+    assert client.stats()["delayed"] == 1
+    assert client.stats()["limited"] == 0
+
+    client.stop()
+
+
+async def start_blocked_client(mocker: MockerFixture, overflow: str):
+    """Starts a client whose transport asks to stop writing."""
+    conn = get_mock_connection(mocker)
+    conn.queue_size = 2
+    conn.overflow = overflow
 
-    # Start client and try sending
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
+    client = Client(conn, EventBus())
+    client.connection_made(get_mock_transport(mocker))
+    client.pause_writing()
+
+    # The first packet is taken by the writer, which then waits for the transport
+    client.send(bytearray([0x0F, PRIORITY_HIGH, 0x01]))
+    await asyncio.sleep(0.01)
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_client_overflow_drops_low_priority(mocker: MockerFixture):
+    client = await start_blocked_client(mocker, OVERFLOW_DROP)
+
+    client.send(bytearray([0x0F, PRIORITY_HIGH, 0x02]))
+    client.send(bytearray([0x0F, PRIORITY_LOW, 0x03]))
+    client.send(bytearray([0x0F, PRIORITY_HIGH, 0x04]))
+    client.send(bytearray([0x0F, PRIORITY_LOW, 0x05]))
+
+    stats = client.stats()
+    assert stats["queued"] == 2
+    assert stats["dropped"] == 2
+    assert client.lag() > 0
+
+    client.stop()
+
+
+def test_outbound_queue_drops_oldest_low_priority():
+    queue = OutboundQueue()
+    for priority, data in [(PRIORITY_HIGH, b"1"), (PRIORITY_LOW, b"2"), (PRIORITY_LOW, b"3"), (PRIORITY_HIGH, b"4")]:
+        queue.append(priority, data)
+
+    # The oldest low priority data goes first, the rest keeps its order
+    assert queue.drop_oldest(low_only=True)
+    assert queue.drop_oldest(low_only=True)
+    assert not queue.drop_oldest(low_only=True)
+    assert len(queue) == 2
+
+    # Then the oldest data
+    assert queue.drop_oldest(low_only=False)
+    assert len(queue) == 1
+    assert queue.take() == b"4"
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_overflow_disconnects(mocker: MockerFixture):
+    client = await start_blocked_client(mocker, OVERFLOW_DISCONNECT)
+
+    for address in range(2, 5):
+        client.send(bytearray([0x0F, PRIORITY_HIGH, address]))
     await asyncio.sleep(0)
 
-    await client.send(bytearray(data))
-    conn.writer.write.assert_called_with(data)
+    assert not client.is_active()
 
-    await client.stop()
-    await task
+
+@pytest.mark.asyncio
+async def test_client_coalesces_writes(mocker: MockerFixture):
+    transport = get_mock_transport(mocker)
+
+    client = Client(get_mock_connection(mocker), EventBus())
+    client.connection_made(transport)
+
+    # Packets queued in the same event loop iteration end up in one write
+    for address in range(1, 4):
+        client.send(bytearray([0x0F, PRIORITY_LOW, address]))
+    await asyncio.sleep(0.01)
+
+    transport.write.assert_called_once_with(bytes([0x0F, PRIORITY_LOW, 0x01, 0x0F, PRIORITY_LOW, 0x02, 0x0F, PRIORITY_LOW, 0x03]))
+    assert client.stats()["writes"] == 1
+
+    client.stop()
 
 
 @pytest.mark.asyncio
-async def test_client_send_not_own_packet(mocker: MockerFixture):
-    # Create connection
-    data = bytes([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+async def test_keepalive(mocker: MockerFixture):
     conn = get_mock_connection(mocker)
-    conn.reader.read = mocker.AsyncMock(return_value=data)
-    conn.should_authorize = False
+    conn.keepalive_idle = 30
+    conn.keepalive_interval = 5
+    conn.keepalive_count = 3
 
-    # Create client
-    client = Client(conn)
+    with socket.create_server(("127.0.0.1", 0)) as listener, socket.create_connection(listener.getsockname()):
+        accepted, address = listener.accept()
 
-    # Start client and try sending
-    # should fail because it originated from that client
-    task = asyncio.create_task(client.start())  # Run client.start() as a separate task
-    await asyncio.sleep(0)
+        with accepted:
+            transport = get_mock_transport(mocker)
+            transport.get_extra_info = mocker.Mock(side_effect=lambda name: {"peername": address, "socket": accepted}[name])
+
+            client = Client(conn, EventBus())
+            client.connection_made(transport)
+
+            assert accepted.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                assert accepted.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 30
+                assert accepted.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) == 3
+
+            client.stop()
+
+
+@pytest.mark.asyncio
+async def test_idle_blocked(mocker: MockerFixture):
+    client = Client(get_mock_connection(mocker), EventBus())
+    client.connection_made(get_mock_transport(mocker))
+    await asyncio.sleep(0.05)
+
+    assert client.idle() >= 0.05
+    assert client.blocked() == 0
+
+    receive(client, PACKET)
+    assert client.idle() < 0.05
+
+    # Writing to the client counts as activity as well
+    await asyncio.sleep(0.05)
+    client.send(bytearray(PACKET))
+    await asyncio.sleep(0.01)
+    assert client.idle() < 0.05
+
+    client.pause_writing()
+    await asyncio.sleep(0.05)
+    assert client.blocked() >= 0.05
 
-    await client.send(bytearray(data))
-    conn.writer.write.assert_not_called()
+    client.resume_writing()
+    assert client.blocked() == 0
 
-    await client.stop()
-    await task
+    client.stop()
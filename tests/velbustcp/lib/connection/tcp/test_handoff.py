@@ -0,0 +1,197 @@
+import asyncio
+import os
+import socket
+import pytest
+from pytest_mock import MockerFixture
+
+from velbustcp.lib import consts
+from velbustcp.lib.connection.tcp.handoff import HandoffServer, HandoffState, inherited_sockets, receive_handoff, recv_fds, socket_address
+from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.connection.tcp.networkmanager import NetworkManager
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+from velbustcp.lib.settings.network import NetworkSettings
+
+
+def get_settings(port: int, workers: int) -> NetworkSettings:
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = port
+    settings.workers = workers
+    return settings
+
+
+def test_inherited_sockets(mocker: MockerFixture):
+    listener = socket.create_server(("127.0.0.1", 0))
+    address = socket_address(listener)
+    mocker.patch("velbustcp.lib.consts.LISTEN_FDS_START", listener.detach())
+    mocker.patch.dict(os.environ, {"LISTEN_PID": str(os.getpid()), "LISTEN_FDS": "1"})
+
+    state = HandoffState()
+    inherited_sockets(state)
+
+    assert list(state.listeners) == [address]
+    assert state.activated == {address}
+    assert "LISTEN_FDS" not in os.environ
+
+    state.close()
+
+
+def test_inherited_sockets_other_process(mocker: MockerFixture):
+    mocker.patch.dict(os.environ, {"LISTEN_PID": "1", "LISTEN_FDS": "1"})
+
+    state = HandoffState()
+    inherited_sockets(state)
+
+    assert not state.listeners
+
+
+def test_receive_handoff_timeout(tmp_path):
+
+    # Arrange, a running process that never hands over
+    path = str(tmp_path / "handoff.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    server.bind(path)
+    server.listen(1)
+
+    # Act
+    state = HandoffState()
+    receive_handoff(path, 0.1, state)
+
+    # Assert
+    assert not state.listeners
+    assert not state.clients
+
+    server.close()
+
+
+def test_receive_handoff_nothing_running(tmp_path):
+    state = HandoffState()
+    receive_handoff(str(tmp_path / "handoff.sock"), 1, state)
+
+    assert not state.listeners
+    assert not state.clients
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_handoff(mocker: MockerFixture, tmp_path, workers):
+
+    # Arrange, a running process with a subscribed client
+    path = str(tmp_path / "handoff.sock")
+    port = 27130 + workers
+    old_manager = NetworkManager()
+    old_network = Network(get_settings(port, workers), EventBus())
+    old_manager.add_network(old_network)
+    old_task = asyncio.create_task(old_manager.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"SUBSCRIBE addresses=0x13\n")
+    await asyncio.sleep(0.1)
+
+    handed_off = asyncio.Event()
+    server = HandoffServer(path, old_manager, handed_off.set)
+    server.start()
+
+    # Act, a new process takes over
+    state = HandoffState()
+    await asyncio.get_running_loop().run_in_executor(None, receive_handoff, path, 1, state)
+    await asyncio.wait_for(handed_off.wait(), 1)
+    await old_manager.stop()
+    old_task.cancel()
+
+    new_manager = NetworkManager()
+    new_network = Network(get_settings(port, workers), EventBus())
+    new_manager.add_network(new_network)
+    new_manager.adopt(state)
+    new_task = asyncio.create_task(new_manager.start())
+    await asyncio.sleep(0.1)
+
+    new_manager.send(Envelope(build_module_type_request(0x12)))
+    new_manager.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert, the client is still connected and subscribed
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    # New clients connect to the new process
+    other_reader, other_writer = await asyncio.open_connection("127.0.0.1", port)
+    await asyncio.sleep(0.1)
+    assert len(new_network.stats()) == 2
+
+    # Cleanup
+    writer.close()
+    other_writer.close()
+    await new_manager.stop()
+    new_task.cancel()
+    for task in (old_task, new_task):
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_handoff_failed(mocker: MockerFixture, tmp_path, workers):
+
+    # Arrange, a running process with a subscribed client
+    path = str(tmp_path / "handoff.sock")
+    port = 27133 + workers
+    manager = NetworkManager()
+    network = Network(get_settings(port, workers), EventBus())
+    manager.add_network(network)
+    start_task = asyncio.create_task(manager.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"SUBSCRIBE addresses=0x13\n")
+    await asyncio.sleep(0.1)
+
+    on_handoff = mocker.Mock()
+    server = HandoffServer(path, manager, on_handoff, 0.5)
+    server.start()
+
+    # Act, the new process goes away after the first message
+    def take_first_message():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET) as sock:
+            sock.connect(path)
+            sock.sendall(consts.HANDOFF_REQUEST)
+            _, fds = recv_fds(sock)
+            for fd in fds:
+                os.close(fd)
+
+    await asyncio.get_running_loop().run_in_executor(None, take_first_message)
+    await asyncio.sleep(0.2)
+
+    manager.send(Envelope(build_module_type_request(0x12)))
+    manager.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert, the running process keeps serving its client and accepting new ones
+    on_handoff.assert_not_called()
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    other_reader, other_writer = await asyncio.open_connection("127.0.0.1", port)
+    await asyncio.sleep(0.1)
+    assert len(network.stats()) == 2
+
+    # Cleanup
+    server.stop()
+    writer.close()
+    other_writer.close()
+    await manager.stop()
+    await asyncio.wait_for(start_task, 1)
+
+
+@pytest.mark.asyncio
+async def test_adopt_unknown_listener(mocker: MockerFixture):
+    state = HandoffState()
+    listener = socket.create_server(("127.0.0.1", 0))
+    state.listeners[socket_address(listener)] = listener
+
+    manager = NetworkManager()
+    manager.add_network(Network(get_settings(27129, 0), EventBus()))
+    manager.adopt(state)
+
+    assert listener.fileno() == -1
@@ -1,16 +1,53 @@
 import asyncio
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import time
 import pytest
 from pytest_mock import MockFixture
 
 from velbustcp.lib.connection.tcp.network import Network
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+from velbustcp.lib.packet.packetfilter import PacketFilter
 from velbustcp.lib.settings.network import NetworkSettings
 
 
+@pytest.fixture
+def certificate(tmp_path):
+    """Creates a self-signed certificate and its private key."""
+
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not available")
+
+    cert = tmp_path / "cert.pem"
+    pk = tmp_path / "pk.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost", "-days", "1", "-keyout", str(pk), "-out", str(cert)],
+        check=True,
+        capture_output=True
+    )
+
+    return str(cert), str(pk)
+
+
+def get_client_context() -> ssl.SSLContext:
+    """Creates a client TLS context that accepts the self-signed certificate."""
+
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
 def test_defaults(mocker: MockFixture):
 
     # Arrange
     settings = NetworkSettings()
-    network = Network(options=settings)
+    network = Network(options=settings, events=EventBus())
 
     # Assert
     assert not network.is_active()
@@ -21,7 +58,7 @@ async def test_start_stop(mocker: MockFixture):
 
     # Arrange
     settings = NetworkSettings()
-    network = Network(options=settings)
+    network = Network(options=settings, events=EventBus())
 
     # Act
     start_task = asyncio.create_task(network.start())
@@ -45,12 +82,631 @@ async def test_send_not_active(mocker: MockFixture):
 
     # Arrange
     settings = NetworkSettings()
-    network = Network(options=settings)
+    network = Network(options=settings, events=EventBus())
     spy = mocker.spy(network, 'is_active')
 
     # Act
-    await network.send(bytearray([]))
+    network.send(bytearray([]))
 
     # Assert
     spy.assert_called_once()
     assert not spy.spy_return
+
+
+@pytest.mark.asyncio
+async def test_send_skips_origin(mocker: MockFixture):
+
+    # Arrange
+    packet = bytearray([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27118
+    events = EventBus()
+    senders = []
+    events.tcp_receive.subscribe(lambda client, packet: senders.append(client))
+
+    network = Network(options=settings, events=events)
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    origin_reader, origin_writer = await asyncio.open_connection(settings.host, settings.port)
+    other_reader, other_writer = await asyncio.open_connection(settings.host, settings.port)
+    origin_writer.write(packet)
+    await asyncio.sleep(0.1)
+
+    # Act
+    network.send(Envelope(packet, senders[0]))
+
+    # Assert
+    assert await asyncio.wait_for(other_reader.read(1024), 1) == packet
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(origin_reader.read(1024), 0.1)
+
+    # Cleanup
+    origin_writer.close()
+    other_writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_send_subscribed(mocker: MockFixture):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27119
+    network = Network(options=settings, events=EventBus())
+    client_open = mocker.spy(network, "handle_client_open")
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection(settings.host, settings.port)
+    writer.write(b"SUBSCRIBE addresses=0x13\n")
+    await asyncio.sleep(0.1)
+
+    # Act
+    network.send(Envelope(build_module_type_request(0x12)))
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+    assert network.client_filter(client_open.call_args.args[0]).addresses == {0x13}
+
+    # Cleanup
+    writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_send_authorized_only(mocker: MockFixture):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27120
+    settings.auth = True
+    settings.auth_key = "velbus"
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    pending_reader, pending_writer = await asyncio.open_connection(settings.host, settings.port)
+    reader, writer = await asyncio.open_connection(settings.host, settings.port)
+    writer.write(b"velbus")
+    await asyncio.sleep(0.1)
+
+    # Act
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(pending_reader.read(1024), 0.1)
+
+    # Cleanup
+    pending_writer.close()
+    writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_admission_limits(mocker: MockFixture):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27121
+    settings.auth = True
+    settings.auth_key = "velbus"
+    settings.max_pending = 1
+    settings.max_clients = 2
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    # Act
+    first_reader, first_writer = await asyncio.open_connection(settings.host, settings.port)
+    await asyncio.sleep(0.1)
+    refused_reader, refused_writer = await asyncio.open_connection(settings.host, settings.port)
+    await asyncio.sleep(0.1)
+
+    # Assert, only a single client can be authorizing
+    assert await asyncio.wait_for(refused_reader.read(1024), 1) == b""
+    assert len(network.stats()) == 1
+
+    # Once authorized, another client is admitted, up to the maximum amount of clients
+    first_writer.write(b"velbus")
+    await asyncio.sleep(0.1)
+    second_reader, second_writer = await asyncio.open_connection(settings.host, settings.port)
+    await asyncio.sleep(0.1)
+    assert len(network.stats()) == 2
+
+    third_reader, third_writer = await asyncio.open_connection(settings.host, settings.port)
+    assert await asyncio.wait_for(third_reader.read(1024), 1) == b""
+
+    # Cleanup
+    for writer in (first_writer, refused_writer, second_writer, third_writer):
+        writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_accept_rate(mocker: MockFixture):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27122
+    settings.accept_rate = 0.1
+    settings.accept_burst = 1
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    # Act
+    first_reader, first_writer = await asyncio.open_connection(settings.host, settings.port)
+    refused_reader, refused_writer = await asyncio.open_connection(settings.host, settings.port)
+
+    # Assert
+    assert await asyncio.wait_for(refused_reader.read(1024), 1) == b""
+    assert len(network.stats()) == 1
+
+    # Cleanup
+    first_writer.close()
+    refused_writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tls_handshakes(mocker: MockFixture, certificate):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27123
+    settings.ssl = True
+    settings.cert, settings.pk = certificate
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+    context = get_client_context()
+
+    # Act
+    reader, writer = await asyncio.open_connection(settings.host, settings.port, ssl=context)
+    await asyncio.sleep(0.1)
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    # Resume the session of the first connection
+    session = writer.get_extra_info("ssl_object").session
+
+    def resume() -> bool:
+        with context.wrap_socket(socket.create_connection(settings.address), session=session) as resumed:
+            return resumed.session_reused
+
+    assert await asyncio.get_running_loop().run_in_executor(None, resume)
+    await asyncio.sleep(0.1)
+
+    stats = network.handshake_stats()
+    assert stats["full"] == 1
+    assert stats["resumed"] == 1
+    assert stats["failed"] == 0
+    assert stats["cpu_time"]["count"] == 2
+    assert 0 < stats["cpu_time"]["min"] <= stats["cpu_time"]["max"]
+    assert network.address() == "127.0.0.1:27123"
+
+    # Cleanup
+    writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tls_pipelined_data(mocker: MockFixture, certificate):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27124
+    settings.ssl = True
+    settings.cert, settings.pk = certificate
+    settings.auth = True
+    settings.auth_key = "velbus"
+    events = EventBus()
+    packets = []
+    events.tcp_receive.subscribe(lambda client, packet: packets.append(packet))
+    network = Network(options=settings, events=events)
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    def pipeline() -> None:
+        incoming, outgoing = ssl.MemoryBIO(), ssl.MemoryBIO()
+        tls = get_client_context().wrap_bio(incoming, outgoing)
+
+        with socket.create_connection(settings.address) as sock:
+            while True:
+                try:
+                    tls.do_handshake()
+                    break
+                except ssl.SSLWantReadError:
+                    sock.sendall(outgoing.read())
+                    incoming.write(sock.recv(65536))
+
+            # The last handshake message, the key and the packets leave in a single write
+            tls.write(b"velbus\n" + bytes(build_module_type_request(0x13)) * 5)
+            sock.sendall(outgoing.read())
+            time.sleep(0.2)
+
+    # Act
+    await asyncio.get_running_loop().run_in_executor(None, pipeline)
+
+    # Assert
+    assert packets == [build_module_type_request(0x13)] * 5
+
+    # Cleanup
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tls_handshake_limits(mocker: MockFixture, certificate):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27124
+    settings.ssl = True
+    settings.cert, settings.pk = certificate
+    settings.handshake_timeout = 0.2
+    settings.max_handshakes = 1
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    # Act, plain connections never complete their handshake
+    stalled_reader, stalled_writer = await asyncio.open_connection(settings.host, settings.port)
+    await asyncio.sleep(0.05)
+    refused_reader, refused_writer = await asyncio.open_connection(settings.host, settings.port)
+
+    # Assert
+    assert await asyncio.wait_for(refused_reader.read(1024), 1) == b""
+    assert await asyncio.wait_for(stalled_reader.read(1024), 1) == b""
+    stats = network.handshake_stats()
+    assert stats["refused"] == 1
+    assert stats["failed"] == 1
+    assert stats["active"] == 0
+    assert not network.stats()
+
+    # Cleanup
+    stalled_writer.close()
+    refused_writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+def test_handshake_stats_no_tls():
+
+    assert Network(options=NetworkSettings(), events=EventBus()).handshake_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_workers(mocker: MockFixture):
+
+    # Arrange
+    packet = bytearray([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27125
+    settings.workers = 2
+    events = EventBus()
+    received = []
+    events.tcp_receive.subscribe(lambda client, packet: received.append((client, asyncio.get_running_loop())))
+
+    network = Network(options=settings, events=events)
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    connections = [await asyncio.open_connection(settings.host, settings.port) for _ in range(4)]
+    await asyncio.sleep(0.1)
+
+    # Act
+    connections[0][1].write(packet)
+    await asyncio.sleep(0.1)
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert, received packets are handled on the loop of the bridge
+    assert network.is_active()
+    assert len(network.stats()) == 4
+    assert received[0][1] is asyncio.get_running_loop()
+    assert received[0][0].loop() is not asyncio.get_running_loop()
+
+    for reader, _ in connections:
+        assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    # Cleanup
+    await network.stop()
+    assert not network.is_active()
+
+    for reader, writer in connections:
+        assert await asyncio.wait_for(reader.read(1024), 1) == b""
+        writer.close()
+
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_workers_tls(mocker: MockFixture, certificate):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27126
+    settings.ssl = True
+    settings.cert, settings.pk = certificate
+    settings.workers = 2
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection(settings.host, settings.port, ssl=get_client_context())
+    await asyncio.sleep(0.1)
+
+    # Act
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+    assert network.handshake_stats()["full"] == 1
+
+    # Cleanup
+    writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_unix_socket(mocker: MockFixture, tmp_path, workers):
+
+    # Arrange
+    packet = bytearray([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+    settings = NetworkSettings()
+    settings.unix = str(tmp_path / "velbus.sock")
+    settings.unix_mode = 0o600
+    settings.workers = workers
+    events = EventBus()
+    received = []
+    events.tcp_receive.subscribe(lambda client, packet: received.append(packet))
+
+    network = Network(options=settings, events=events)
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    connections = [await asyncio.open_unix_connection(settings.unix) for _ in range(2)]
+    await asyncio.sleep(0.1)
+
+    # Act
+    connections[0][1].write(packet)
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert
+    assert os.stat(settings.unix).st_mode & 0o777 == 0o600
+    assert network.address() == settings.unix
+    assert len(network.stats()) == 2
+
+    for reader, _ in connections:
+        assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    await asyncio.sleep(0.1)
+    assert received == [packet]
+
+    # Cleanup
+    for _, writer in connections:
+        writer.close()
+    await network.stop()
+    assert not os.path.exists(settings.unix)
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_reap_idle(mocker: MockFixture):
+
+    # Arrange
+    mocker.patch("velbustcp.lib.consts.REAP_INTERVAL", 0.05)
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27127
+    settings.idle_timeout = 0.2
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    # Act, one client sends, one only receives
+    idle_reader, idle_writer = await asyncio.open_connection(settings.host, settings.port)
+    idle_writer.write(b"SUBSCRIBE addresses=0x14\n")
+    active_reader, active_writer = await asyncio.open_connection(settings.host, settings.port)
+    listening_reader, listening_writer = await asyncio.open_connection(settings.host, settings.port)
+
+    for _ in range(6):
+        active_writer.write(b"\n")
+        network.send(Envelope(build_module_type_request(0x13)))
+        await asyncio.sleep(0.05)
+
+    # Assert
+    assert await asyncio.wait_for(idle_reader.read(1024), 1) == b""
+    assert len(network.stats()) == 2
+    assert network.network_stats() == {"reaped": {"idle": 1, "blocked": 0}}
+
+    # Cleanup
+    idle_writer.close()
+    active_writer.close()
+    listening_writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_reconfigure(mocker: MockFixture):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27140
+    settings.auth = True
+    settings.auth_key = "velbus"
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection(settings.host, settings.port)
+    writer.write(b"velbus")
+    await asyncio.sleep(0.1)
+
+    new_settings = NetworkSettings()
+    new_settings.host = "127.0.0.1"
+    new_settings.port = 27140
+    new_settings.auth = True
+    new_settings.auth_key = "changed"
+    new_settings.filter = PacketFilter(addresses=frozenset([0x13]))
+
+    # Act
+    assert network.reconfigure(new_settings)
+    network.send(Envelope(build_module_type_request(0x12)))
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    # Assert, the connected client stays authorized and gets the new filter
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    # New clients authorize with the new key
+    old_reader, old_writer = await asyncio.open_connection(settings.host, settings.port)
+    old_writer.write(b"velbus\n")
+    new_reader, new_writer = await asyncio.open_connection(settings.host, settings.port)
+    new_writer.write(b"changed\n")
+    await asyncio.sleep(0.1)
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    assert await asyncio.wait_for(new_reader.read(1024), 1) == build_module_type_request(0x13)
+    assert await asyncio.wait_for(old_reader.read(1024), 1) == b""
+
+    # Cleanup
+    for client_writer in (writer, old_writer, new_writer):
+        client_writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_reconfigure_invalid_certificate(mocker: MockFixture, certificate, tmp_path):
+
+    # Arrange
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = 27147
+    settings.ssl = True
+    settings.cert, settings.pk = certificate
+    network = Network(options=settings, events=EventBus())
+    start_task = asyncio.create_task(network.start())
+    await asyncio.sleep(0.1)
+
+    invalid = tmp_path / "invalid.pem"
+    invalid.write_text("invalid")
+    new_settings = NetworkSettings()
+    new_settings.host = "127.0.0.1"
+    new_settings.port = 27147
+    new_settings.ssl = True
+    new_settings.cert, new_settings.pk = str(invalid), certificate[1]
+    new_settings.max_clients = 1
+
+    # Act & Assert, the network keeps its settings and certificate
+    with pytest.raises(ssl.SSLError):
+        network.reconfigure(new_settings)
+
+    readers = []
+    for _ in range(2):
+        reader, writer = await asyncio.open_connection(settings.host, settings.port, ssl=get_client_context())
+        readers.append((reader, writer))
+    await asyncio.sleep(0.1)
+    network.send(Envelope(build_module_type_request(0x13)))
+
+    for reader, _ in readers:
+        assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+
+    # Cleanup
+    for _, writer in readers:
+        writer.close()
+    await network.stop()
+    start_task.cancel()
+    try:
+        await start_task
+    except asyncio.CancelledError:
+        pass
+
+
+def test_reconfigure_restart():
+
+    # Arrange
+    network = Network(options=NetworkSettings(), events=EventBus())
+    settings = NetworkSettings()
+    settings.workers = 2
+
+    # Act & Assert
+    assert not network.reconfigure(settings)
@@ -1,7 +1,14 @@
+import asyncio
+import socket
+import ssl
 import pytest
 from pytest_mock import MockFixture
 from velbustcp.lib.connection.tcp.network import Network
 from velbustcp.lib.connection.tcp.networkmanager import NetworkManager
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+from velbustcp.lib.settings.network import NetworkSettings
 
 
 @pytest.mark.asyncio
@@ -32,8 +39,7 @@ async def test_stop(mocker: MockFixture):
     network.stop.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_send(mocker: MockFixture):
+def test_send(mocker: MockFixture):
     # Arrange
     packet = bytearray([0x01])
     network_manager = NetworkManager()
@@ -41,7 +47,7 @@ async def test_send(mocker: MockFixture):
     network_manager.add_network(network)
 
     # Act
-    await network_manager.send(packet)
+    network_manager.send(packet)
 
     # Assert
     network.send.assert_called_once_with(packet)
@@ -62,3 +68,161 @@ async def test_add_multiple_networks(mocker: MockFixture):
     # Assert
     network1.start.assert_called_once()
     network2.start.assert_called_once()
+
+
+def get_settings(port: int) -> NetworkSettings:
+    settings = NetworkSettings()
+    settings.host = "127.0.0.1"
+    settings.port = port
+    return settings
+
+
+def test_stats(mocker: MockFixture):
+
+    # Arrange, clients with the same address on different networks
+    network_manager = NetworkManager()
+    for address in ("/run/velbus.sock", "/run/velbus-ro.sock"):
+        network = mocker.Mock(spec=Network)
+        network.address.return_value = address
+        network.stats.return_value = {"": {"address": address}}
+        network_manager.add_network(network)
+
+    # Act
+    stats = network_manager.stats()
+
+    # Assert
+    assert stats == {
+        "/run/velbus.sock": {"": {"address": "/run/velbus.sock"}},
+        "/run/velbus-ro.sock": {"": {"address": "/run/velbus-ro.sock"}}
+    }
+
+
+@pytest.mark.asyncio
+async def test_reload(mocker: MockFixture):
+
+    # Arrange
+    events = EventBus()
+    network_manager = NetworkManager()
+    network_manager.add_network(Network(get_settings(27141), events))
+    network_manager.add_network(Network(get_settings(27142), events))
+    start_task = asyncio.create_task(network_manager.start())
+    await asyncio.sleep(0.1)
+
+    kept_reader, kept_writer = await asyncio.open_connection("127.0.0.1", 27141)
+    removed_reader, removed_writer = await asyncio.open_connection("127.0.0.1", 27142)
+    await asyncio.sleep(0.1)
+
+    kept = get_settings(27141)
+    kept.max_clients = 10
+
+    # Act
+    await network_manager.reload([kept, get_settings(27143)], events)
+    await asyncio.sleep(0.1)
+
+    # Assert, the reconfigured network keeps its clients, the removed one disconnects them
+    assert await asyncio.wait_for(removed_reader.read(1024), 1) == b""
+    with pytest.raises(ConnectionRefusedError):
+        await asyncio.open_connection("127.0.0.1", 27142)
+
+    added_reader, added_writer = await asyncio.open_connection("127.0.0.1", 27143)
+    await asyncio.sleep(0.1)
+    network_manager.send(Envelope(build_module_type_request(0x13)))
+
+    assert await asyncio.wait_for(kept_reader.read(1024), 1) == build_module_type_request(0x13)
+    assert await asyncio.wait_for(added_reader.read(1024), 1) == build_module_type_request(0x13)
+    assert list(network_manager.network_stats()) == ["127.0.0.1:27141", "127.0.0.1:27143"]
+
+    # Cleanup
+    for writer in (kept_writer, removed_writer, added_writer):
+        writer.close()
+    await network_manager.stop()
+    await asyncio.wait_for(start_task, 1)
+
+
+@pytest.mark.asyncio
+async def test_reload_restart(mocker: MockFixture):
+
+    # Arrange
+    events = EventBus()
+    network_manager = NetworkManager()
+    network_manager.add_network(Network(get_settings(27144), events))
+    start_task = asyncio.create_task(network_manager.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", 27144)
+    await asyncio.sleep(0.1)
+
+    restarted = get_settings(27144)
+    restarted.framed = True
+
+    # Act
+    await network_manager.reload([restarted], events)
+    await asyncio.sleep(0.1)
+
+    # Assert
+    assert await asyncio.wait_for(reader.read(1024), 1) == b""
+    _, other_writer = await asyncio.open_connection("127.0.0.1", 27144)
+    await asyncio.sleep(0.1)
+    assert len(network_manager.stats()["127.0.0.1:27144"]) == 1
+
+    # Cleanup
+    writer.close()
+    other_writer.close()
+    await network_manager.stop()
+    await asyncio.wait_for(start_task, 1)
+
+
+@pytest.mark.asyncio
+async def test_reload_start_failure(mocker: MockFixture):
+
+    # Arrange
+    events = EventBus()
+    network_manager = NetworkManager()
+    network_manager.add_network(Network(get_settings(27145), events))
+    start_task = asyncio.create_task(network_manager.start())
+    await asyncio.sleep(0.1)
+
+    occupied = socket.create_server(("127.0.0.1", 27146))
+
+    # Act
+    await network_manager.reload([get_settings(27145), get_settings(27146)], events)
+    await asyncio.sleep(0.1)
+
+    # Assert, the other networks keep running
+    assert not start_task.done()
+    assert list(network_manager.network_stats()) == ["127.0.0.1:27145"]
+
+    # Cleanup
+    occupied.close()
+    await network_manager.stop()
+    await asyncio.wait_for(start_task, 1)
+
+
+@pytest.mark.asyncio
+async def test_reload_reconfigure_failure(mocker: MockFixture):
+
+    # Arrange
+    events = EventBus()
+    network_manager = NetworkManager()
+    network = Network(get_settings(27148), events)
+    network_manager.add_network(network)
+    start_task = asyncio.create_task(network_manager.start())
+    await asyncio.sleep(0.1)
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", 27148)
+    await asyncio.sleep(0.1)
+    mocker.patch.object(network, "reconfigure", side_effect=ssl.SSLError("invalid certificate"))
+
+    # Act
+    await network_manager.reload([get_settings(27148), get_settings(27149)], events)
+    await asyncio.sleep(0.1)
+
+    # Assert, the network keeps running with its clients and the others are still applied
+    network_manager.send(Envelope(build_module_type_request(0x13)))
+    assert await asyncio.wait_for(reader.read(1024), 1) == build_module_type_request(0x13)
+    assert list(network_manager.network_stats()) == ["127.0.0.1:27148", "127.0.0.1:27149"]
+
+    # Cleanup
+    writer.close()
+    await network_manager.stop()
+    await asyncio.wait_for(start_task, 1)
@@ -1,34 +1,215 @@
 
+import asyncio
+import json
 import pytest
 
 from pytest_mock import MockerFixture
 from velbustcp.lib.connection.bridge import Bridge
-from velbustcp.lib.consts import COMMAND_BUS_ACTIVE, COMMAND_BUS_BUFFERREADY, COMMAND_BUS_OFF, ETX, PRIORITY_HIGH, STX
+from velbustcp.lib.consts import (
+    COMMAND_BUS_ACTIVE, COMMAND_BUS_BUFFERREADY, COMMAND_BUS_OFF, CONTROL_RESUME, CONTROL_RESYNC, CONTROL_SNAPSHOT, CONTROL_STATS, ETX, PRIORITY_HIGH, STX
+)
+from velbustcp.lib.events import EventBus
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.frame import RUN_EPOCH
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+from velbustcp.lib.packet.packetfilter import PacketFilter
+from velbustcp.lib.settings.discovery import DiscoverySettings
 
 BUS_ACTIVE_DATA = bytearray([ETX, PRIORITY_HIGH, 0x00, 0x01, COMMAND_BUS_ACTIVE, 0x00, STX])
 BUS_OFF_DATA = bytearray([ETX, PRIORITY_HIGH, 0x00, 0x01, COMMAND_BUS_OFF, 0x00, STX])
 BUS_BUFFER_READY_DATA = bytearray([ETX, PRIORITY_HIGH, 0x00, 0x01, COMMAND_BUS_BUFFERREADY, 0x00, STX])
+RELAY_STATUS_DATA = bytearray([0x0F, 0xFB, 0x12, 0x08, 0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0xE4, 0x04])
+MODULE_TYPE_DATA = bytearray([0x0F, 0xFB, 0x12, 0x04, 0xFF, 0x01, 0x02, 0x03, 0x00, 0x04])
 
 
 @pytest.mark.asyncio
 async def test_bridge_start(mocker: MockerFixture):
     mock_bus = mocker.AsyncMock()
     mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
 
-    bridge = Bridge(mock_bus, mock_network_manager)
+    bridge = Bridge(mock_bus, mock_network_manager, EventBus())
     await bridge.start()
 
     mock_bus.ensure.assert_called()
     mock_network_manager.start.assert_called()
 
+    await bridge.stop()
+
 
 @pytest.mark.asyncio
 async def test_bridge_stop(mocker: MockerFixture):
     mock_bus = mocker.AsyncMock()
     mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
 
-    bridge = Bridge(mock_bus, mock_network_manager)
+    bridge = Bridge(mock_bus, mock_network_manager, EventBus())
     await bridge.stop()
 
     mock_bus.stop.assert_called()
     mock_network_manager.stop.assert_called()
+
+
+def test_bridge_close(mocker: MockerFixture):
+    mock_bus = mocker.Mock()
+    events = EventBus()
+
+    bridge = Bridge(mock_bus, mocker.Mock(), events)
+    assert len(events.bus_receive) == 1
+
+    bridge.close()
+    assert len(events.bus_receive) == 0
+    mock_bus.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bridge_snapshot(mocker: MockerFixture):
+    mock_bus = mocker.AsyncMock()
+    mock_bus.stats = mocker.Mock(return_value={})
+    mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
+    mock_network_manager.stats = mocker.Mock(return_value={})
+    mock_network_manager.network_stats = mocker.Mock(return_value={})
+    mock_client = mocker.Mock()
+
+    events = EventBus()
+    bridge = Bridge(mock_bus, mock_network_manager, events)
+    events.bus_receive.emit(RELAY_STATUS_DATA)
+    events.client_control.emit(mock_client, CONTROL_SNAPSHOT, [])
+    await asyncio.sleep(0)
+
+    mock_client.send.assert_called_with(RELAY_STATUS_DATA)
+    assert bridge.stats()["state_cache"] == 1
+    assert bridge.stats()["queues"]["network"] == 1
+
+
+def test_bridge_stats_control(mocker: MockerFixture):
+    mock_bus = mocker.Mock()
+    mock_bus.stats = mocker.Mock(return_value={"state": "active"})
+    mock_network_manager = mocker.Mock()
+    mock_network_manager.stats = mocker.Mock(return_value={"127.0.0.1:27015": {"127.0.0.1:50000": {"sent": 1}}})
+    mock_network_manager.network_stats = mocker.Mock(return_value={})
+    mock_client = mocker.Mock()
+
+    events = EventBus()
+    Bridge(mock_bus, mock_network_manager, events)
+    events.client_control.emit(mock_client, CONTROL_STATS, [])
+
+    data = mock_client.send.call_args.args[0]
+    assert data.endswith(b"\n")
+    stats = json.loads(data)
+    assert stats["bus"] == {"state": "active"}
+    assert stats["clients"] == {"127.0.0.1:27015": {"127.0.0.1:50000": {"sent": 1}}}
+
+
+@pytest.mark.asyncio
+async def test_bridge_discovery(mocker: MockerFixture):
+    mock_bus = mocker.AsyncMock()
+    mock_bus.stats = mocker.Mock(return_value={})
+    mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
+    mock_network_manager.stats = mocker.Mock(return_value={})
+    mock_network_manager.network_stats = mocker.Mock(return_value={})
+    mock_client = mocker.Mock()
+    settings = DiscoverySettings()
+    settings.enabled = True
+
+    events = EventBus()
+    bridge = Bridge(mock_bus, mock_network_manager, events, discovery_settings=settings)
+    await bridge.start()
+
+    # Unknown module goes to the bus
+    events.tcp_receive.emit(mock_client, build_module_type_request(0x12))
+    await asyncio.sleep(0)
+    mock_bus.send.assert_called_once()
+    assert mock_bus.send.call_args.args[0].origin is mock_client
+
+    # Known module is answered locally
+    events.bus_receive.emit(MODULE_TYPE_DATA)
+    events.tcp_receive.emit(mock_client, build_module_type_request(0x12))
+    await asyncio.sleep(0)
+    mock_bus.send.assert_called_once()
+    mock_client.send.assert_called_with(MODULE_TYPE_DATA)
+
+    # Until it's invalidated
+    events.client_control.emit(mock_client, "INVALIDATE", ["0x12"])
+    events.tcp_receive.emit(mock_client, build_module_type_request(0x12))
+    await asyncio.sleep(0)
+    assert mock_bus.send.call_count == 2
+    assert bridge.stats()["discovery"]["hits"] == 1
+
+    await bridge.stop()
+
+
+@pytest.mark.asyncio
+async def test_bridge_forwards_in_order(mocker: MockerFixture):
+    mock_bus = mocker.AsyncMock()
+    mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
+
+    events = EventBus()
+    bridge = Bridge(mock_bus, mock_network_manager, events)
+    await bridge.start()
+
+    packets = [build_module_type_request(address) for address in range(1, 100)]
+    for packet in packets:
+        events.bus_receive.emit(packet)
+    await asyncio.sleep(0.01)
+
+    assert [call.args[0].packet for call in mock_network_manager.send.call_args_list] == packets
+
+    await bridge.stop()
+
+
+@pytest.mark.asyncio
+async def test_bridge_resume(mocker: MockerFixture):
+    mock_bus = mocker.AsyncMock()
+    mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
+    mock_network_manager.client_filter = mocker.Mock(return_value=PacketFilter(addresses=frozenset([0x01, 0x02])))
+    mock_client = mocker.Mock()
+    mock_client.first_sequence = mocker.Mock(return_value=0)
+    mock_client.connection().framed = True
+
+    events = EventBus()
+    bridge = Bridge(mock_bus, mock_network_manager, events)
+    await bridge.start()
+
+    packets = [build_module_type_request(address) for address in range(1, 4)]
+    for packet in packets:
+        events.bus_receive.emit(packet)
+    events.bus_send.emit(Envelope(build_module_type_request(0x02), mock_client))
+    await asyncio.sleep(0.01)
+
+    assert [call.args[0].sequence for call in mock_network_manager.send.call_args_list] == [1, 2, 3, 4]
+
+    # Only the missed packets the client would have received live are replayed, not its own
+    events.client_control.emit(mock_client, CONTROL_RESUME, [str(RUN_EPOCH), "0"])
+    mock_client.send.assert_called_with(bytearray(packets[0] + packets[1]), 4)
+
+    # Unless they come from another run
+    mock_client.send.reset_mock()
+    events.client_control.emit(mock_client, CONTROL_RESUME, [str(RUN_EPOCH ^ 1), "1"])
+    mock_client.send.assert_called_with(bytearray(CONTROL_RESYNC))
+
+    # The run epoch is required
+    mock_client.send.reset_mock()
+    events.client_control.emit(mock_client, CONTROL_RESUME, ["1"])
+    mock_client.send.assert_called_with(bytearray(CONTROL_RESYNC))
+
+    await bridge.stop()
+
+
+@pytest.mark.asyncio
+async def test_bridge_resume_not_framed(mocker: MockerFixture):
+    mock_network_manager = mocker.AsyncMock()
+    mock_network_manager.send = mocker.Mock()
+    mock_client = mocker.Mock()
+    mock_client.connection().framed = False
+
+    events = EventBus()
+    Bridge(mocker.AsyncMock(), mock_network_manager, events)
+
+    events.client_control.emit(mock_client, CONTROL_RESUME, [str(RUN_EPOCH), "0"])
+
+    mock_client.send.assert_called_with(bytearray(CONTROL_RESYNC))
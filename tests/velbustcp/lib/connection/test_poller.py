@@ -0,0 +1,72 @@
+import asyncio
+
+from pytest_mock import MockerFixture
+
+from velbustcp.lib.connection.poller import Poller
+from velbustcp.lib.consts import POLLER_IDLE_DELAY
+from velbustcp.lib.packet.handlers.busload import BusLoad
+from velbustcp.lib.packet.handlers.statecache import StateCache
+from velbustcp.lib.settings.poller import PollerSettings
+from velbustcp.lib.util.scheduler import Scheduler
+
+RELAY_STATUS = bytearray([0x0F, 0xFB, 0x12, 0x08, 0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0xE4, 0x04])
+
+
+def get_poller(mocker: MockerFixture, bus_load=None, send=None):
+    settings = PollerSettings()
+    settings.enabled = True
+    settings.modules = [0x12, 0x13]
+    settings.interval = 60
+
+    state_cache = StateCache()
+    return Poller(send or mocker.Mock(), settings, state_cache, bus_load or BusLoad(), Scheduler()), state_cache
+
+
+def test_skips_recently_seen(mocker: MockerFixture):
+    poller, state_cache = get_poller(mocker)
+
+    assert poller.next_due() == (0x12, 0)
+
+    state_cache.receive_packet(RELAY_STATUS)
+    assert poller.next_due() == (0x13, 0)
+
+
+def test_nothing_due(mocker: MockerFixture):
+    poller, state_cache = get_poller(mocker)
+    state_cache.receive_packet(RELAY_STATUS)
+    state_cache.receive_packet(RELAY_STATUS[:2] + bytearray([0x13]) + RELAY_STATUS[3:])
+
+    address, wait = poller.next_due()
+    assert address is None
+    assert 0 < wait <= 60
+
+
+def test_delay_adapts_to_bus_load(mocker: MockerFixture):
+    bus_load = mocker.Mock(spec=BusLoad)
+    poller, _ = get_poller(mocker, bus_load)
+
+    bus_load.spare.return_value = 20
+    assert poller.delay() == 0.1
+
+    bus_load.spare.return_value = 2
+    assert poller.delay() == 1
+
+    bus_load.spare.return_value = 0
+    assert poller.delay() == POLLER_IDLE_DELAY
+
+
+def test_start_polls(mocker: MockerFixture):
+    async def run():
+        bus_load = mocker.Mock(spec=BusLoad)
+        bus_load.spare.return_value = 200
+        send = mocker.Mock()
+        poller, _ = get_poller(mocker, bus_load, send)
+
+        poller.start()
+        await asyncio.sleep(0.1)
+        poller.stop()
+
+        assert poller.stats()["polls"] == 2
+        assert [call.args[0].packet[2] for call in send.call_args_list] == [0x12, 0x13]
+
+    asyncio.run(run())
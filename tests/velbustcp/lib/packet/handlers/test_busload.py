@@ -0,0 +1,25 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from velbustcp.lib.consts import BUS_CAPACITY
+from velbustcp.lib.packet.handlers.busload import BusLoad
+
+
+def test_idle():
+    load = BusLoad()
+
+    assert load.rate() == 0
+    assert load.spare() == BUS_CAPACITY
+
+
+def test_decay(mocker: MockerFixture):
+    clock = mocker.patch("velbustcp.lib.packet.handlers.busload.time.monotonic", return_value=0.0)
+    load = BusLoad(window=10)
+
+    for _ in range(100):
+        load.packet()
+    assert load.rate() == pytest.approx(10)
+    assert load.spare() == pytest.approx(BUS_CAPACITY - 10)
+
+    clock.return_value = 1000.0
+    assert load.rate() == pytest.approx(0)
@@ -0,0 +1,91 @@
+from pytest_mock import MockerFixture
+
+from velbustcp.lib.consts import COMMAND_MODULE_NAME_REQUEST, PRIORITY_LOW
+from velbustcp.lib.packet.handlers.discoverycache import DiscoveryCache
+from velbustcp.lib.packet.packetbuilder import build_module_type_request, build_packet
+
+MODULE_TYPE = build_packet(PRIORITY_LOW, 0x12, bytes([0xFF, 0x1E, 0x01, 0x02, 0x03, 0x04, 0x05]))
+OTHER_MODULE_TYPE = build_packet(PRIORITY_LOW, 0x12, bytes([0xFF, 0x20, 0x01, 0x02, 0x03, 0x04, 0x05]))
+MODULE_SUBTYPE = build_packet(PRIORITY_LOW, 0x12, bytes([0xB0, 0x1E, 0x01, 0x02, 0x13, 0xFF, 0xFF, 0xFF]))
+NAME_REQUEST = build_packet(PRIORITY_LOW, 0x12, bytes([COMMAND_MODULE_NAME_REQUEST, 0x01]))
+NAMES = [build_packet(PRIORITY_LOW, 0x12, bytes([command, 0x01, 0x41, 0x42])) for command in (0xF0, 0xF1, 0xF2)]
+
+
+def get_clock(mocker: MockerFixture):
+    return mocker.patch("velbustcp.lib.packet.handlers.discoverycache.time.monotonic", return_value=100.0)
+
+
+def test_module_type(mocker: MockerFixture):
+    get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+
+    assert cache.answer(build_module_type_request(0x12)) is None
+
+    cache.receive_packet(MODULE_TYPE)
+    cache.receive_packet(MODULE_SUBTYPE)
+
+    assert cache.answer(build_module_type_request(0x12)) == [bytes(MODULE_TYPE), bytes(MODULE_SUBTYPE)]
+    assert cache.stats() == {"modules": 1, "hits": 1, "misses": 1}
+
+
+def test_ttl(mocker: MockerFixture):
+    clock = get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+    cache.receive_packet(MODULE_TYPE)
+
+    clock.return_value = 161.0
+    assert cache.answer(build_module_type_request(0x12)) is None
+
+
+def test_absent_module(mocker: MockerFixture):
+    clock = get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+    cache.request_sent(build_module_type_request(0x13))
+
+    # Still waiting for a response
+    assert cache.answer(build_module_type_request(0x13)) is None
+
+    clock.return_value = 102.0
+    assert cache.answer(build_module_type_request(0x13)) == []
+
+    # Only for a short time, well within the TTL
+    clock.return_value = 112.0
+    assert cache.answer(build_module_type_request(0x13)) is None
+
+    # Until another request goes unanswered
+    cache.request_sent(build_module_type_request(0x13))
+    clock.return_value = 113.0
+    assert cache.answer(build_module_type_request(0x13)) == []
+
+
+def test_hardware_change(mocker: MockerFixture):
+    get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+    cache.receive_packet(MODULE_TYPE)
+    cache.receive_packet(MODULE_SUBTYPE)
+
+    cache.receive_packet(OTHER_MODULE_TYPE)
+
+    assert cache.answer(build_module_type_request(0x12)) == [bytes(OTHER_MODULE_TYPE)]
+
+
+def test_names(mocker: MockerFixture):
+    get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+
+    for name in NAMES[:2]:
+        cache.receive_packet(name)
+    assert cache.answer(NAME_REQUEST) is None
+
+    cache.receive_packet(NAMES[2])
+    assert cache.answer(NAME_REQUEST) == [bytes(name) for name in NAMES]
+
+
+def test_invalidate(mocker: MockerFixture):
+    get_clock(mocker)
+    cache = DiscoveryCache(ttl=60)
+    cache.receive_packet(MODULE_TYPE)
+
+    cache.invalidate(0x12)
+
+    assert cache.answer(build_module_type_request(0x12)) is None
@@ -0,0 +1,65 @@
+from pytest_mock import MockerFixture
+
+from velbustcp.lib.packet.handlers.latency import LatencyTracker
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+
+REQUEST = build_module_type_request(0x12)
+RESPONSE = bytearray([0x0F, 0xFB, 0x12, 0x04, 0xFF, 0x01, 0x02, 0x03, 0x00, 0x04])
+
+
+def test_unknown_module_not_tracked():
+    tracker = LatencyTracker()
+
+    tracker.request_sent(REQUEST)
+
+    assert tracker.modules() == []
+    assert not tracker.is_pending(0x12)
+
+
+def test_round_trip(mocker: MockerFixture):
+    clock = mocker.patch("velbustcp.lib.packet.handlers.latency.time.monotonic", return_value=10.0)
+    tracker = LatencyTracker()
+    tracker.response_received(RESPONSE)
+
+    tracker.request_sent(REQUEST)
+    assert tracker.is_pending(0x12)
+
+    clock.return_value = 10.03
+    tracker.response_received(RESPONSE)
+    assert not tracker.is_pending(0x12)
+
+    stats = tracker.stats()["0x12"]
+    assert stats["rtt"]["count"] == 1
+    assert stats["rtt"]["buckets"]["50ms"] == 1
+    assert stats["timeouts"] == 0
+
+
+def test_timeout(mocker: MockerFixture):
+    clock = mocker.patch("velbustcp.lib.packet.handlers.latency.time.monotonic", return_value=10.0)
+    tracker = LatencyTracker(timeout=1.0)
+    tracker.response_received(RESPONSE)
+
+    tracker.request_sent(REQUEST)
+    clock.return_value = 12.0
+    tracker.response_received(RESPONSE)
+
+    stats = tracker.stats()["0x12"]
+    assert stats["rtt"]["count"] == 0
+    assert stats["timeouts"] == 1
+
+
+def test_slowest_first(mocker: MockerFixture):
+    clock = mocker.patch("velbustcp.lib.packet.handlers.latency.time.monotonic", return_value=0.0)
+    tracker = LatencyTracker()
+
+    for address, rtt in [(0x01, 0.01), (0x02, 0.5)]:
+        response = bytearray(RESPONSE)
+        response[2] = address
+        tracker.response_received(response)
+
+        clock.return_value = 0.0
+        tracker.request_sent(build_module_type_request(address))
+        clock.return_value = rtt
+        tracker.response_received(response)
+
+    assert list(tracker.stats()) == ["0x02", "0x01"]
@@ -0,0 +1,52 @@
+from velbustcp.lib.packet.envelope import Envelope
+from velbustcp.lib.packet.frame import RUN_EPOCH
+from velbustcp.lib.packet.handlers.replayring import ReplayRing
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+
+
+def test_add():
+    ring = ReplayRing()
+    envelope = Envelope(build_module_type_request(0x01))
+
+    assert ring.add(envelope) == 1
+    assert envelope.sequence == 1
+    assert ring.add(Envelope(build_module_type_request(0x02))) == 2
+    assert ring.last == 2
+    assert ring.epoch == RUN_EPOCH
+    assert len(ring) == 2
+
+
+def test_since():
+    ring = ReplayRing()
+    envelopes = [Envelope(build_module_type_request(address)) for address in range(1, 6)]
+    for envelope in envelopes:
+        ring.add(envelope)
+
+    assert ring.since(RUN_EPOCH, 2) == envelopes[2:]
+    assert ring.since(RUN_EPOCH, 2, until=4) == [envelopes[2]]
+    assert ring.since(RUN_EPOCH, 5) == []
+    assert ring.since(RUN_EPOCH, 0) == envelopes
+
+
+def test_since_too_old():
+    ring = ReplayRing(size=2)
+    envelopes = [Envelope(build_module_type_request(address)) for address in range(1, 6)]
+    for envelope in envelopes:
+        ring.add(envelope)
+
+    assert len(ring) == 2
+    assert ring.since(RUN_EPOCH, 4) == [envelopes[4]]
+    assert ring.since(RUN_EPOCH, 3) == envelopes[3:]
+    assert ring.since(RUN_EPOCH, 2) is None
+
+    # Sequence numbers of another run
+    assert ring.since(RUN_EPOCH, 10) is None
+
+
+def test_since_other_run():
+    ring = ReplayRing()
+    for address in range(1, 6):
+        ring.add(Envelope(build_module_type_request(address)))
+
+    # Even when the sequence number is in range
+    assert ring.since(RUN_EPOCH ^ 1, 2) is None
@@ -0,0 +1,26 @@
+from velbustcp.lib.packet.handlers.statecache import StateCache
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+
+RELAY_ON = bytearray([0x0F, 0xFB, 0x12, 0x08, 0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0xE4, 0x04])
+RELAY_OFF = bytearray([0x0F, 0xFB, 0x12, 0x08, 0xFB, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xE5, 0x04])
+RELAY_2_OFF = bytearray([0x0F, 0xFB, 0x12, 0x08, 0xFB, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xE4, 0x04])
+BUTTON_PRESS = bytearray([0x0F, 0xF8, 0x12, 0x04, 0x00, 0x01, 0x00, 0x00, 0xE4, 0x04])
+
+
+def test_ignores_non_status():
+    cache = StateCache()
+
+    cache.receive_packet(BUTTON_PRESS)
+    cache.receive_packet(build_module_type_request(0x12))
+
+    assert len(cache) == 0
+
+
+def test_latest_per_channel():
+    cache = StateCache()
+
+    cache.receive_packet(RELAY_ON)
+    cache.receive_packet(RELAY_2_OFF)
+    cache.receive_packet(RELAY_OFF)
+
+    assert cache.snapshot() == [bytes(RELAY_OFF), bytes(RELAY_2_OFF)]
@@ -0,0 +1,11 @@
+from velbustcp.lib.packet.envelope import Envelope
+
+
+def test_envelope():
+    packet = bytearray([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+    first = Envelope(packet)
+    second = Envelope(packet, origin=None)
+
+    assert first.packet is packet
+    assert first.origin is None
+    assert second.sequence == 0
@@ -0,0 +1,29 @@
+from velbustcp.lib.consts import FRAME_DIRECTION_BUS, FRAME_DIRECTION_SEND
+from velbustcp.lib.packet.frame import FRAME_HEADER, RUN_EPOCH, decode_frames, encode_frame
+from velbustcp.lib.packet.packetbuilder import build_module_type_request
+
+
+def test_encode():
+    packet = build_module_type_request(0x12)
+    frame = encode_frame(packet, FRAME_DIRECTION_SEND, 3, 1.5)
+
+    assert len(frame) == FRAME_HEADER.size + len(packet)
+    assert FRAME_HEADER.unpack_from(frame) == (len(packet), FRAME_DIRECTION_SEND, RUN_EPOCH, 3, 1500000)
+    assert frame[FRAME_HEADER.size:] == packet
+
+
+def test_decode():
+    first = build_module_type_request(0x12)
+    second = build_module_type_request(0x13)
+    data = encode_frame(first, FRAME_DIRECTION_BUS, 1, 1.0) + encode_frame(second, FRAME_DIRECTION_BUS, 2, 2.0)
+
+    frames = decode_frames(data)
+
+    assert [frame.sequence for frame in frames] == [1, 2]
+    assert [frame.epoch for frame in frames] == [RUN_EPOCH, RUN_EPOCH]
+    assert [frame.payload for frame in frames] == [first, second]
+    assert frames[1].timestamp == 2.0
+
+    # Incomplete frames are left for later
+    assert len(decode_frames(data[:-1])) == 1
+    assert decode_frames(data[:FRAME_HEADER.size - 1]) == []
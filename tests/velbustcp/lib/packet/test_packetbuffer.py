@@ -1,7 +1,7 @@
 import pytest
 
 from velbustcp.lib.packet.packetbuffer import PacketBuffer
-from velbustcp.lib.consts import STX
+from velbustcp.lib.consts import PARSER_BUFFER_SIZE, STX
 
 realign_data = [
     (bytearray([0x01, 0x04, not STX, 0x09, 0x04]), 0),  # No STX present
@@ -45,3 +45,12 @@ def test_shift(amount, expected_length):
     buffer.feed(shift_info)
     buffer.shift(amount)
     assert expected_length == len(buffer)
+
+
+def test_feed_limit():
+    buffer = PacketBuffer()
+    buffer.feed(bytearray([0x01]) * PARSER_BUFFER_SIZE)
+    buffer.feed(bytearray([STX]))
+
+    assert len(buffer) == PARSER_BUFFER_SIZE
+    assert buffer[PARSER_BUFFER_SIZE - 1] == STX
@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+from velbustcp.lib.consts import PRIORITY_LOW
+from velbustcp.lib.packet.packetbuilder import build_clock_sync, build_module_type_request, build_packet
+from velbustcp.lib.packet.packetparser import PacketParser
+
+
+def test_module_type_request():
+    assert build_module_type_request(0xFF) == bytearray([0x0F, 0xFB, 0xFF, 0x40, 0xB7, 0x04])
+
+
+def test_build_packet_parses():
+    packet = build_packet(PRIORITY_LOW, 0x3D, bytes([0xB7, 0x06, 0x0A, 0x07, 0xE5]))
+
+    assert PacketParser().feed(packet) == [packet]
+
+
+def test_build_packet_too_long():
+    with pytest.raises(ValueError):
+        build_packet(PRIORITY_LOW, 0x01, bytes(9))
+
+
+def test_clock_sync():
+    clock, date, dst = build_clock_sync(datetime.datetime(2021, 6, 10, 7, 45))
+
+    assert clock[2] == date[2] == dst[2] == 0x00
+    assert clock[4:8] == bytearray([0xD8, 0x03, 0x07, 0x2D])
+    assert date[4:9] == bytearray([0xB7, 0x0A, 0x06, 0x07, 0xE5])
+    assert dst[4] == 0xAF
@@ -1,5 +1,78 @@
-from velbustcp.lib.packet.packetexcluder import should_accept
+import pytest
 
+from velbustcp.lib.consts import PRIORITY_FIRMWARE, PRIORITY_HIGH, PRIORITY_LOW
+from velbustcp.lib.packet.packetbuilder import build_module_type_request, build_packet
+from velbustcp.lib.packet.packetexcluder import InboundPolicy, should_accept
+from velbustcp.lib.packet.packetfilter import PacketFilter
 
-def test_should_accept():
-    assert should_accept(None, None)
+RELAY_ON = build_packet(PRIORITY_HIGH, 0x12, bytes([0x02, 0x01]))
+BUTTON_PRESS = build_packet(PRIORITY_HIGH, 0x13, bytes([0x00, 0x01, 0x00, 0x00]))
+FIRMWARE = build_packet(PRIORITY_FIRMWARE, 0x12, bytes([0xCA, 0x00]))
+
+
+def test_should_accept_default():
+    policy = InboundPolicy()
+
+    assert should_accept(RELAY_ON, policy)
+    assert should_accept(FIRMWARE, policy)
+    assert should_accept(build_module_type_request(0x12), policy)
+
+
+def test_should_accept_read_only():
+    assert not should_accept(RELAY_ON, InboundPolicy(read_only=True))
+
+
+def test_should_accept_firmware():
+    policy = InboundPolicy(firmware=False)
+
+    assert not should_accept(FIRMWARE, policy)
+    assert should_accept(RELAY_ON, policy)
+
+
+def test_should_accept_allow():
+    policy = InboundPolicy(allow=PacketFilter(addresses=frozenset([0x12]), commands=frozenset([0x02])))
+
+    assert should_accept(RELAY_ON, policy)
+    assert not should_accept(BUTTON_PRESS, policy)
+    assert not should_accept(build_module_type_request(0x12), policy)
+
+
+def test_should_accept_deny():
+    policy = InboundPolicy(
+        allow=PacketFilter(priorities=frozenset([PRIORITY_HIGH, PRIORITY_LOW])),
+        deny=PacketFilter(addresses=frozenset([0x13]))
+    )
+
+    assert should_accept(RELAY_ON, policy)
+    assert not should_accept(BUTTON_PRESS, policy)
+    assert not should_accept(FIRMWARE, policy)
+
+
+def test_should_accept_deny_all_fields():
+    policy = InboundPolicy(deny=PacketFilter(addresses=frozenset([0x12]), commands=frozenset([0x02])))
+
+    # Only packets matching both the address and the command are denied
+    assert not should_accept(RELAY_ON, policy)
+    assert should_accept(build_packet(PRIORITY_HIGH, 0x13, bytes([0x02, 0x01])), policy)
+    assert should_accept(build_packet(PRIORITY_HIGH, 0x12, bytes([0x01, 0x01])), policy)
+    assert should_accept(build_module_type_request(0x12), policy)
+
+
+def test_parse():
+    policy = InboundPolicy.parse({"deny": {"commands": ["0x02"]}, "firmware": "false"})
+
+    assert policy.deny.commands == {0x02}
+    assert not policy.firmware
+    assert not policy.read_only
+    assert not should_accept(RELAY_ON, policy)
+    assert should_accept(BUTTON_PRESS, policy)
+
+
+@pytest.mark.parametrize("settings_dict", [
+    "read_only",
+    {"allow": {"addresses": [256]}},
+    {"deny": {"channels": [1]}}
+])
+def test_parse_invalid(settings_dict):
+    with pytest.raises(ValueError):
+        InboundPolicy.parse(settings_dict)
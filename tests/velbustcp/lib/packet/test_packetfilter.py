@@ -0,0 +1,80 @@
+import pytest
+
+from velbustcp.lib.consts import PRIORITY_HIGH, PRIORITY_LOW
+from velbustcp.lib.packet.packetbuilder import build_module_type_request, build_packet
+from velbustcp.lib.packet.packetfilter import FilterIndex, PacketFilter
+
+RELAY_STATUS = build_packet(PRIORITY_LOW, 0x12, bytes([0xFB, 0x01, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00]))
+BUTTON_PRESS = build_packet(PRIORITY_HIGH, 0x13, bytes([0x00, 0x01, 0x00, 0x00]))
+
+
+def test_parse():
+    packet_filter = PacketFilter.parse({"addresses": ["0x12", 19], "priorities": "0xF8"})
+
+    assert packet_filter.addresses == {0x12, 0x13}
+    assert packet_filter.commands is None
+    assert packet_filter.priorities == {0xF8}
+
+
+def test_parse_arguments():
+    packet_filter = PacketFilter.parse_arguments(["addresses=0x12,0x13", "COMMANDS=0x00"])
+
+    assert packet_filter.addresses == {0x12, 0x13}
+    assert packet_filter.commands == {0x00}
+
+
+@pytest.mark.parametrize("settings_dict", [
+    {"addresses": ["abc"]},
+    {"addresses": [256]},
+    {"channels": [1]},
+    "addresses"
+])
+def test_parse_invalid(settings_dict):
+    with pytest.raises(ValueError):
+        PacketFilter.parse(settings_dict)
+
+
+def test_matches():
+    packet_filter = PacketFilter(commands=frozenset([0x00]))
+
+    assert packet_filter.matches(BUTTON_PRESS)
+    assert not packet_filter.matches(RELAY_STATUS)
+    assert not packet_filter.matches(build_module_type_request(0x13))
+    assert PacketFilter().matches(RELAY_STATUS)
+
+
+def test_intersect():
+    packet_filter = PacketFilter(addresses=frozenset([0x12, 0x13])).intersect(PacketFilter(addresses=frozenset([0x13]), commands=frozenset([0x00])))
+
+    assert packet_filter.addresses == {0x13}
+    assert packet_filter.commands == {0x00}
+    assert packet_filter.priorities is None
+
+
+def test_index():
+    index: FilterIndex[str] = FilterIndex()
+    index.add("all", PacketFilter())
+    index.add("buttons", PacketFilter(commands=frozenset([0x00])))
+    index.add("relay", PacketFilter(addresses=frozenset([0x12])))
+
+    assert list(index.match(RELAY_STATUS)) == ["all", "relay"]
+    assert list(index.match(BUTTON_PRESS)) == ["all", "buttons"]
+    assert list(index.match(build_module_type_request(0x12))) == ["all", "relay"]
+
+
+def test_index_remove_and_replace():
+    index: FilterIndex[str] = FilterIndex()
+    index.add("first", PacketFilter())
+    index.add("second", PacketFilter())
+
+    index.remove("first")
+    assert list(index.match(RELAY_STATUS)) == ["second"]
+
+    # The freed bit is reused
+    index.add("third", PacketFilter(addresses=frozenset([0x13])))
+    assert list(index.match(BUTTON_PRESS)) == ["third", "second"]
+
+    # Replacing a filter
+    index.add("second", PacketFilter(addresses=frozenset([0x13])))
+    assert list(index.match(RELAY_STATUS)) == []
+    assert len(index) == 2
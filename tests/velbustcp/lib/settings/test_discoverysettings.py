@@ -0,0 +1,22 @@
+import pytest
+
+from velbustcp.lib.settings.discovery import DiscoverySettings
+
+
+def test_defaults():
+    settings = DiscoverySettings()
+
+    assert not settings.enabled
+    assert settings.ttl == 3600
+
+
+def test_parse():
+    settings = DiscoverySettings.parse({"enabled": "true", "ttl": 60})
+
+    assert settings.enabled
+    assert settings.ttl == 60
+
+
+def test_invalid_ttl():
+    with pytest.raises(ValueError):
+        DiscoverySettings.parse({"ttl": -1})
@@ -0,0 +1,24 @@
+import pytest
+
+from velbustcp.lib.settings.handoff import HandoffSettings
+
+
+def test_defaults():
+    settings = HandoffSettings()
+
+    assert settings.path == ""
+    assert settings.timeout == 10.0
+
+
+def test_parse(tmp_path):
+    path = str(tmp_path / "handoff.sock")
+    settings = HandoffSettings.parse({"path": path, "timeout": "5"})
+
+    assert settings.path == path
+    assert settings.timeout == 5.0
+
+
+@pytest.mark.parametrize("settings_dict", [{"path": "/missing/handoff.sock"}, {"timeout": 0}])
+def test_invalid(settings_dict):
+    with pytest.raises(ValueError):
+        HandoffSettings.parse(settings_dict)
@@ -0,0 +1,22 @@
+import pytest
+
+from velbustcp.lib.settings.latency import LatencySettings
+
+
+def test_defaults():
+    settings = LatencySettings()
+
+    assert not settings.probe
+    assert settings.probe_interval == 60
+
+
+def test_parse():
+    settings = LatencySettings.parse({"probe": "true", "probe_interval": 5})
+
+    assert settings.probe
+    assert settings.probe_interval == 5
+
+
+def test_invalid_probe_interval():
+    with pytest.raises(ValueError):
+        LatencySettings.parse({"probe_interval": 0})
@@ -119,3 +119,142 @@ def test_parse_auth():
 
     assert settings.auth
     assert settings.auth_key == "12345"
+
+
+def test_parse_queue():
+
+    settings = NetworkSettings.parse({"queue_size": 10, "overflow": "disconnect", "coalesce_window": "0.0005"})
+
+    assert settings.queue_size == 10
+    assert settings.overflow == "disconnect"
+    assert settings.coalesce_window == 0.0005
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"queue_size": 0})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"overflow": "block"})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"coalesce_window": -1})
+
+
+def test_parse_filter():
+
+    settings = NetworkSettings.parse({"filter": {"addresses": ["0x12"]}})
+    assert settings.filter.addresses == {0x12}
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"filter": {"addresses": ["0x100"]}})
+
+
+def test_parse_policy():
+
+    settings = NetworkSettings.parse({"policy": {"read_only": "true"}})
+    assert settings.policy.read_only
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"policy": {"deny": {"addresses": ["0x100"]}}})
+
+
+def test_parse_rate_limits():
+
+    settings = NetworkSettings.parse({"client_rate": "2.5", "client_burst": 5, "network_rate": 10, "rate_policy": "drop"})
+
+    assert settings.client_rate == 2.5
+    assert settings.client_burst == 5
+    assert settings.network_rate == 10
+    assert settings.network_burst == 20
+    assert settings.rate_policy == "drop"
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"client_rate": -1})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"network_burst": 0})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"rate_policy": "block"})
+
+
+def test_parse_framed():
+
+    assert not NetworkSettings.parse({}).framed
+    assert NetworkSettings.parse({"framed": "true"}).framed
+
+
+def test_parse_admission():
+
+    settings = NetworkSettings.parse({"auth_timeout": 5, "max_pending": 10, "max_clients": "50", "accept_rate": 2, "accept_burst": 4})
+
+    assert settings.auth_timeout == 5
+    assert settings.max_pending == 10
+    assert settings.max_clients == 50
+    assert settings.accept_rate == 2
+    assert settings.accept_burst == 4
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"auth_timeout": -1})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"max_clients": -1})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"accept_burst": 0})
+
+
+def test_parse_handshakes():
+
+    settings = NetworkSettings.parse({"tls_tickets": 0, "handshake_timeout": "2.5", "max_handshakes": 8})
+
+    assert settings.tls_tickets == 0
+    assert settings.handshake_timeout == 2.5
+    assert settings.max_handshakes == 8
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"tls_tickets": -1})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"handshake_timeout": 0})
+
+
+def test_parse_workers():
+
+    assert NetworkSettings.parse({}).workers == 0
+    assert NetworkSettings.parse({"workers": "4"}).workers == 4
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"workers": -1})
+
+
+def test_parse_unix(tmp_path):
+
+    path = str(tmp_path / "velbus.sock")
+    settings = NetworkSettings.parse({"unix": path, "unix_mode": "600"})
+
+    assert settings.unix == path
+    assert settings.unix_mode == 0o600
+    assert NetworkSettings.parse({"unix": ""}).unix == ""
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"unix": str(tmp_path / "missing" / "velbus.sock")})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"unix_mode": "999"})
+
+
+def test_parse_dead_peers():
+
+    settings = NetworkSettings.parse({"keepalive_idle": 0, "keepalive_count": 2, "idle_timeout": 300, "write_timeout": "0"})
+
+    assert settings.keepalive_idle == 0
+    assert settings.keepalive_interval == 10
+    assert settings.keepalive_count == 2
+    assert settings.idle_timeout == 300
+    assert settings.write_timeout == 0
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"keepalive_interval": 0})
+
+    with pytest.raises(ValueError):
+        NetworkSettings.parse({"idle_timeout": -1})
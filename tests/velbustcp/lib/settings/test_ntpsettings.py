@@ -0,0 +1,25 @@
+import datetime
+
+import pytest
+
+from velbustcp.lib.settings.ntp import NtpSettings
+
+
+def test_defaults():
+    settings = NtpSettings()
+
+    assert not settings.enabled
+    assert settings.synctime == datetime.time(3, 0)
+
+
+def test_parse():
+    settings = NtpSettings.parse({"enabled": "true", "synctime": "04:30"})
+
+    assert settings.enabled
+    assert settings.synctime == datetime.time(4, 30)
+
+
+@pytest.mark.parametrize("synctime", ["", "25:00", "noon"])
+def test_invalid(synctime):
+    with pytest.raises(ValueError):
+        NtpSettings.parse({"synctime": synctime})
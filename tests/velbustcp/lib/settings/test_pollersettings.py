@@ -0,0 +1,34 @@
+import pytest
+
+from velbustcp.lib.settings.poller import PollerSettings
+
+
+def test_defaults():
+    settings = PollerSettings()
+
+    assert not settings.enabled
+    assert settings.modules == []
+    assert settings.interval == 300
+    assert settings.budget == 0.5
+
+
+def test_parse():
+    settings = PollerSettings.parse({"enabled": "true", "modules": ["0x12", 19], "interval": 60, "budget": 0.25})
+
+    assert settings.enabled
+    assert settings.modules == [0x12, 0x13]
+    assert settings.interval == 60
+    assert settings.budget == 0.25
+
+
+@pytest.mark.parametrize("settings_dict", [
+    {"modules": ["0x00"]},
+    {"modules": [256]},
+    {"modules": ["0xFF"]},
+    {"interval": 0},
+    {"budget": 0},
+    {"budget": 2}
+])
+def test_invalid(settings_dict):
+    with pytest.raises(ValueError):
+        PollerSettings.parse(settings_dict)
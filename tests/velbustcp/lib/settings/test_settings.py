@@ -0,0 +1,39 @@
+import pytest
+from velbustcp.lib.settings import settings
+
+
+def test_validate_and_set_settings():
+    settings.validate_and_set_settings({"connections": [{"port": 27200}, {"port": 27201}], "logging": {"type": "debug"}})
+
+    assert [network.port for network in settings.network_settings] == [27200, 27201]
+    assert settings.logging_settings.type == "debug"
+
+    # Sections that aren't given get their defaults
+    settings.validate_and_set_settings({})
+
+    assert [network.port for network in settings.network_settings] == [27015]
+    assert settings.logging_settings.type == "info"
+
+
+def test_validate_and_set_settings_reload():
+    settings.validate_and_set_settings({"serial": {"port": "/dev/ttyACM0"}})
+
+    settings.validate_and_set_settings({"connections": [{"port": 27200}], "serial": {"port": "/dev/ttyACM1"}}, reload=True)
+
+    # Only the sections that are applied on a reload are replaced
+    assert [network.port for network in settings.network_settings] == [27200]
+    assert settings.serial_settings.port == "/dev/ttyACM0"
+
+    settings.validate_and_set_settings({})
+
+
+def test_validate_and_set_settings_invalid():
+    settings.validate_and_set_settings({"connections": [{"port": 27200}]})
+
+    with pytest.raises(ValueError):
+        settings.validate_and_set_settings({"connections": [{"port": 27201}], "logging": {"type": "invalid"}})
+
+    # Nothing is replaced
+    assert [network.port for network in settings.network_settings] == [27200]
+
+    settings.validate_and_set_settings({})
@@ -0,0 +1,52 @@
+from velbustcp.lib.events import Event, EventBus
+
+
+def test_emit_in_order():
+    event = Event("test")
+    calls = []
+
+    event.subscribe(lambda value: calls.append(("first", value)))
+    event.subscribe(lambda value: calls.append(("second", value)))
+    event.emit(1)
+
+    assert calls == [("first", 1), ("second", 1)]
+
+
+def test_subscription_cancel():
+    event = Event("test")
+    calls = []
+
+    subscription = event.subscribe(calls.append)
+    subscription.cancel()
+    subscription.cancel()
+    event.emit(1)
+
+    assert calls == []
+    assert len(event) == 0
+
+
+def test_unsubscribe_while_emitting():
+    event = Event("test")
+    calls = []
+
+    def handler(value):
+        calls.append(value)
+        subscription.cancel()
+
+    subscription = event.subscribe(handler)
+    event.subscribe(calls.append)
+    event.emit(1)
+    event.emit(2)
+
+    assert calls == [1, 1, 2]
+
+
+def test_bus_clear():
+    events = EventBus()
+    events.bus_receive.subscribe(lambda packet: None)
+    events.client_close.subscribe(lambda client: None)
+
+    events.clear()
+
+    assert len(events.bus_receive) == 0
+    assert len(events.client_close) == 0
@@ -0,0 +1,22 @@
+from velbustcp.lib.util.histogram import Histogram
+
+
+def test_empty():
+    stats = Histogram().stats()
+
+    assert stats["count"] == 0
+    assert stats["mean"] == 0
+
+
+def test_add():
+    histogram = Histogram(buckets=(0.01, 0.1))
+
+    histogram.add(0.005)
+    histogram.add(0.05)
+    histogram.add(0.5)
+
+    stats = histogram.stats()
+    assert stats["count"] == 3
+    assert stats["min"] == 5
+    assert stats["max"] == 500
+    assert stats["buckets"] == {"10ms": 1, "100ms": 1, "+inf": 1}
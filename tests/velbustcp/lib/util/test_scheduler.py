@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import random
+import pytest
+
+from velbustcp.lib.util.scheduler import MAX_TICKS, Scheduler
+
+RESOLUTION = 0.001
+
+
+def test_call_later():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        scheduler.call_later(0.01, lambda: calls.append(1))
+        assert len(scheduler) == 1
+
+        await asyncio.sleep(0.05)
+        assert calls == [1]
+        assert len(scheduler) == 0
+
+    asyncio.run(run())
+
+
+def test_order():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        # Past the first level of the wheel, so the job has to cascade down
+        scheduler.call_later(0.1, lambda: calls.append(2))
+        scheduler.call_later(0.01, lambda: calls.append(1))
+
+        await asyncio.sleep(0.2)
+        assert calls == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_cancel():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        job = scheduler.call_later(0.01, lambda: calls.append(1))
+        job.cancel()
+        assert len(scheduler) == 0
+
+        await asyncio.sleep(0.03)
+        assert calls == []
+
+    asyncio.run(run())
+
+
+def test_call_every():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        job = scheduler.call_every(0.01, lambda: calls.append(1))
+        await asyncio.sleep(0.055)
+        job.cancel()
+
+        assert 3 <= len(calls) <= 5
+        assert len(scheduler) == 0
+
+    asyncio.run(run())
+
+
+def test_exception_keeps_running():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        def fail():
+            raise RuntimeError()
+
+        scheduler.call_later(0.01, fail)
+        scheduler.call_later(0.01, lambda: calls.append(1))
+
+        await asyncio.sleep(0.03)
+        assert calls == [1]
+
+    asyncio.run(run())
+
+
+def test_many_jobs():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+        calls = []
+
+        jobs = [scheduler.call_later(0.01 + (i % 50) * RESOLUTION, lambda: calls.append(1)) for i in range(1000)]
+        for job in jobs[::2]:
+            job.cancel()
+        assert len(scheduler) == 500
+
+        await asyncio.sleep(0.1)
+        assert len(calls) == 500
+
+    asyncio.run(run())
+
+
+def test_call_daily():
+    async def run():
+        scheduler = Scheduler()
+
+        scheduler.call_daily((datetime.datetime.now() - datetime.timedelta(minutes=1)).time(), lambda: None)
+        assert len(scheduler) == 1
+
+        scheduler.stop()
+        assert len(scheduler) == 0
+
+    asyncio.run(run())
+
+
+class FakeTimer():
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeLoop():
+    """An event loop clock that only moves when told to, so late jobs can be told apart from slow tests."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers = []
+
+    def time(self):
+        return self.now
+
+    def call_at(self, when, callback):
+        timer = FakeTimer(when, callback)
+        self.timers.append(timer)
+        return timer
+
+    def advance(self, until):
+        while True:
+            self.timers = [timer for timer in self.timers if not timer.cancelled]
+            if not self.timers:
+                break
+
+            timer = min(self.timers, key=lambda timer: timer.when)
+            if timer.when > until:
+                break
+
+            self.timers.remove(timer)
+            self.now = timer.when
+            timer.callback()
+
+        self.now = until
+
+
+def test_jobs_across_levels_on_time(mocker):
+    loop = FakeLoop()
+    mocker.patch("velbustcp.lib.util.scheduler.asyncio.get_event_loop", return_value=loop)
+    scheduler = Scheduler(1)
+    fired = {}
+
+    def schedule(name, delay):
+        due = loop.now + delay
+        scheduler.call_later(delay, lambda: fired.setdefault(name, (due, loop.now)))
+
+    # On the second level, due right after the lowest level wraps around
+    schedule("cascaded", 70)
+
+    # A job on the lowest level that is due after the wrap around
+    scheduler.call_later(30, lambda: schedule("lowest", 60))
+
+    loop.advance(200)
+
+    assert set(fired) == {"cascaded", "lowest"}
+    for due, at in fired.values():
+        assert at == due
+
+
+def test_random_jobs_on_time(mocker):
+    loop = FakeLoop()
+    mocker.patch("velbustcp.lib.util.scheduler.asyncio.get_event_loop", return_value=loop)
+    scheduler = Scheduler(1)
+    generator = random.Random(1)
+    fired = []
+    jobs = []
+
+    for _ in range(200):
+        loop.advance(loop.now + generator.randint(0, 50))
+
+        due = loop.now + generator.randint(1, 300)
+        jobs.append(scheduler.call_later(due - loop.now, lambda due=due: fired.append((due, loop.now))))
+
+        if generator.random() < 0.2:
+            generator.choice(jobs).cancel()
+
+    loop.advance(loop.now + 10000)
+
+    assert fired
+    assert all(at == due for due, at in fired)
+
+
+def test_delay_too_long():
+    async def run():
+        scheduler = Scheduler(RESOLUTION)
+
+        with pytest.raises(ValueError):
+            scheduler.call_later(MAX_TICKS * RESOLUTION * 2, lambda: None)
+
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+import sys
+import threading
+from pytest_mock import MockerFixture
+
+from velbustcp.lib.util.tokenbucket import TokenBucket
+
+
+def test_burst(mocker: MockerFixture):
+    mocker.patch("time.monotonic", return_value=100.0)
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert bucket.take()
+    assert bucket.take()
+    assert bucket.take()
+    assert not bucket.take()
+    assert bucket.delay() == 0.5
+
+
+def test_refill(mocker: MockerFixture):
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    bucket = TokenBucket(rate=2, burst=2)
+
+    assert bucket.take()
+    assert bucket.take()
+    assert not bucket.take()
+
+    monotonic.return_value = 100.5
+    assert bucket.delay() == 0
+    assert bucket.take()
+    assert not bucket.take()
+
+    # Never fills beyond the burst size
+    monotonic.return_value = 200.0
+    assert bucket.take()
+    assert bucket.take()
+    assert not bucket.take()
+
+
+def test_shared_by_threads(mocker: MockerFixture):
+    mocker.patch("time.monotonic", return_value=100.0)
+    bucket = TokenBucket(rate=1, burst=20000)
+    taken = []
+
+    def take() -> None:
+        taken.append(sum(bucket.take() for _ in range(10000)))
+
+    # Switch threads as often as possible, to interleave the takes
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=take) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    # No token is handed out twice
+    assert sum(taken) == 20000
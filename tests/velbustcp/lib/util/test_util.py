@@ -2,7 +2,7 @@ import logging
 import logging.handlers
 
 from velbustcp.lib.settings.logging import LoggingSettings
-from velbustcp.lib.util.util import setup_logging, str2bool
+from velbustcp.lib.util.util import set_log_level, setup_logging, str2bool
 
 
 def test_str2bool():
@@ -43,3 +43,16 @@ def test_output_syslog():
     logger = setup_logging(settings)
     assert logger.name == settings.name
     assert isinstance(logger.handlers[0], logging.handlers.SysLogHandler)
+
+
+def test_set_log_level():
+
+    settings = LoggingSettings()
+    settings.name = "test-logger-level"
+    logger = setup_logging(settings)
+
+    settings.type = "debug"
+    set_log_level(settings)
+
+    assert logger.level == logging.DEBUG
+    assert len(logger.handlers) == 1